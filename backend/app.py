@@ -1,13 +1,18 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt, JWTError
-from database import get_db
 from routers.auth import hash_password, verify_password, create_access_token, SECRET_KEY, ALGORITHM
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
 import numpy as np
-import cv2
-from PIL import Image
-from io import BytesIO
-from model_loader import model, class_names
+from model_loader import batcher, class_names, registry, frame_cache, face_trackers
+from inference_pool import InferencePool, PoolRestarting
+from preprocessing import preprocess_image_bytes
+from pagination import page_size, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from sqlite_pool import SQLitePool, PoolTimeout
 
 app = FastAPI()
 
@@ -18,28 +23,96 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# "batch" runs inference in-process through the micro-batcher,
+# "pool" decodes and predicts in worker processes (EMOTION_POOL_PROCS_PER_CORE)
+INFERENCE_MODE = os.getenv("EMOTION_INFERENCE_MODE", "batch")
+inference_pool = InferencePool.from_env(registry.model_path, registry.backend) if INFERENCE_MODE == "pool" else None
+
+# Fixed statements; sqlite3 keeps them compiled per pooled connection
+INSERT_USER_SQL = "INSERT INTO users (name, email, password) VALUES (?, ?, ?)"
+SELECT_LOGIN_SQL = "SELECT id, name, email, password FROM users WHERE email=?"
+SELECT_USER_ID_SQL = "SELECT id FROM users WHERE email=?"
+INSERT_EMOTION_SQL = "INSERT INTO emotions (user_id, emotion, confidence) VALUES (?, ?, ?)"
+HISTORY_FIRST_PAGE_SQL = ("SELECT id, emotion, confidence, timestamp FROM emotions WHERE user_id=? "
+                          "ORDER BY timestamp DESC, id DESC LIMIT ?")
+HISTORY_NEXT_PAGE_SQL = ("SELECT id, emotion, confidence, timestamp FROM emotions WHERE user_id=? "
+                         "AND timestamp <= ? AND (timestamp < ? OR id < ?) "
+                         "ORDER BY timestamp DESC, id DESC LIMIT ?")
+
+db_pool = SQLitePool.from_env()
+
+@contextmanager
+def checkout():
+    try:
+        conn = db_pool.acquire()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database busy", headers={"Retry-After": "1"})
+    try:
+        yield conn
+    finally:
+        db_pool.release(conn)
+
+def get_conn():
+    """Dependency: one pooled connection per request, returned when the request is done"""
+    with checkout() as conn:
+        yield conn
+
+# Checkout, query and release in one call, for async handlers to run in the threadpool.
+# Checking out on the event loop would block it while the connections it waits for
+# can only be returned by dependency teardown scheduled on that same loop.
+def find_user(email):
+    with checkout() as conn:
+        return conn.execute(SELECT_USER_ID_SQL, (email,)).fetchone()
+
+def save_emotion(user_id, emotion, confidence):
+    with checkout() as conn:
+        conn.execute(INSERT_EMOTION_SQL, (user_id, emotion, confidence))
+        conn.commit()
+
+def inference_ready():
+    return inference_pool.is_ready() if inference_pool else registry.is_ready()
+
+# --- MODEL WARM-UP ---
+@app.on_event("startup")
+def preload_model():
+    if inference_pool:
+        inference_pool.start()
+    # Load in the background so worker start isn't blocked on TensorFlow
+    elif os.getenv("EMOTION_MODEL_PRELOAD", "true").lower() == "true":
+        registry.start_background_load()
+
+@app.on_event("shutdown")
+def stop_inference_pool():
+    if inference_pool:
+        inference_pool.shutdown()
+
+@app.on_event("shutdown")
+def close_db_pool():
+    db_pool.close()
+
+@app.get("/ready")
+def readiness():
+    if not inference_ready():
+        raise HTTPException(status_code=503, detail=registry.status())
+    return {"status": "ready", "model": registry.status()}
+
 # --- USER SIGNUP ---
 @app.post("/signup")
-def signup(name: str = Form(...), email: str = Form(...), password: str = Form(...)):
-    conn = get_db()
-    cur = conn.cursor()
+def signup(name: str = Form(...), email: str = Form(...), password: str = Form(...), conn=Depends(get_conn)):
     try:
-        cur.execute("INSERT INTO users (name, email, password) VALUES (?, ?, ?)",
-                    (name, email, hash_password(password)))
+        conn.execute(INSERT_USER_SQL, (name, email, hash_password(password)))
         conn.commit()
         return {"status": "success", "message": "User created"}
-    except Exception as e:
+    except sqlite3.IntegrityError:
         raise HTTPException(status_code=400, detail="Email already exists")
 
 # --- USER LOGIN ---
 @app.post("/login")
-def login(email: str = Form(...), password: str = Form(...)):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM users WHERE email=?", (email,))
-    user = cur.fetchone()
+def login(email: str = Form(...), password: str = Form(...), conn=Depends(get_conn)):
+    user = conn.execute(SELECT_LOGIN_SQL, (email,)).fetchone()
     if not user or not verify_password(password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -49,6 +122,13 @@ def login(email: str = Form(...), password: str = Form(...)):
 # --- EMOTION ANALYSIS ---
 @app.post("/analyze_emotion")
 async def analyze_emotion(file: UploadFile = File(...), token: str = Form(...)):
+    # Fail fast while the model is still loading
+    if not inference_ready():
+        if not inference_pool:
+            registry.start_background_load()
+        raise HTTPException(status_code=503, detail="Emotion model is not ready yet",
+                            headers={"Retry-After": "5"})
+
     try:
         # Verify JWT
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -56,49 +136,92 @@ async def analyze_emotion(file: UploadFile = File(...), token: str = Form(...)):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    # Get user
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM users WHERE email=?", (email,))
-    user = cur.fetchone()
+    # Get user; connections are checked out only around the queries, not held during inference.
+    # Checkout can block on an exhausted pool, so it runs in the threadpool with the query.
+    user = await run_in_threadpool(find_user, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Process image
     contents = await file.read()
-    image = Image.open(BytesIO(contents)).convert("RGB").resize((48, 48))
-    gray = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
-    img_array = gray.reshape(1, 48, 48, 1).astype("float32") / 255.0
+    if inference_pool:
+        # Decode, preprocess and predict off the event loop in a worker process
+        try:
+            predictions = await inference_pool.predict_async(contents)
+        except PoolRestarting:
+            raise HTTPException(status_code=503, detail="Emotion model is restarting",
+                                headers={"Retry-After": "5"})
+        if predictions is None:
+            raise HTTPException(status_code=400, detail="Invalid image")
+    else:
+        cache_key = f"user:{user['id']}"
+
+        # Single reduced-scale grayscale decode, cropped to the tracked face, resized to 48x48;
+        # decode and Haar detect/track take milliseconds of CPU, so keep them off the event loop
+        img_array = await run_in_threadpool(preprocess_image_bytes, contents, face_trackers.get(cache_key))
+        if img_array is None:
+            raise HTTPException(status_code=400, detail="Invalid image")
 
-    # Predict
-    predictions = model.predict(img_array)
+        # Reuse the last prediction for near-duplicate frames, otherwise predict
+        # (batched with other in-flight frames)
+        lookup = frame_cache.lookup(cache_key, img_array)
+        if lookup.cached is not None and not lookup.audit:
+            predictions = lookup.cached
+        else:
+            predictions = await batcher.predict_async(img_array)
+            frame_cache.record(cache_key, lookup, predictions)
     idx = int(np.argmax(predictions))
     emotion = class_names[idx]
     confidence = float(np.max(predictions))
 
     # Save to DB
-    cur.execute("INSERT INTO emotions (user_id, emotion, confidence) VALUES (?, ?, ?)",
-                (user["id"], emotion, confidence))
-    conn.commit()
+    await run_in_threadpool(save_emotion, user["id"], emotion, confidence)
 
     return {"status": "success", "emotion": emotion, "confidence": confidence}
 
+# --- INFERENCE STATS ---
+@app.get("/inference/stats")
+def inference_stats():
+    return {
+        "status": "success",
+        "mode": INFERENCE_MODE,
+        "model": registry.status(),
+        "batching": batcher.stats(),
+        "pool": inference_pool.stats() if inference_pool else None,
+        "frame_cache": frame_cache.metrics(),
+        "face_tracking": face_trackers.stats(),
+    }
+
+# --- DATABASE POOL STATS ---
+@app.get("/db/stats")
+def db_stats():
+    return {"status": "success", "pool": db_pool.stats()}
+
 # --- DASHBOARD HISTORY ---
 @app.get("/history")
-def get_history(token: str):
+def get_history(token: str, response: Response, limit: int = None, cursor: str = None, conn=Depends(get_conn)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM users WHERE email=?", (email,))
-    user = cur.fetchone()
+    user = conn.execute(SELECT_USER_ID_SQL, (email,)).fetchone()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    cur.execute("SELECT emotion, confidence, timestamp FROM emotions WHERE user_id=? ORDER BY timestamp DESC", (user["id"],))
+    # Keyset page on (timestamp, id), newest first; one extra row tells us if there is a next page
+    size = page_size(limit)
+    after = decode_cursor(cursor)
+    if after is None:
+        cur = conn.execute(HISTORY_FIRST_PAGE_SQL, (user["id"], size + 1))
+    else:
+        timestamp = after[0].isoformat(" ")
+        cur = conn.execute(HISTORY_NEXT_PAGE_SQL, (user["id"], timestamp, timestamp, after[1], size + 1))
     history = cur.fetchall()
-    return {"status": "success", "history": [dict(row) for row in history]}
+    next_cursor = None
+    if len(history) > size:
+        history = history[:size]
+        last = history[-1]
+        next_cursor = encode_cursor(datetime.fromisoformat(last["timestamp"]), last["id"])
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return {"status": "success", "history": [dict(row) for row in history], "next_cursor": next_cursor}
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rebuild the user_stats dashboard aggregates from interview session history.
+
+Run once after upgrading an existing database, or whenever the aggregates
+need to be recomputed from scratch.
+"""
+import sys
+
+from database import SessionLocal, init_db
+from user_stats import rebuild_user_stats
+
+
+def backfill():
+    print("🔄 Rebuilding user_stats from interview_sessions...")
+    init_db()
+    db = SessionLocal()
+    try:
+        users = rebuild_user_stats(db)
+        print(f"✅ Rebuilt aggregates for {users} user(s)")
+        return True
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if backfill() else 1)
@@ -0,0 +1,147 @@
+"""
+Dynamic micro-batching for emotion model inference.
+
+Callers submit single preprocessed frames; a background thread groups them
+into batches (up to ``max_batch_size`` frames or ``max_wait_ms`` of waiting)
+and runs one ``predict`` call per batch.
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from preprocessing import FrameBatchBuffer
+
+
+class BatchingEngine:
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 32, max_wait_ms: float = 10.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._buffer = FrameBatchBuffer(max_batch_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # Stats
+        self._batches = 0
+        self._frames = 0
+        self._batch_size_hist: Dict[int, int] = {}
+        self._queue_wait_total_ms = 0.0
+        self._queue_wait_max_ms = 0.0
+        self._predict_total_ms = 0.0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="emotion-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, frame: np.ndarray) -> Future:
+        """Queue a single 48x48 uint8 frame and return a future for its prediction row"""
+        if self._stopped:
+            raise RuntimeError("Batching engine is stopped")
+        self._ensure_started()
+        future = Future()
+        self._queue.put((frame, future, time.perf_counter()))
+        return future
+
+    def predict(self, frame: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking helper for synchronous callers"""
+        return self.submit(frame).result(timeout=timeout)
+
+    async def predict_async(self, frame: np.ndarray) -> np.ndarray:
+        """Awaitable helper for async handlers"""
+        return await asyncio.wrap_future(self.submit(frame))
+
+    def stop(self):
+        self._stopped = True
+        self._queue.put(None)
+
+    def _collect_batch(self, first) -> List:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            # Claim each future before predicting: a caller cancelled meanwhile (e.g. asyncio.wrap_future
+            # on a disconnect) is skipped, and a claimed future can no longer be cancelled, so setting its
+            # result below cannot raise InvalidStateError and kill this thread
+            batch = [item for item in self._collect_batch(first) if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.perf_counter()
+
+            try:
+                # Normalize straight into the reused float32 batch buffer
+                frames = self._buffer.fill([frame for frame, _, _ in batch])
+                preds = self.predict_fn(frames)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result(preds[i])
+            self._record(len(batch), [(started - enqueued) * 1000.0 for _, _, enqueued in batch],
+                         (finished - started) * 1000.0)
+
+    def _record(self, size: int, waits_ms: List[float], predict_ms: float):
+        with self._lock:
+            self._batches += 1
+            self._frames += size
+            self._batch_size_hist[size] = self._batch_size_hist.get(size, 0) + 1
+            self._queue_wait_total_ms += sum(waits_ms)
+            self._queue_wait_max_ms = max(self._queue_wait_max_ms, max(waits_ms))
+            self._predict_total_ms += predict_ms
+
+    def stats(self) -> Dict:
+        """Batch-size and queue-wait statistics for tuning the batching knobs"""
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "frames": self._frames,
+                "avg_batch_size": self._frames / self._batches if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_size_hist.items())),
+                "avg_queue_wait_ms": self._queue_wait_total_ms / self._frames if self._frames else 0.0,
+                "max_queue_wait_ms": self._queue_wait_max_ms,
+                "avg_predict_ms": self._predict_total_ms / self._batches if self._batches else 0.0,
+            }
+
+
+def engine_from_env(predict_fn: Callable[[np.ndarray], np.ndarray]) -> BatchingEngine:
+    """Build an engine using EMOTION_BATCH_SIZE / EMOTION_BATCH_WAIT_MS"""
+    return BatchingEngine(
+        predict_fn,
+        max_batch_size=int(os.getenv("EMOTION_BATCH_SIZE", "32")),
+        max_wait_ms=float(os.getenv("EMOTION_BATCH_WAIT_MS", "10")),
+    )
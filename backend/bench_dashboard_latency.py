@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Load test for GET /dashboard with the async and sync database layers.
+
+Starts main.py under uvicorn once per DB_MODE against a fresh SQLite file,
+seeds a few sessions per user, then has many concurrent clients hit
+/dashboard and reports throughput and latency percentiles.
+
+Example:
+    python bench_dashboard_latency.py --clients 200 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from bench_db_concurrency import start_server
+
+MODES = ["sync", "async"]
+USERS = 20
+SESSIONS_PER_USER = 10
+
+
+async def seed(client):
+    headers = []
+    for i in range(USERS):
+        email = f"bench{i}@example.com"
+        await client.post("/signup", json={"name": "Bench", "email": email, "password": "bench123"})
+        token = (await client.post("/login", json={"email": email, "password": "bench123"})).json()
+        user_headers = {"Authorization": f"Bearer {token['access_token']}"}
+        for _ in range(SESSIONS_PER_USER):
+            session = (await client.post("/sessions", headers=user_headers)).json()
+            await client.put(f"/sessions/{session['id']}", headers=user_headers, json={"total_questions": 5})
+        headers.append(user_headers)
+    return headers
+
+
+async def client_loop(client, headers, requests, latencies, errors):
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            response = await client.get("/dashboard", headers=headers)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+
+async def run_mode(port, clients, requests):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60,
+                                 limits=httpx.Limits(max_connections=clients)) as client:
+        headers = await seed(client)
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, headers[i % len(headers)], requests, latencies, errors)
+            for i in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests_per_sec": len(latencies) / elapsed,
+        "errors": len(errors),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /dashboard latency, async vs sync DB layer")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests\n")
+    print(f"{'mode':<6} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            server = start_server(args.port, os.path.join(tmp, "bench.db"), {"DB_MODE": mode})
+            try:
+                result = asyncio.run(run_mode(args.port, args.clients, args.requests))
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{mode:<6} {result['requests_per_sec']:>8.1f} {result['errors']:>7} "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
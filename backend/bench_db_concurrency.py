@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for database writes through the API.
+
+Starts main.py under uvicorn against a fresh SQLite file once per profile and
+fires many parallel POST /sessions and POST /analyze calls, reporting
+writes/sec, error counts and latency.
+
+Profiles:
+  legacy  rollback journal, synchronous=FULL, default pool, one durable commit per sample
+  tuned   WAL, synchronous=NORMAL, busy timeout, mmap/cache pragmas, write-behind buffer
+
+Example:
+    python bench_db_concurrency.py --clients 50 --requests 40
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+PROFILES = {
+    "legacy": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+        "DB_POOL_SIZE": "5",
+        "DB_MAX_OVERFLOW": "10",
+        "EMOTION_WRITE_MODE": "durable",
+    },
+    "tuned": {
+        "SQLITE_JOURNAL_MODE": "WAL",
+        "SQLITE_SYNCHRONOUS": "NORMAL",
+        "EMOTION_WRITE_MODE": "buffered",
+    },
+}
+
+FRAME = b"\xff\xd8\xff\xe0" + b"\x00" * 2048
+
+
+def start_server(port, db_path, overrides):
+    # Benchmarks measure the server itself; profiles that want rate limiting turn it back on
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "RATE_LIMIT_ENABLED": "false",
+           "QUESTION_CACHE_PATH": f"{db_path}.questions", **overrides}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit("Server did not start")
+
+
+async def client_loop(client, headers, requests, latencies, errors):
+    session_id = None
+    for i in range(requests):
+        started = time.perf_counter()
+        try:
+            if session_id is None or i % 10 == 0:
+                response = await client.post("/sessions", headers=headers)
+                if response.status_code == 200:
+                    session_id = response.json()["id"]
+            else:
+                response = await client.post(
+                    f"/analyze?session_id={session_id}",
+                    headers={**headers, "Content-Type": "image/jpeg"},
+                    content=FRAME,
+                )
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+
+async def run_profile(port, clients, requests):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60,
+                                 limits=httpx.Limits(max_connections=clients)) as client:
+        await client.post("/signup", json={"name": "Bench", "email": "bench@example.com", "password": "bench123"})
+        token = (await client.post("/login", json={"email": "bench@example.com", "password": "bench123"})).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, headers, requests, latencies, errors) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "writes_per_sec": len(latencies) / elapsed,
+        "errors": len(errors),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel /sessions and /analyze write benchmark")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per client")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests\n")
+    print(f"{'profile':<8} {'writes/s':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name in args.profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            server = start_server(args.port, os.path.join(tmp, "bench.db"), PROFILES[name])
+            try:
+                result = asyncio.run(run_profile(args.port, args.clients, args.requests))
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{name:<8} {result['writes_per_sec']:>9.1f} {result['errors']:>7} "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Per-frame preprocessing latency with and without face ROI tracking.
+
+Modes:
+  full-frame   decode + resize the whole frame to 48x48 (the old behaviour)
+  detect-only  run the face detector on every frame
+  track        detect once, then track (re-detect on loss / every K frames)
+
+Examples:
+    python bench_face_tracking.py --video interview.mp4 --frames 600
+    python bench_face_tracking.py --redetect-every 30
+
+Without --video a synthetic clip with a moving textured patch is used; the
+tracker is primed with the patch position since there is no real face to find.
+"""
+import argparse
+import time
+
+import numpy as np
+import cv2
+
+from face_tracker import FaceROITracker
+
+
+def load_video(path, limit):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        ok, encoded = cv2.imencode(".jpg", frame)
+        frames.append(encoded.tobytes())
+    capture.release()
+    if not frames:
+        raise SystemExit(f"Could not read frames from {path}")
+    return frames, None
+
+
+def synthetic_clip(count, width=640, height=480):
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width), dtype=np.uint8), (15, 15), 0)
+    patch = rng.integers(0, 255, (160, 140), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        x = 240 + int(20 * np.sin(i / 15))
+        y = 150 + int(10 * np.cos(i / 20))
+        frame[y:y + 160, x:x + 140] = patch
+        ok, encoded = cv2.imencode(".jpg", frame)
+        frames.append(encoded.tobytes())
+    return frames, (240, 150, 140, 160)
+
+
+def to_input(gray):
+    return cv2.resize(gray, (48, 48)).astype("float32") / 255.0
+
+
+def run(frames, mode, redetect_every, primed_roi):
+    tracker = FaceROITracker(redetect_every=redetect_every if mode == "track" else 1)
+    if primed_roi is not None and mode == "track":
+        # No real face in the synthetic clip: seed the tracker as if detection had found the patch
+        first = cv2.imdecode(np.frombuffer(frames[0], np.uint8), cv2.IMREAD_GRAYSCALE)
+        x, y, w, h = primed_roi
+        tracker._roi, tracker._template = primed_roi, first[y:y + h, x:x + w].copy()
+        tracker.redetect_every = len(frames) + 1
+
+    timings = []
+    for data in frames:
+        started = time.perf_counter()
+        gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if mode != "full-frame":
+            gray = tracker.crop(gray)
+        to_input(gray)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return np.array(timings), tracker.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face ROI tracking preprocessing benchmark")
+    parser.add_argument("--video", help="Video file to read frames from (default: synthetic clip)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--redetect-every", type=int, default=15)
+    args = parser.parse_args()
+
+    frames, primed_roi = load_video(args.video, args.frames) if args.video else synthetic_clip(args.frames)
+    print(f"{len(frames)} frames, redetect every {args.redetect_every}\n")
+    print(f"{'mode':<12} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'detections':>11} {'tracked':>8}")
+    for mode in ("full-frame", "detect-only", "track"):
+        timings, stats = run(frames, mode, args.redetect_every, primed_roi)
+        print(f"{mode:<12} {timings.mean():>8.3f} {np.percentile(timings, 50):>8.3f} "
+              f"{np.percentile(timings, 95):>8.3f} {stats['detections']:>11} {stats['tracked']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare the legacy base64-in-JSON frame path with raw binary frame bodies.
+
+Reports bytes on the wire and CPU time per frame for parse + decode, where
+decode is the endpoints' own ``preprocessing.decode_gray``.
+
+Example:
+    python bench_frame_ingest.py --frames 500 --width 640 --height 480
+"""
+import argparse
+import base64
+import json
+import time
+
+import numpy as np
+import cv2
+
+from frame_ingest import decode_base64_frame
+from preprocessing import decode_gray
+
+
+def make_frames(count, width, height, quality):
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        img = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+        img = cv2.GaussianBlur(img, (21, 21), 0)
+        ok, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        frames.append(encoded.tobytes())
+    return frames
+
+
+def json_path(body):
+    payload = json.loads(body)
+    return decode_gray(decode_base64_frame(payload["frame_data"]))
+
+
+def binary_path(body):
+    return decode_gray(body)
+
+
+def measure(fn, bodies, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        for body in bodies:
+            fn(body)
+    return (time.process_time() - started) * 1e6 / (len(bodies) * repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON/base64 vs binary frame ingestion benchmark")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.width, args.height, args.quality)
+    json_bodies = [
+        json.dumps({"frame_data": "data:image/jpeg;base64," + base64.b64encode(f).decode(), "session_id": 1}).encode()
+        for f in frames
+    ]
+
+    raw_bytes = sum(len(f) for f in frames) / len(frames)
+    json_bytes = sum(len(b) for b in json_bodies) / len(json_bodies)
+
+    # Parse-only cost (what the binary path avoids entirely)
+    json_parse_us = measure(lambda b: decode_base64_frame(json.loads(b)["frame_data"]), json_bodies, args.repeat)
+    json_total_us = measure(json_path, json_bodies, args.repeat)
+    binary_total_us = measure(binary_path, frames, args.repeat)
+
+    print(f"{args.frames} frames, {args.width}x{args.height} JPEG q={args.quality}\n")
+    print(f"{'path':<14} {'bytes/frame':>12} {'parse us':>9} {'parse+decode us':>16}")
+    print(f"{'json+base64':<14} {json_bytes:>12.0f} {json_parse_us:>9.1f} {json_total_us:>16.1f}")
+    print(f"{'binary':<14} {raw_bytes:>12.0f} {0.0:>9.1f} {binary_total_us:>16.1f}")
+    print(f"\nWire overhead of JSON path: {json_bytes / raw_bytes - 1:.1%}, "
+          f"CPU saved per frame: {json_total_us - binary_total_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark requests/sec of the process-pool inference mode as the process count grows.
+
+Example:
+    python bench_inference_pool.py --processes 1 2 4 8 --requests 2000 --concurrency 64
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import cv2
+
+from inference_pool import InferencePool
+from model_loader import DEFAULT_MODEL_PATH
+
+
+def make_frame(width=640, height=480, quality=80):
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    img = cv2.GaussianBlur(img, (31, 31), 0)
+    ok, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes()
+
+
+def run(pool, frame, requests, concurrency):
+    # Bounded in-flight window, like concurrent HTTP requests hitting one API worker
+    window = threading.Semaphore(concurrency)
+    done = threading.Event()
+    remaining = [requests]
+    lock = threading.Lock()
+
+    def _finished(_):
+        window.release()
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        window.acquire()
+        pool.submit(frame).add_done_callback(_finished)
+    done.wait()
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process-pool inference scaling benchmark")
+    parser.add_argument("--model", default=os.getenv("EMOTION_MODEL_PATH", str(DEFAULT_MODEL_PATH)))
+    parser.add_argument("--backend", default=os.getenv("EMOTION_BACKEND", "keras"))
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    frame = make_frame()
+    print(f"Frame size: {len(frame)} bytes, {os.cpu_count()} CPUs, backend={args.backend}")
+    print(f"\n{'processes':>9} {'req/s':>10} {'speedup':>8} {'shm':>6} {'pickled':>8}")
+
+    baseline = None
+    for processes in args.processes:
+        pool = InferencePool(processes, args.model, backend=args.backend)
+        pool.start()
+        while not pool.is_ready():
+            time.sleep(0.1)
+        try:
+            # Warm-up pass so every worker has run at least once
+            run(pool, frame, processes * 4, processes)
+            rps = run(pool, frame, args.requests, args.concurrency)
+            stats = pool.stats()
+        finally:
+            pool.shutdown()
+        baseline = baseline or rps
+        print(f"{processes:>9} {rps:>10.1f} {rps / baseline:>7.2f}x "
+              f"{stats['shared_memory_requests']:>6} {stats['pickled_requests']:>8}")
+
+
+if __name__ == "__main__":
+    main()
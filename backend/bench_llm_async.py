@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Event-loop responsiveness while LLM completions are in flight.
+
+Runs a fake OpenAI chat-completions server that answers after --latency
+seconds, starts main.py under uvicorn pointed at it (OPENAI_BASE_URL), then
+fires --requests concurrent POST /test-generate-questions calls while a probe
+polls GET / every few milliseconds. With the sync OpenAI client each
+completion blocks the worker for its full latency; awaited on AsyncOpenAI the
+probe should stay fast and the completions should overlap.
+
+Example:
+    python bench_llm_async.py --requests 20 --latency 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from bench_db_concurrency import start_server
+
+
+def fake_llm_app(latency, pool=5):
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        await asyncio.sleep(latency)
+        content = json.dumps([f"Fake question {i}" for i in range(pool)])
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    return app
+
+
+def start_fake_llm(port, latency, pool=5):
+    """Serve fake chat completions of ``pool`` questions in a background thread"""
+    server = uvicorn.Server(uvicorn.Config(fake_llm_app(latency, pool), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def probe(client, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        await asyncio.sleep(0.005)
+
+
+async def run_burst(port, requests):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300,
+                                 limits=httpx.Limits(max_connections=requests + 1)) as client:
+        stop = asyncio.Event()
+        probe_latencies = []
+        probe_task = asyncio.create_task(probe(client, stop, probe_latencies))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/test-generate-questions", json={"topic": "technical", "difficulty": "medium", "count": 5})
+            for _ in range(requests)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+        llm = (await client.get("/metrics")).json().get("llm")
+
+    probe_latencies.sort()
+    return {
+        "burst_s": elapsed,
+        "faked": sum(r.json().get("questions", [""])[0].startswith("Fake") for r in responses),
+        "probes": len(probe_latencies),
+        "probe_p50_ms": probe_latencies[len(probe_latencies) // 2] if probe_latencies else float("nan"),
+        "probe_max_ms": probe_latencies[-1] if probe_latencies else float("nan"),
+        "llm": llm,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GET / latency while LLM completions are in flight")
+    parser.add_argument("--requests", type=int, default=20, help="Concurrent question-generation calls")
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds the fake LLM takes per completion")
+    parser.add_argument("--port", type=int, default=8771)
+    parser.add_argument("--llm-port", type=int, default=8772)
+    args = parser.parse_args()
+
+    fake = start_fake_llm(args.llm_port, args.latency)
+    # Every request must reach the (fake) LLM, not the question cache
+    overrides = {"OPENAI_API_KEY": "sk-fake", "OPENAI_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1",
+                 "QUESTION_CACHE_TTL_SECONDS": "0",
+                 # Measure the event loop, not the LLM admission gate
+                 "ADMISSION_LLM_MAX_CONCURRENT": str(args.requests)}
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(args.port, os.path.join(tmp, "bench.db"), overrides)
+        try:
+            result = asyncio.run(run_burst(args.port, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+            fake.should_exit = True
+
+    print(f"{args.requests} concurrent completions at {args.latency:g}s each\n")
+    print(f"burst:      {result['burst_s']:.2f}s ({result['faked']}/{args.requests} answered by the fake LLM)")
+    print(f"probe GET /: {result['probes']} probes, p50 {result['probe_p50_ms']:.1f}ms, "
+          f"max {result['probe_max_ms']:.1f}ms")
+    if result["llm"]:
+        print(f"llm metrics: {result['llm']}")
+
+
+if __name__ == "__main__":
+    main()
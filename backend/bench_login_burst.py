@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Event-loop responsiveness during a login burst.
+
+Starts main.py under uvicorn, signs up --users accounts, then fires that many
+concurrent POST /login calls (the start of an interview round) while a probe
+polls GET / every few milliseconds. With bcrypt on the event loop the probe
+stalls for the whole burst; with the off-loop hasher it should stay fast.
+
+Example:
+    python bench_login_burst.py --users 40
+    python bench_login_burst.py --users 40 --concurrency 1 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from bench_db_concurrency import start_server
+
+
+async def probe(client, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        await asyncio.sleep(0.005)
+
+
+async def run_burst(port, users):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120,
+                                 limits=httpx.Limits(max_connections=users + 1)) as client:
+        emails = [f"burst{i}@example.com" for i in range(users)]
+        for email in emails:
+            await client.post("/signup", json={"name": "Burst", "email": email, "password": "bench123"})
+        before = (await client.get("/metrics")).json().get("password_hasher")
+
+        stop = asyncio.Event()
+        probe_latencies = []
+        probe_task = asyncio.create_task(probe(client, stop, probe_latencies))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/login", json={"email": email, "password": "bench123"}) for email in emails
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+        after = (await client.get("/metrics")).json().get("password_hasher")
+
+    probe_latencies.sort()
+    return {
+        "burst_s": elapsed,
+        "failed": sum(r.status_code != 200 for r in responses),
+        "probes": len(probe_latencies),
+        "probe_p50_ms": probe_latencies[len(probe_latencies) // 2] if probe_latencies else float("nan"),
+        "probe_max_ms": probe_latencies[-1] if probe_latencies else float("nan"),
+        "hasher": after if before is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GET / latency during a burst of bcrypt logins")
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS for the server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[2], help="BCRYPT_MAX_CONCURRENCY values")
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    print(f"{args.users} concurrent logins at bcrypt cost {args.rounds}\n")
+    print(f"{'bcrypt threads':>14} {'burst s':>8} {'failed':>7} {'probes':>7} {'probe p50':>10} {'probe max':>10} "
+          f"{'avg queue':>10}")
+    for concurrency in args.concurrency:
+        with tempfile.TemporaryDirectory() as tmp:
+            overrides = {"BCRYPT_ROUNDS": str(args.rounds), "BCRYPT_MAX_CONCURRENCY": str(concurrency)}
+            server = start_server(args.port, os.path.join(tmp, "bench.db"), overrides)
+            try:
+                result = asyncio.run(run_burst(args.port, args.users))
+            finally:
+                server.terminate()
+                server.wait()
+        queue = f"{result['hasher']['avg_queue_ms']:.0f}ms" if result["hasher"] else "-"
+        print(f"{concurrency:>14} {result['burst_s']:>8.2f} {result['failed']:>7} {result['probes']:>7} "
+              f"{result['probe_p50_ms']:>8.1f}ms {result['probe_max_ms']:>8.1f}ms {queue:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Authenticated request load with and without the principal cache.
+
+Starts main.py under uvicorn once per profile, logs in a few users and has
+concurrent clients stream frames to POST /analyze (the per-frame path that
+only needs current_user.id). Reports throughput, latency and the cache's
+hit rate and user queries from /metrics.
+
+Profiles:
+  uncached  PRINCIPAL_CACHE_TTL_SECONDS=0, one user query per request
+  cached    default TTL
+
+Example:
+    python bench_principal_cache.py --clients 50 --requests 100
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from bench_db_concurrency import start_server, FRAME
+
+PROFILES = {
+    "uncached": {"PRINCIPAL_CACHE_TTL_SECONDS": "0"},
+    "cached": {},
+}
+USERS = 10
+
+
+async def seed(client):
+    users = []
+    for i in range(USERS):
+        email = f"bench{i}@example.com"
+        await client.post("/signup", json={"name": "Bench", "email": email, "password": "bench123"})
+        token = (await client.post("/login", json={"email": email, "password": "bench123"})).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        session = (await client.post("/sessions", headers=headers)).json()
+        users.append((headers, session["id"]))
+    return users
+
+
+async def client_loop(client, headers, session_id, requests, latencies, errors):
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                f"/analyze?session_id={session_id}", content=FRAME,
+                headers={**headers, "Content-Type": "image/jpeg"},
+            )
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+
+async def run_profile(port, clients, requests):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60,
+                                 limits=httpx.Limits(max_connections=clients)) as client:
+        users = await seed(client)
+        before = (await client.get("/metrics")).json()["principal_cache"]
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, *users[i % len(users)], requests, latencies, errors)
+            for i in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+        after = (await client.get("/metrics")).json()["principal_cache"]
+
+    latencies.sort()
+    lookups = after["lookups"] - before["lookups"]
+    return {
+        "requests_per_sec": len(latencies) / elapsed,
+        "errors": len(errors),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "hit_rate": (after["hits"] - before["hits"]) / lookups if lookups else 0.0,
+        "user_queries_per_request": (after["db_lookups"] - before["db_lookups"]) / len(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="POST /analyze load with and without the principal cache")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests\n")
+    print(f"{'profile':<9} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'hit rate':>9} {'user q/req':>11}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            overrides = {"EMOTION_WRITE_MODE": "buffered", **PROFILES[profile]}
+            server = start_server(args.port, os.path.join(tmp, "bench.db"), overrides)
+            try:
+                result = asyncio.run(run_profile(args.port, args.clients, args.requests))
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{profile:<9} {result['requests_per_sec']:>8.1f} {result['errors']:>7} "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{result['hit_rate']:>8.1%} {result['user_queries_per_request']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
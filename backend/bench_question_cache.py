@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+POST /test-generate-questions latency with and without the question cache.
+
+Runs the fake LLM server from bench_llm_async.py (each completion takes
+--latency seconds), starts main.py once per profile and has --clients
+clients request questions for topics drawn from a skewed distribution, the
+way most users pick from the same handful of topics. Reports latency, how
+many completions reached the LLM and the cache's hit rate.
+
+Profiles:
+  uncached  QUESTION_CACHE_TTL_SECONDS=0, one completion per request
+  cached    default TTL
+
+Example:
+    python bench_question_cache.py --clients 20 --requests 20 --latency 1
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from bench_db_concurrency import start_server
+from bench_llm_async import start_fake_llm
+
+PROFILES = {
+    "uncached": {"QUESTION_CACHE_TTL_SECONDS": "0"},
+    "cached": {},
+}
+TOPICS = ["technical", "behavioral", "leadership", "system design", "python", "product management",
+          "data science", "frontend", "devops", "sales"]
+WEIGHTS = [1.0 / (rank + 1) for rank in range(len(TOPICS))]  # Zipf-like popularity
+
+
+async def client_loop(client, requests, latencies, variety):
+    for _ in range(requests):
+        topic = random.choices(TOPICS, WEIGHTS)[0]
+        started = time.perf_counter()
+        response = await client.post("/test-generate-questions",
+                                     json={"topic": topic, "difficulty": "medium", "count": 5})
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        variety.setdefault(topic, set()).add(tuple(response.json()["questions"]))
+
+
+async def run_profile(port, clients, requests):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300,
+                                 limits=httpx.Limits(max_connections=clients)) as client:
+        latencies, variety = [], {}
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, requests, latencies, variety) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        metrics = (await client.get("/metrics")).json()
+
+    latencies.sort()
+    return {
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "llm_calls": metrics["llm"]["calls"],
+        "hit_rate": metrics["question_cache"]["hit_rate"],
+        # Distinct question lists served for the most popular topic
+        "variants": len(variety.get(TOPICS[0], ())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Question generation with and without the question cache")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds the fake LLM takes per completion")
+    parser.add_argument("--port", type=int, default=8773)
+    parser.add_argument("--llm-port", type=int, default=8774)
+    args = parser.parse_args()
+
+    fake = start_fake_llm(args.llm_port, args.latency, pool=15)
+    print(f"{args.clients} clients x {args.requests} requests, {len(TOPICS)} topics, "
+          f"{args.latency:g}s per completion\n")
+    print(f"{'profile':<9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'LLM calls':>10} {'hit rate':>9} "
+          f"{'variants':>9}")
+    for profile, overrides in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            overrides = {"OPENAI_API_KEY": "sk-fake", "OPENAI_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1",
+                         "ADMISSION_LLM_MAX_CONCURRENT": str(args.clients), **overrides}
+            server = start_server(args.port, os.path.join(tmp, "bench.db"), overrides)
+            try:
+                result = asyncio.run(run_profile(args.port, args.clients, args.requests))
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{profile:<9} {result['requests_per_sec']:>8.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{result['llm_calls']:>10} {result['hit_rate']:>8.1%} {result['variants']:>9}")
+    fake.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+One greedy client against well-behaved ones, with and without rate limiting.
+
+Starts main.py under uvicorn once per profile. A single "greedy" user streams
+POST /analyze from many concurrent connections as fast as it can while
+--clients normal users send frames at --fps. Reports the normal users'
+latency and how many of the greedy user's requests were rejected with 429.
+
+Profiles:
+  off  RATE_LIMIT_ENABLED=false
+  on   default per-user buckets and admission gates
+
+Example:
+    python bench_rate_limit.py --clients 10 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from bench_db_concurrency import start_server, FRAME
+
+PROFILES = {
+    "off": {"RATE_LIMIT_ENABLED": "false"},
+    # Per-IP buckets would lump every local client together; keep the per-user ones
+    "on": {"RATE_LIMIT_ENABLED": "true", "RATE_LIMIT_ANALYZE_IP": "off", "RATE_LIMIT_LOGIN_IP": "off"},
+}
+
+
+async def login(client, name):
+    email = f"{name}@example.com"
+    await client.post("/signup", json={"name": name, "email": email, "password": "bench123"})
+    token = (await client.post("/login", json={"email": email, "password": "bench123"})).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}", "Content-Type": "image/jpeg"}
+    session = (await client.post("/sessions", headers=headers)).json()
+    return headers, session["id"]
+
+
+async def send(client, headers, session_id):
+    started = time.perf_counter()
+    response = await client.post(f"/analyze?session_id={session_id}", content=FRAME, headers=headers)
+    return response.status_code, (time.perf_counter() - started) * 1000.0
+
+
+async def greedy_loop(client, user, deadline, counts):
+    while time.perf_counter() < deadline:
+        code, _ = await send(client, *user)
+        counts[code] = counts.get(code, 0) + 1
+
+
+async def normal_loop(client, user, deadline, fps, latencies, counts):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        code, ms = await send(client, *user)
+        counts[code] = counts.get(code, 0) + 1
+        latencies.append(ms)
+        await asyncio.sleep(max(0.0, 1.0 / fps - (time.perf_counter() - started)))
+
+
+async def run_profile(port, clients, seconds, fps, greedy_connections):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60,
+                                 limits=httpx.Limits(max_connections=clients + greedy_connections)) as client:
+        greedy = await login(client, "greedy")
+        normal = [await login(client, f"normal{i}") for i in range(clients)]
+
+        deadline = time.perf_counter() + seconds
+        greedy_counts, normal_counts, latencies = {}, {}, []
+        await asyncio.gather(
+            *(greedy_loop(client, greedy, deadline, greedy_counts) for _ in range(greedy_connections)),
+            *(normal_loop(client, user, deadline, fps, latencies, normal_counts) for user in normal),
+        )
+
+    latencies.sort()
+    return {
+        "normal_ok": normal_counts.get(200, 0),
+        "normal_429": normal_counts.get(429, 0),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "greedy_ok": greedy_counts.get(200, 0),
+        "greedy_429": greedy_counts.get(429, 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fairness under a greedy client, rate limiting off vs on")
+    parser.add_argument("--clients", type=int, default=10, help="Well-behaved users")
+    parser.add_argument("--fps", type=float, default=5.0, help="Frames per second per well-behaved user")
+    parser.add_argument("--greedy-connections", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8770)
+    args = parser.parse_args()
+
+    print(f"{args.clients} users at {args.fps:g} fps + 1 greedy user on {args.greedy_connections} connections, "
+          f"{args.seconds:g}s\n")
+    print(f"{'profile':<8} {'normal ok':>10} {'normal 429':>11} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'greedy ok':>10} {'greedy 429':>11}")
+    for profile, overrides in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            server = start_server(args.port, os.path.join(tmp, "bench.db"), overrides)
+            try:
+                result = asyncio.run(run_profile(args.port, args.clients, args.seconds, args.fps,
+                                                 args.greedy_connections))
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"{profile:<8} {result['normal_ok']:>10} {result['normal_429']:>11} {result['p50_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['greedy_ok']:>10} {result['greedy_429']:>11}")
+
+
+if __name__ == "__main__":
+    main()
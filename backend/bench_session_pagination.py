@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Per-page latency of the session listing at increasing depths.
+
+Fills a temporary SQLite database with one user's sessions, then times
+fetching a page at several depths with the keyset query used by
+GET /sessions and with the equivalent LIMIT/OFFSET query.
+
+Example:
+    python bench_session_pagination.py --sessions 100000 --page-size 50
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+
+import queries
+from models import Base, User, InterviewSession
+
+LIST_FIELDS = ["id", "start_time", "average_confidence", "dominant_emotion", "total_questions"]
+
+
+def populate(engine, sessions):
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "name": "Bench", "email": "bench@example.com"}])
+        rows = [{
+            "user_id": 1,
+            # Some sessions share a start_time to exercise the id tie-breaker
+            "start_time": start + timedelta(minutes=i - 1 if i % 10 == 1 else i),
+            "average_confidence": 0.75,
+            "dominant_emotion": "Focused",
+            "total_questions": 5,
+            "session_summary": "x" * 2000,
+        } for i in range(sessions)]
+        for i in range(0, len(rows), 10000):
+            conn.execute(insert(InterviewSession), rows[i:i + 10000])
+
+
+def keyset_cursors(conn, page_size, depths):
+    """Walk the whole listing page by page, remembering the cursor at each depth"""
+    cursors, after, offset, pages = {}, None, 0, 0
+    while True:
+        if offset in depths:
+            cursors[offset] = after
+        rows = conn.execute(queries.user_sessions_page(1, LIST_FIELDS, page_size, after)).all()
+        pages += 1
+        if len(rows) <= page_size:
+            return cursors, offset + len(rows), pages
+        after = (rows[page_size - 1].start_time, rows[page_size - 1].id)
+        offset += page_size
+
+
+def offset_query(page_size, offset):
+    columns = [getattr(InterviewSession, name) for name in LIST_FIELDS]
+    return select(*columns).where(InterviewSession.user_id == 1).order_by(
+        InterviewSession.start_time.desc(), InterviewSession.id.desc()
+    ).limit(page_size).offset(offset)
+
+
+def time_ms(fn, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) * 1000.0 / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyset vs OFFSET pagination for GET /sessions")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        populate(engine, args.sessions)
+
+        last_page = (args.sessions - 1) // args.page_size * args.page_size
+        depths = sorted({0, args.page_size * 10, args.sessions // 10 // args.page_size * args.page_size,
+                         args.sessions // 2 // args.page_size * args.page_size, last_page})
+        with engine.connect() as conn:
+            cursors, seen, pages = keyset_cursors(conn, args.page_size, set(depths))
+            assert seen == args.sessions, f"keyset walk returned {seen} of {args.sessions} sessions"
+            print(f"{args.sessions} sessions, {pages} pages of {args.page_size}, keyset walk saw every row once\n")
+
+            print(f"{'offset':>8} {'keyset ms':>10} {'OFFSET ms':>10}")
+            for depth in depths:
+                keyset = time_ms(lambda: conn.execute(
+                    queries.user_sessions_page(1, LIST_FIELDS, args.page_size, cursors[depth])).all(), args.repeats)
+                offset = time_ms(lambda: conn.execute(offset_query(args.page_size, depth)).all(), args.repeats)
+                print(f"{depth:>8} {keyset:>10.2f} {offset:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Soak test for the raw-sqlite connection path used by app.py.
+
+Replays the database work of app.py requests (login lookup, emotion insert,
+history page) from several threads against a temporary database and samples
+open file descriptors and RSS as it goes.
+
+Modes:
+  connect  open a connection (and apply pragmas) per request and drop it, as app.py
+           used to; sqlite3 connections sit in reference cycles, so each one keeps its
+           file descriptors until the cyclic GC happens to run
+  pool     check a connection out of SQLitePool per request and return it
+
+Each mode runs in its own process so one cannot inherit the other's descriptors.
+
+Example:
+    python bench_sqlite_pool.py --requests 1000000 --threads 8
+    python bench_sqlite_pool.py --modes connect pool --requests 100000
+"""
+import argparse
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from database import apply_sqlite_pragmas
+from sqlite_pool import SQLitePool
+
+# Same statements as app.py
+SELECT_LOGIN_SQL = "SELECT id, name, email, password FROM users WHERE email=?"
+SELECT_USER_ID_SQL = "SELECT id FROM users WHERE email=?"
+INSERT_EMOTION_SQL = "INSERT INTO emotions (user_id, emotion, confidence) VALUES (?, ?, ?)"
+HISTORY_FIRST_PAGE_SQL = ("SELECT id, emotion, confidence, timestamp FROM emotions WHERE user_id=? "
+                          "ORDER BY timestamp DESC, id DESC LIMIT ?")
+
+SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT UNIQUE, password TEXT);
+CREATE TABLE emotions (id INTEGER PRIMARY KEY, user_id INTEGER, emotion TEXT, confidence REAL,
+                       timestamp DATETIME DEFAULT CURRENT_TIMESTAMP);
+CREATE INDEX ix_emotions_user_id_timestamp ON emotions (user_id, timestamp);
+"""
+USERS = 1000
+EMOTIONS = ["Happy", "Neutral", "Sad", "Surprise"]
+
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        # Peak rather than current RSS outside Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def create_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO users (name, email, password) VALUES (?, ?, 'x')",
+                     [(f"User {i}", f"user{i}@example.com") for i in range(USERS)])
+    conn.commit()
+    conn.close()
+
+
+def handle(conn, rng):
+    """One request's worth of database work"""
+    email = f"user{rng.randrange(USERS)}@example.com"
+    kind = rng.random()
+    if kind < 0.2:
+        conn.execute(SELECT_LOGIN_SQL, (email,)).fetchone()
+    elif kind < 0.8:
+        user = conn.execute(SELECT_USER_ID_SQL, (email,)).fetchone()
+        conn.execute(INSERT_EMOTION_SQL, (user["id"], rng.choice(EMOTIONS), rng.random()))
+        conn.commit()
+    else:
+        user = conn.execute(SELECT_USER_ID_SQL, (email,)).fetchone()
+        conn.execute(HISTORY_FIRST_PAGE_SQL, (user["id"], 51)).fetchall()
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    apply_sqlite_pragmas(conn)
+    return conn
+
+
+def run(mode, path, requests, threads, samples):
+    pool = SQLitePool(path, size=threads) if mode == "pool" else None
+    remaining = [requests]
+    errors = []
+    lock = threading.Lock()
+    trace = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            try:
+                if pool:
+                    with pool.connection() as conn:
+                        handle(conn, rng)
+                else:
+                    handle(connect(path), rng)
+            except sqlite3.Error as e:
+                with lock:
+                    errors.append(str(e))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    interval = max(requests // samples, 1)
+    next_sample = 0
+    while any(w.is_alive() for w in workers):
+        done = requests - remaining[0]
+        if done >= next_sample:
+            trace.append((done, open_fds(), rss_mb()))
+            next_sample += interval
+        time.sleep(0.05)
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    trace.append((requests, open_fds(), rss_mb()))
+    stats = pool.stats() if pool else None
+    if pool:
+        pool.close()
+    return elapsed, trace, stats, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test for app.py's SQLite connection handling")
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--samples", type=int, default=10, help="fd/RSS samples per run")
+    parser.add_argument("--modes", nargs="+", default=["pool"], choices=["connect", "pool"])
+    args = parser.parse_args()
+
+    if len(args.modes) > 1:
+        for mode in args.modes:
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--requests", str(args.requests),
+                            "--threads", str(args.threads), "--samples", str(args.samples), "--modes", mode],
+                           check=True)
+        return
+
+    mode = args.modes[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "soak.db")
+        create_database(path)
+        elapsed, trace, stats, errors = run(mode, path, args.requests, args.threads, args.samples)
+
+    print(f"\n{mode}: {args.requests} requests on {args.threads} threads in {elapsed:.1f}s "
+          f"({args.requests / elapsed:.0f} req/s)")
+    print(f"{'requests':>10} {'fds':>5} {'rss MB':>8}")
+    for done, fds, rss in trace:
+        print(f"{done:>10} {fds if fds is not None else '-':>5} {rss:>8.1f}")
+    fds = [fds for _, fds, _ in trace[1:] if fds is not None]
+    rss = [rss for _, _, rss in trace[1:]]
+    if fds:
+        print(f"fd range {min(fds)}..{max(fds)}, RSS range {min(rss):.1f}..{max(rss):.1f} MB")
+    if errors:
+        print(f"{len(errors)} failed requests, e.g. {errors[0]}")
+    if stats:
+        print(f"pool: {stats}")
+
+
+if __name__ == "__main__":
+    main()
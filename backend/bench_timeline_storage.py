@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare row-per-sample and packed timeline storage.
+
+Fills a temporary SQLite database with sessions of 2 fps samples, then
+reports database size and the time to build a session's emotion_timeline
+from ORM rows (the old summary path) and from the packed blob.
+
+Example:
+    python bench_timeline_storage.py --sessions 20 --minutes 45
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, User, InterviewSession, EmotionData, SessionTimeline
+from timeline_store import compact_session, unpack_timeline
+
+EMOTIONS = ["Happy", "Neutral", "Confident", "Focused", "Calm", "Sad", "Surprise"]
+
+
+def populate(engine, sessions, samples):
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "name": "Bench", "email": "bench@example.com"}])
+        conn.execute(insert(InterviewSession), [
+            {"id": s, "user_id": 1, "start_time": start, "end_time": start} for s in range(1, sessions + 1)
+        ])
+        for s in range(1, sessions + 1):
+            conn.execute(insert(EmotionData), [{
+                "user_id": 1,
+                "session_id": s,
+                "emotion": rng.choice(EMOTIONS),
+                "confidence": round(rng.uniform(0.6, 0.95), 2),
+                "eye_contact_score": round(rng.uniform(0.7, 0.95), 2),
+                "timestamp": start + timedelta(milliseconds=500 * i + rng.randint(0, 40)),
+            } for i in range(samples)])
+
+
+def db_size(engine, path):
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    return os.path.getsize(path)
+
+
+def rows_timeline(db, session_id):
+    emotions = db.scalars(
+        select(EmotionData).where(EmotionData.session_id == session_id).order_by(EmotionData.timestamp)
+    ).all()
+    return [{
+        "emotion": e.emotion,
+        "confidence": e.confidence,
+        "eye_contact_score": e.eye_contact_score,
+        "timestamp": e.timestamp.isoformat(),
+    } for e in emotions]
+
+
+def packed_timeline(db, session_id):
+    return unpack_timeline(db.get(SessionTimeline, session_id))
+
+
+def time_ms(factory, fn, sessions, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for session_id in range(1, sessions + 1):
+            db = factory()
+            fn(db, session_id)
+            db.close()
+    return (time.perf_counter() - started) * 1000.0 / (repeats * sessions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row vs packed emotion timeline storage")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--minutes", type=float, default=45.0)
+    parser.add_argument("--fps", type=float, default=2.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    samples = int(args.minutes * 60 * args.fps)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        populate(engine, args.sessions, samples)
+
+        rows_size = db_size(engine, path)
+        rows_ms = time_ms(factory, rows_timeline, args.sessions, args.repeats)
+
+        started = time.perf_counter()
+        db = factory()
+        for session_id in range(1, args.sessions + 1):
+            compact_session(db, session_id)
+        db.close()
+        compact_s = time.perf_counter() - started
+
+        packed_size = db_size(engine, path)
+        packed_ms = time_ms(factory, packed_timeline, args.sessions, args.repeats)
+
+        with engine.connect() as conn:
+            blob_bytes = conn.execute(text("SELECT SUM(LENGTH(data)) FROM session_timelines")).scalar()
+
+    print(f"{args.sessions} sessions x {samples} samples (compaction took {compact_s:.1f}s, "
+          f"{blob_bytes / (args.sessions * samples):.2f} blob bytes/sample)\n")
+    print(f"{'storage':<8} {'db size':>10} {'summary ms':>11}")
+    print(f"{'rows':<8} {rows_size / 1e6:>8.1f}MB {rows_ms:>11.1f}")
+    print(f"{'packed':<8} {packed_size / 1e6:>8.1f}MB {packed_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
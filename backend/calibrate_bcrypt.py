@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Pick the bcrypt cost for this machine.
+
+Times one hash at each cost from --min-rounds up and recommends the highest
+cost whose median hash time stays within --target-ms. Set the result as
+BCRYPT_ROUNDS; existing hashes are upgraded on each user's next login.
+
+Example:
+    python calibrate_bcrypt.py --target-ms 250
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+from routers.auth import BCRYPT_ROUNDS
+
+
+def time_hash_ms(rounds, samples):
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Choose BCRYPT_ROUNDS for a target hash latency")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Acceptable time per hash")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=3, help="Hashes timed per cost")
+    args = parser.parse_args()
+
+    print(f"🔄 Timing bcrypt (target {args.target_ms:.0f} ms, currently BCRYPT_ROUNDS={BCRYPT_ROUNDS})")
+    chosen = None
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        ms = time_hash_ms(rounds, args.samples)
+        within = ms <= args.target_ms
+        print(f"  - rounds {rounds:>2}: {ms:8.1f} ms {'✓' if within else ''}")
+        if not within:
+            break
+        chosen = rounds
+
+    if chosen is None:
+        print(f"❌ Even {args.min_rounds} rounds exceeds {args.target_ms:.0f} ms; lower --min-rounds or raise the target")
+        return
+    print(f"\n✅ Recommended: BCRYPT_ROUNDS={chosen}")
+    if chosen < 10:
+        print("⚠️  Fewer than 10 rounds is weak against offline cracking; prefer a faster machine or higher target")
+
+
+if __name__ == "__main__":
+    main()
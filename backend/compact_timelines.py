@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Pack the emotion timelines of closed sessions into session_timelines.
+
+Every session that ended at least ``--min-age-minutes`` ago and still has
+rows in emotion_data is compacted (see timeline_store.py). Safe to run from
+cron; sessions that are already packed are skipped unless new samples
+arrived for them.
+
+Example:
+    python compact_timelines.py --min-age-minutes 10 --limit 500
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+from database import SessionLocal, init_db
+from timeline_store import closed_sessions_with_rows, compact_session
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack emotion timelines of closed sessions")
+    parser.add_argument("--min-age-minutes", type=float, default=10.0,
+                        help="Only compact sessions that ended at least this long ago")
+    parser.add_argument("--limit", type=int, help="Maximum sessions to compact in this run")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    started = time.perf_counter()
+    compacted = rows = failed = 0
+    try:
+        for session_id in closed_sessions_with_rows(db, timedelta(minutes=args.min_age_minutes), args.limit):
+            try:
+                rows += compact_session(db, session_id)
+                compacted += 1
+            except Exception as e:
+                db.rollback()
+                failed += 1
+                print(f"❌ Session {session_id}: {e}")
+    finally:
+        db.close()
+
+    print(f"✅ Packed {compacted} session(s), {rows} emotion rows, {failed} failed "
+          f"in {time.perf_counter() - started:.1f}s")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Convert emotion_model.h5 into CPU inference artifacts and check accuracy parity.
+
+Examples:
+    python convert_model.py --formats onnx tflite tflite-int8
+    python convert_model.py --formats tflite-int8 --calibration-dir ./frames
+    python convert_model.py --parity-only --samples-dir ./frames --min-agreement 0.995
+
+Artifacts are written next to the Keras model with the names the inference
+backends expect (emotion_model.onnx, emotion_model.tflite,
+emotion_model_int8.tflite), so switching is just EMOTION_BACKEND=<name>.
+
+Calibration and the parity check use real face crops from --samples-dir /
+--calibration-dir, or EMOTION_SAMPLE_FRAMES_DIR (default: sample_frames/
+next to the model) when that exists. Random noise is only a last resort:
+agreement on noise says little about agreement on faces. Any backend whose
+top-1 label agrees with Keras on less than --min-agreement (default 99%) of
+the frames fails the run.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import cv2
+
+from inference_backends import KerasBackend, artifact_path, create_backend
+from model_loader import DEFAULT_MODEL_PATH, class_names
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_SAMPLES_DIR = os.getenv("EMOTION_SAMPLE_FRAMES_DIR", str(DEFAULT_MODEL_PATH.parent / "sample_frames"))
+
+
+def load_sample_frames(samples_dir, limit):
+    """Load images from a directory as (N, 48, 48, 1) float32 frames"""
+    frames = []
+    for path in sorted(Path(samples_dir).iterdir()):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        img = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        img = cv2.resize(img, (48, 48)).astype("float32") / 255.0
+        frames.append(img[..., None])
+        if len(frames) >= limit:
+            break
+    if not frames:
+        raise SystemExit(f"No readable images found in {samples_dir}")
+    return np.stack(frames)
+
+
+def synthetic_frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((count, 48, 48, 1), dtype=np.float32)
+
+
+def has_images(directory):
+    path = Path(directory)
+    return path.is_dir() and any(p.suffix.lower() in IMAGE_EXTENSIONS for p in path.iterdir())
+
+
+def sample_frames(directory, count, seed, purpose):
+    """Frames from ``directory``, else the default sample frames, else random noise (with a warning)"""
+    if directory:
+        return load_sample_frames(directory, count), True
+    if has_images(DEFAULT_SAMPLES_DIR):
+        print(f"📂 Using sample frames from {DEFAULT_SAMPLES_DIR} for {purpose}")
+        return load_sample_frames(DEFAULT_SAMPLES_DIR, count), True
+    print(f"⚠️  No sample frames for {purpose} (set --samples-dir or EMOTION_SAMPLE_FRAMES_DIR); "
+          f"falling back to random noise, which is a poor stand-in for faces")
+    return synthetic_frames(count, seed), False
+
+
+def convert_onnx(keras_model, output_path):
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, 48, 48, 1), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=13, output_path=output_path)
+
+
+def convert_tflite(keras_model, output_path, calibration=None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if calibration is not None:
+        # Full-integer post-training quantization with a representative dataset
+        def representative_dataset():
+            for frame in calibration:
+                yield [frame[None, ...]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    Path(output_path).write_bytes(converter.convert())
+
+
+def time_predict(backend, frames, batch_size):
+    started = time.perf_counter()
+    outputs = []
+    for i in range(0, len(frames), batch_size):
+        outputs.append(backend.predict(frames[i:i + batch_size]))
+    elapsed = time.perf_counter() - started
+    return np.concatenate(outputs), elapsed * 1000.0 / len(frames)
+
+
+def check_parity(model_path, backends, frames, batch_size):
+    """Compare every backend's argmax predictions with the Keras reference"""
+    reference = KerasBackend(model_path)
+    ref_scores, ref_ms = time_predict(reference, frames, batch_size)
+    ref_labels = ref_scores.argmax(axis=1)
+
+    print(f"\n{'backend':<12} {'agreement':>10} {'max |diff|':>11} {'ms/frame':>9}")
+    print(f"{'keras':<12} {1.0:>10.4f} {0.0:>11.4f} {ref_ms:>9.3f}")
+
+    results = {}
+    for name in backends:
+        if name == "keras":
+            continue
+        if not Path(artifact_path(model_path, name)).exists():
+            print(f"{name:<12} {'(missing artifact)':>31}")
+            continue
+        scores, ms = time_predict(create_backend(name, model_path), frames, batch_size)
+        agreement = float((scores.argmax(axis=1) == ref_labels).mean())
+        max_diff = float(np.abs(scores - ref_scores).max())
+        results[name] = agreement
+        print(f"{name:<12} {agreement:>10.4f} {max_diff:>11.4f} {ms:>9.3f}")
+
+    label_counts = np.bincount(ref_labels, minlength=len(class_names))
+    print("\nReference label distribution: " +
+          ", ".join(f"{label}={count}" for label, count in zip(class_names, label_counts)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the emotion model and check backend parity")
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH), help="Path to emotion_model.h5")
+    parser.add_argument("--formats", nargs="+", default=["onnx", "tflite", "tflite-int8"],
+                        choices=["onnx", "tflite", "tflite-int8"])
+    parser.add_argument("--calibration-dir", help="Images used to calibrate int8 quantization")
+    parser.add_argument("--samples-dir",
+                        help=f"Images used for the parity check (default: {DEFAULT_SAMPLES_DIR} if present, "
+                             f"else random noise)")
+    parser.add_argument("--samples", type=int, default=500, help="Number of frames for calibration/parity")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--parity-only", action="store_true", help="Skip conversion, only compare backends")
+    parser.add_argument("--min-agreement", type=float, default=0.99,
+                        help="Exit non-zero if any backend's top-1 label agrees with Keras on less than "
+                             "this fraction of frames")
+    args = parser.parse_args()
+
+    if not args.parity_only:
+        from tensorflow.keras.models import load_model
+        keras_model = load_model(args.model, compile=False)
+
+        for fmt in args.formats:
+            output_path = artifact_path(args.model, fmt)
+            print(f"🔄 Converting to {fmt} -> {output_path}")
+            started = time.perf_counter()
+            if fmt == "onnx":
+                convert_onnx(keras_model, output_path)
+            elif fmt == "tflite":
+                convert_tflite(keras_model, output_path)
+            else:
+                calibration, _ = sample_frames(args.calibration_dir or args.samples_dir, args.samples,
+                                               seed=0, purpose="int8 calibration")
+                convert_tflite(keras_model, output_path, calibration=calibration)
+            size_kb = Path(output_path).stat().st_size / 1024
+            print(f"✅ {fmt}: {size_kb:.0f} KB in {time.perf_counter() - started:.1f}s")
+
+    frames, real = sample_frames(args.samples_dir, args.samples, seed=1, purpose="the parity check")
+    results = check_parity(args.model, args.formats, frames, args.batch_size)
+
+    failing = [name for name, agreement in results.items() if agreement < args.min_agreement]
+    if failing:
+        print(f"\n❌ Below {args.min_agreement:.2%} agreement: {', '.join(failing)}")
+        if not real:
+            print("   Measured on random noise; rerun with --samples-dir pointing at real face crops")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
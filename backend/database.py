@@ -1,16 +1,180 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from models import Base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from fastapi.concurrency import run_in_threadpool
+from dotenv import load_dotenv
 import os
 
-# Database URL - using SQLite for local development
-DATABASE_URL = "sqlite:///./app.db"
+load_dotenv()
+
+# Database URL - SQLite for local development, any SQLAlchemy URL in production
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+
+# SQLite tuning (ignored for server databases)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+# Only takes effect for new database files; existing ones need a VACUUM to switch
+SQLITE_AUTO_VACUUM = os.getenv("SQLITE_AUTO_VACUUM", "INCREMENTAL")
+
+# Connection pool settings (recycle/pre-ping only apply to server databases)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+
+# Request handlers: "async" uses an async driver, "sync" runs the blocking Session in the threadpool.
+# "auto" picks async for server databases; aiosqlite's per-call thread hop makes it slower than sync for SQLite.
+DB_MODE = os.getenv("DB_MODE", "auto")
+
+# Async drivers per backend (override the whole URL with ASYNC_DATABASE_URL).
+# Only the backends migrations/ supports; the schema has no MySQL DDL.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def engine_options(url: str) -> dict:
+    """Keyword arguments for create_engine based on the database backend"""
+    if is_sqlite(url):
+        options = {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000.0,
+            }
+        }
+        # File databases use a QueuePool too; size it so concurrent requests don't time out waiting
+        if make_url(url).database not in (None, "", ":memory:"):
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                           pool_timeout=DB_POOL_TIMEOUT_SECONDS)
+        return options
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": True,
+    }
+
+def apply_sqlite_pragmas(dbapi_connection):
+    """Per-connection SQLite settings: WAL, relaxed fsync, busy timeout, cache sizing and auto-vacuum mode"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA auto_vacuum={SQLITE_AUTO_VACUUM}")
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    finally:
+        cursor.close()
+
+def install_sqlite_pragmas(sync_engine):
+    @event.listens_for(sync_engine, "connect")
+    def _on_sqlite_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection)
+
+def async_database_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its async counterpart"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
 
 # Create engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+if is_sqlite(DATABASE_URL):
+    install_sqlite_pragmas(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions behind the threadpool fallback: like the async sessionmaker, attributes stay loaded after
+# commit, so reading them afterwards never issues a refresh SELECT on the event loop
+ThreadpoolSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+def create_async_engine_from_env():
+    """Async engine for the request handlers, or None when running in sync mode or the driver is missing"""
+    if DB_MODE == "sync" or (DB_MODE == "auto" and is_sqlite(DATABASE_URL)):
+        return None
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        url = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+        options = engine_options(url)
+        if is_sqlite(url) and "pool_size" in options:
+            options["poolclass"] = AsyncAdaptedQueuePool
+        async_engine = create_async_engine(url, **options)
+    except (ImportError, ValueError) as e:
+        print(f"Async database layer unavailable ({e}), falling back to sync sessions")
+        return None
+    if is_sqlite(url):
+        install_sqlite_pragmas(async_engine.sync_engine)
+    return async_engine
+
+async_engine = create_async_engine_from_env()
+
+# Objects stay usable after commit; lazy refreshes would need a round trip the async session can't do implicitly
+AsyncSessionLocal = None
+if async_engine is not None:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+class ThreadpoolSession:
+    """Sync fallback with the AsyncSession call surface used by the handlers.
+
+    Each call runs the blocking Session in the threadpool, so handlers keep
+    the event loop free even without an async driver.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def add(self, instance):
+        self.session.add(instance)
+
+    def get_bind(self):
+        return self.session.get_bind()
+
+    async def execute(self, statement, *args, **kwargs):
+        def run():
+            result = self.session.execute(statement, *args, **kwargs)
+            # Buffer the rows in the worker thread so iterating them never touches the cursor
+            # (ORM results always return rows; a plain UPDATE/INSERT has none to buffer)
+            return result.freeze()() if getattr(result, "returns_rows", True) else result
+        return await run_in_threadpool(run)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        result = await self.execute(statement, *args, **kwargs)
+        return result.scalars()
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(lambda: self.session.get(entity, ident, **kwargs))
+
+    async def flush(self):
+        await run_in_threadpool(self.session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.session.rollback)
+
+    async def refresh(self, instance):
+        await run_in_threadpool(self.session.refresh, instance)
+
+    async def close(self):
+        await run_in_threadpool(self.session.close)
 
 def get_db():
     """Dependency to get database session"""
@@ -20,6 +184,26 @@ def get_db():
     finally:
         db.close()
 
+def open_async_session():
+    """An AsyncSession, or the threadpool-backed sync fallback"""
+    if AsyncSessionLocal is not None:
+        return AsyncSessionLocal()
+    return ThreadpoolSession(ThreadpoolSessionLocal())
+
+async def get_async_db():
+    """Dependency to get a database session for the async handlers"""
+    db = open_async_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Bring the schema up to date; a single version-row read when it already is"""
+    from migrations import ensure_schema
+
+    ensure_schema(engine)
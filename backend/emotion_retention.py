@@ -0,0 +1,232 @@
+"""
+Retention, rollup and archival for emotion_data.
+
+Raw samples older than ``raw_retention_days`` are processed in id-ordered
+chunks. Each chunk is:
+
+  1. appended to a gzip CSV file per day under ``archive_dir``
+     (fsynced before anything is deleted, so a crash can only duplicate
+     archived rows, never lose them),
+  2. folded into per-minute, per-session aggregates in emotion_rollups,
+  3. deleted from emotion_data in the same transaction as step 2.
+
+Rollups older than ``rollup_retention_days`` (0 keeps them forever) are
+deleted. Afterwards the job runs ANALYZE and, on SQLite databases in
+incremental auto-vacuum mode, returns the freed pages to the filesystem.
+"""
+import csv
+import gzip
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from models import EmotionData, EmotionRollup
+
+ARCHIVE_COLUMNS = ["id", "user_id", "session_id", "emotion", "confidence", "eye_contact_score", "timestamp"]
+
+
+class EmotionRetentionJob:
+    def __init__(self, raw_retention_days: float = 30, rollup_retention_days: float = 0,
+                 archive_dir: Optional[str] = "archive/emotion_data", batch_size: int = 5000):
+        self.raw_retention_days = raw_retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_env(cls) -> "EmotionRetentionJob":
+        return cls(
+            raw_retention_days=float(os.getenv("EMOTION_RAW_RETENTION_DAYS", "30")),
+            rollup_retention_days=float(os.getenv("EMOTION_ROLLUP_RETENTION_DAYS", "0")),
+            archive_dir=os.getenv("EMOTION_ARCHIVE_DIR", "archive/emotion_data") or None,
+            batch_size=int(os.getenv("EMOTION_MAINTENANCE_BATCH_SIZE", "5000")),
+        )
+
+    def raw_cutoff(self, now: datetime) -> datetime:
+        return now - timedelta(days=self.raw_retention_days)
+
+    def rollup_cutoff(self, now: datetime) -> Optional[datetime]:
+        return now - timedelta(days=self.rollup_retention_days) if self.rollup_retention_days > 0 else None
+
+    # --- Reporting ---
+
+    def plan(self, db: Session, now: Optional[datetime] = None) -> Dict:
+        """Dry run: what a run would process and roughly how many bytes it would free"""
+        now = now or datetime.utcnow()
+        cutoff = self.raw_cutoff(now)
+        eligible, sessions, oldest = db.execute(
+            select(func.count(), func.count(func.distinct(EmotionData.session_id)), func.min(EmotionData.timestamp))
+            .where(EmotionData.timestamp < cutoff)
+        ).one()
+        total = db.scalar(select(func.count()).select_from(EmotionData))
+
+        rollup_cutoff = self.rollup_cutoff(now)
+        expired_rollups = db.scalar(
+            select(func.count()).select_from(EmotionRollup).where(EmotionRollup.minute < rollup_cutoff)
+        ) if rollup_cutoff else 0
+
+        table_bytes = _sqlite_object_bytes(db, EmotionData.__table__)
+        return {
+            "raw_cutoff": cutoff.isoformat(),
+            "raw_rows_total": total,
+            "raw_rows_eligible": eligible,
+            "sessions_affected": sessions,
+            "oldest_eligible": oldest.isoformat() if oldest else None,
+            "expired_rollups": expired_rollups,
+            # emotion_data table + index pages, scaled by the share of rows that would go
+            "estimated_bytes_reclaimed": int(table_bytes * eligible / total) if table_bytes and total else None,
+        }
+
+    # --- Run ---
+
+    def run(self, db: Session, now: Optional[datetime] = None) -> Dict:
+        now = now or datetime.utcnow()
+        cutoff = self.raw_cutoff(now)
+        started = time.perf_counter()
+        pages_before = _sqlite_pages(db)
+        report = {"raw_rows_deleted": 0, "rollups_created": 0, "rollups_updated": 0,
+                  "archive_files": set(), "archive_bytes": 0, "expired_rollups_deleted": 0}
+
+        while True:
+            rows = db.execute(
+                select(*[getattr(EmotionData, c) for c in ARCHIVE_COLUMNS])
+                .where(EmotionData.timestamp < cutoff)
+                .order_by(EmotionData.id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                break
+            if self.archive_dir:
+                self._archive(rows, report)
+            self._rollup(db, rows, report)
+            # Every row with timestamp < cutoff in [first id, last id] is in this chunk
+            db.execute(delete(EmotionData).where(
+                EmotionData.id.between(rows[0].id, rows[-1].id),
+                EmotionData.timestamp < cutoff
+            ))
+            db.commit()
+            report["raw_rows_deleted"] += len(rows)
+
+        rollup_cutoff = self.rollup_cutoff(now)
+        if rollup_cutoff:
+            result = db.execute(delete(EmotionRollup).where(EmotionRollup.minute < rollup_cutoff))
+            report["expired_rollups_deleted"] = result.rowcount
+            db.commit()
+
+        _analyze_and_vacuum(db)
+
+        pages_after = _sqlite_pages(db)
+        report["archive_files"] = sorted(report["archive_files"])
+        if pages_before and pages_after:
+            page_size = pages_after[0]
+            # File shrink (incremental vacuum) and pages left free inside the file for reuse
+            report["bytes_reclaimed"] = (pages_before[1] - pages_after[1]) * page_size
+            report["free_bytes_in_file"] = pages_after[2] * page_size
+        report["seconds"] = round(time.perf_counter() - started, 2)
+        return report
+
+    def _archive(self, rows, report):
+        by_day = defaultdict(list)
+        for row in rows:
+            by_day[row.timestamp.date()].append(row)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        for day, day_rows in by_day.items():
+            path = self.archive_dir / f"emotion_data_{day.isoformat()}.csv.gz"
+            is_new = not path.exists()
+            before = 0 if is_new else path.stat().st_size
+            # Appending writes another gzip member; readers see one continuous CSV
+            with open(path, "ab") as raw:
+                with gzip.open(raw, "wt", newline="") as out:
+                    writer = csv.writer(out)
+                    if is_new:
+                        writer.writerow(ARCHIVE_COLUMNS)
+                    writer.writerows(
+                        [row.id, row.user_id, row.session_id, row.emotion, row.confidence,
+                         row.eye_contact_score, row.timestamp.isoformat()] for row in day_rows
+                    )
+                # The gzip member is complete once its writer is closed
+                raw.flush()
+                os.fsync(raw.fileno())
+            report["archive_files"].add(str(path))
+            report["archive_bytes"] += path.stat().st_size - before
+
+    def _rollup(self, db: Session, rows, report):
+        buckets = {}
+        for row in rows:
+            key = (row.user_id, row.session_id, row.timestamp.replace(second=0, microsecond=0))
+            bucket = buckets.setdefault(key, {"samples": 0, "confidence": 0.0, "eye_contact": 0.0, "counts": {}})
+            bucket["samples"] += 1
+            bucket["confidence"] += row.confidence
+            bucket["eye_contact"] += row.eye_contact_score or 0.0
+            bucket["counts"][row.emotion] = bucket["counts"].get(row.emotion, 0) + 1
+
+        # Minutes that straddle two chunks already have a rollup row; merge into it
+        minutes = [key[2] for key in buckets]
+        existing = {
+            (r.user_id, r.session_id, r.minute): r
+            for r in db.scalars(select(EmotionRollup).where(
+                EmotionRollup.user_id.in_({key[0] for key in buckets}),
+                EmotionRollup.minute.between(min(minutes), max(minutes))
+            ))
+        }
+        for key, bucket in buckets.items():
+            rollup = existing.get(key)
+            if rollup is None:
+                db.add(EmotionRollup(
+                    user_id=key[0], session_id=key[1], minute=key[2],
+                    samples=bucket["samples"],
+                    average_confidence=bucket["confidence"] / bucket["samples"],
+                    average_eye_contact=bucket["eye_contact"] / bucket["samples"],
+                    emotion_counts=bucket["counts"],
+                ))
+                report["rollups_created"] += 1
+                continue
+            total = rollup.samples + bucket["samples"]
+            rollup.average_confidence = (rollup.average_confidence * rollup.samples + bucket["confidence"]) / total
+            rollup.average_eye_contact = (rollup.average_eye_contact * rollup.samples + bucket["eye_contact"]) / total
+            counts = dict(rollup.emotion_counts)
+            for emotion, count in bucket["counts"].items():
+                counts[emotion] = counts.get(emotion, 0) + count
+            rollup.emotion_counts = counts
+            rollup.samples = total
+            report["rollups_updated"] += 1
+
+
+def _is_sqlite(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def _sqlite_pages(db: Session):
+    """(page_size, page_count, freelist_count) for SQLite databases, else None"""
+    if not _is_sqlite(db):
+        return None
+    return tuple(db.execute(text(f"PRAGMA {name}")).scalar() for name in ("page_size", "page_count", "freelist_count"))
+
+
+def _sqlite_object_bytes(db: Session, table) -> Optional[int]:
+    """Bytes used by a table and its indexes, from the dbstat virtual table when SQLite has it"""
+    if not _is_sqlite(db):
+        return None
+    names = [table.name] + [index.name for index in table.indexes]
+    try:
+        return db.execute(
+            text("SELECT SUM(pgsize) FROM dbstat WHERE name IN (%s)" % ", ".join(f"'{n}'" for n in names))
+        ).scalar() or 0
+    except Exception:
+        db.rollback()
+        return None
+
+
+def _analyze_and_vacuum(db: Session):
+    db.execute(text("ANALYZE"))
+    db.commit()
+    if _is_sqlite(db) and db.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+        # pysqlite steps a PRAGMA once, freeing a single page; executescript runs it to completion
+        db.connection().connection.driver_connection.executescript("PRAGMA incremental_vacuum;")
+        db.commit()
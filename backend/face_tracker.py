@@ -0,0 +1,178 @@
+"""
+Face region-of-interest stage ahead of the emotion CNN.
+
+The face is detected once with OpenCV's Haar cascade and then followed across
+frames by template matching in a small search window around the previous ROI.
+Full detection only runs again when the match is lost or every
+``redetect_every`` frames, so most frames cost one small matchTemplate call.
+
+OpenCV 5 moved CascadeClassifier out of the main package. When the installed
+build has no usable cascade, tracking is disabled with a warning and frames
+are classified whole, as with EMOTION_FACE_TRACKING=false.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import cv2
+
+Box = Tuple[int, int, int, int]
+
+_CASCADE_FILE = "haarcascade_frontalface_default.xml"
+
+
+def load_face_detector():
+    """The Haar face cascade, or None when this OpenCV build can't provide one"""
+    data = getattr(cv2, "data", None)
+    if not hasattr(cv2, "CascadeClassifier") or data is None:
+        return None
+    detector = cv2.CascadeClassifier(os.path.join(data.haarcascades, _CASCADE_FILE))
+    return None if detector.empty() else detector
+
+
+class FaceROITracker:
+    def __init__(self, redetect_every: int = 15, min_match: float = 0.6,
+                 search_margin: float = 0.5, detect_width: int = 320, detector=None):
+        self.redetect_every = redetect_every
+        self.min_match = min_match
+        self.search_margin = search_margin
+        self.detect_width = detect_width
+        # Anything with a cascade's detectMultiScale; without one every frame is used whole
+        self._detector = detector if detector is not None else load_face_detector()
+        self._roi: Optional[Box] = None
+        self._template: Optional[np.ndarray] = None
+        self._since_detect = 0
+        self._lock = threading.Lock()
+
+        # Stats
+        self.frames = 0
+        self.detections = 0
+        self.tracked = 0
+        self.lost = 0
+
+    def reset(self):
+        self._roi = None
+        self._template = None
+
+    def _detect(self, gray: np.ndarray) -> Optional[Box]:
+        if self._detector is None:
+            return None
+        self.detections += 1
+        self._since_detect = 0
+
+        # Detect on a downscaled copy; cascades don't need full resolution
+        scale = min(1.0, self.detect_width / gray.shape[1])
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+        faces = self._detector.detectMultiScale(small, scaleFactor=1.2, minNeighbors=5, minSize=(24, 24))
+        if len(faces) == 0:
+            return None
+
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        return tuple(int(round(v / scale)) for v in (x, y, w, h))
+
+    def _track(self, gray: np.ndarray) -> Optional[Box]:
+        x, y, w, h = self._roi
+        mx, my = int(w * self.search_margin), int(h * self.search_margin)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(gray.shape[1], x + w + mx), min(gray.shape[0], y + h + my)
+        window = gray[y0:y1, x0:x1]
+        if window.shape[0] < h or window.shape[1] < w:
+            return None
+
+        scores = cv2.matchTemplate(window, self._template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (bx, by) = cv2.minMaxLoc(scores)
+        if best < self.min_match:
+            return None
+        return (x0 + bx, y0 + by, w, h)
+
+    def locate(self, gray: np.ndarray) -> Optional[Box]:
+        """Face box (x, y, w, h) in ``gray``, or None if no face is found"""
+        with self._lock:
+            return self._locate(gray)
+
+    def _locate(self, gray: np.ndarray) -> Optional[Box]:
+        self.frames += 1
+        self._since_detect += 1
+
+        roi = None
+        if self._roi is not None and self._since_detect < self.redetect_every:
+            roi = self._track(gray)
+            if roi is None:
+                self.lost += 1
+            else:
+                self.tracked += 1
+        if roi is None:
+            roi = self._detect(gray)
+
+        self._roi = roi
+        if roi is not None:
+            x, y, w, h = roi
+            self._template = gray[y:y + h, x:x + w].copy()
+        return roi
+
+    def crop(self, gray: np.ndarray) -> np.ndarray:
+        """Face crop of ``gray``, falling back to the whole frame when no face is found"""
+        roi = self.locate(gray)
+        if roi is None:
+            return gray
+        x, y, w, h = roi
+        return gray[y:y + h, x:x + w]
+
+    def stats(self) -> Dict:
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "tracked": self.tracked,
+            "lost": self.lost,
+        }
+
+
+class FaceTrackerRegistry:
+    """One tracker per session/stream, bounded LRU"""
+
+    def __init__(self, enabled: bool = True, redetect_every: int = 15, max_sessions: int = 1000):
+        if enabled and load_face_detector() is None:
+            print(f"⚠️  OpenCV {cv2.__version__} has no usable Haar face cascade; face tracking is disabled "
+                  f"and whole frames are classified (install opencv-python<5)")
+            enabled = False
+        self.enabled = enabled
+        self.redetect_every = redetect_every
+        self.max_sessions = max_sessions
+        self._trackers: "OrderedDict[str, FaceROITracker]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FaceTrackerRegistry":
+        return cls(
+            enabled=os.getenv("EMOTION_FACE_TRACKING", "true").lower() == "true",
+            redetect_every=int(os.getenv("EMOTION_FACE_REDETECT_EVERY", "15")),
+            max_sessions=int(os.getenv("EMOTION_CACHE_MAX_SESSIONS", "1000")),
+        )
+
+    def get(self, key: str) -> Optional[FaceROITracker]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = FaceROITracker(redetect_every=self.redetect_every)
+                if len(self._trackers) > self.max_sessions:
+                    self._trackers.popitem(last=False)
+            else:
+                self._trackers.move_to_end(key)
+            return tracker
+
+    def discard(self, key: str):
+        with self._lock:
+            self._trackers.pop(key, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            trackers = list(self._trackers.values())
+        totals = {"sessions": len(trackers), "enabled": self.enabled}
+        for tracker in trackers:
+            for name, value in tracker.stats().items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
@@ -0,0 +1,128 @@
+"""
+Near-duplicate frame skipping for emotion inference.
+
+Each preprocessed 48x48 frame gets a 64-bit average hash (8x8 block means
+thresholded at the frame mean). When a frame is within ``max_distance`` bits of
+a recent frame from the same session, that frame's prediction is reused.
+Every ``audit_every``-th hit is predicted anyway and compared with the cached
+result, so drift is measured rather than assumed.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+
+def average_hash(frame: np.ndarray) -> int:
+    """64-bit perceptual hash of a (48, 48[, 1]) grayscale frame"""
+    blocks = frame.reshape(8, 6, 8, 6).mean(axis=(1, 3))
+    bits = (blocks > blocks.mean()).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+class CacheLookup(NamedTuple):
+    frame_hash: int
+    cached: Optional[np.ndarray]
+    audit: bool
+
+
+class _SessionCache:
+    def __init__(self, window: int):
+        self.entries = deque(maxlen=window)  # (hash, preds, stored_at)
+
+
+class FrameCacheRegistry:
+    def __init__(self, max_distance: int = 4, window: int = 8, max_age_seconds: float = 2.0,
+                 audit_every: int = 20, max_sessions: int = 1000, enabled: bool = True):
+        self.max_distance = max_distance
+        self.window = window
+        self.max_age_seconds = max_age_seconds
+        self.audit_every = audit_every
+        self.max_sessions = max_sessions
+        self.enabled = enabled
+        self._sessions: "OrderedDict[str, _SessionCache]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.lookups = 0
+        self.hits = 0
+        self.audits = 0
+        self.audit_mismatches = 0
+
+    @classmethod
+    def from_env(cls) -> "FrameCacheRegistry":
+        return cls(
+            max_distance=int(os.getenv("EMOTION_CACHE_MAX_DISTANCE", "4")),
+            window=int(os.getenv("EMOTION_CACHE_WINDOW", "8")),
+            max_age_seconds=float(os.getenv("EMOTION_CACHE_MAX_AGE_SECONDS", "2")),
+            audit_every=int(os.getenv("EMOTION_CACHE_AUDIT_EVERY", "20")),
+            max_sessions=int(os.getenv("EMOTION_CACHE_MAX_SESSIONS", "1000")),
+            enabled=os.getenv("EMOTION_CACHE_ENABLED", "true").lower() == "true",
+        )
+
+    def _session(self, key: str) -> _SessionCache:
+        cache = self._sessions.get(key)
+        if cache is None:
+            cache = self._sessions[key] = _SessionCache(self.window)
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(key)
+        return cache
+
+    def lookup(self, key: str, frame: np.ndarray) -> CacheLookup:
+        """Find a cached prediction for a near-duplicate of ``frame`` in session ``key``"""
+        frame_hash = average_hash(frame)
+        if not self.enabled:
+            return CacheLookup(frame_hash, None, False)
+
+        now = time.monotonic()
+        with self._lock:
+            self.lookups += 1
+            best, best_distance = None, self.max_distance + 1
+            for entry_hash, preds, stored_at in self._session(key).entries:
+                if now - stored_at > self.max_age_seconds:
+                    continue
+                distance = (entry_hash ^ frame_hash).bit_count()
+                if distance < best_distance:
+                    best, best_distance = preds, distance
+            if best is None:
+                return CacheLookup(frame_hash, None, False)
+
+            self.hits += 1
+            audit = self.audit_every > 0 and self.hits % self.audit_every == 0
+            return CacheLookup(frame_hash, best, audit)
+
+    def record(self, key: str, lookup: CacheLookup, preds: np.ndarray):
+        """Store a fresh prediction; for audited hits also compare it with the cached one"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if lookup.audit and lookup.cached is not None:
+                self.audits += 1
+                if int(np.argmax(lookup.cached)) != int(np.argmax(preds)):
+                    self.audit_mismatches += 1
+            self._session(key).entries.append((lookup.frame_hash, preds, time.monotonic()))
+
+    def discard(self, key: str):
+        """Drop a session's cache, e.g. when the session ends"""
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_distance": self.max_distance,
+                "sessions": len(self._sessions),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "audits": self.audits,
+                "audit_mismatches": self.audit_mismatches,
+                # Share of audited hits whose reused label differed from a fresh prediction
+                "drift_rate": self.audit_mismatches / self.audits if self.audits else 0.0,
+            }
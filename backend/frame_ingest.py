@@ -0,0 +1,100 @@
+"""
+Frame ingestion for the emotion analysis endpoints.
+
+Frames can arrive as:
+  * raw JPEG/PNG bodies (Content-Type: image/jpeg, image/png or application/octet-stream)
+    with ``session_id`` in the query string,
+  * multipart uploads with a ``frame`` (or ``file``) part and optional ``session_id`` field,
+  * the legacy JSON body ``{"frame_data": "<base64>", "session_id": ...}``.
+
+The binary forms skip the base64 inflation and the JSON parse of the whole frame.
+"""
+import base64
+import binascii
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from schemas import EmotionAnalysisRequest
+
+RAW_FRAME_TYPES = ("image/jpeg", "image/png", "application/octet-stream")
+
+# OpenAPI description of the accepted bodies, for routes that read the request directly
+FRAME_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": EmotionAnalysisRequest.model_json_schema()},
+            "image/jpeg": {"schema": {"type": "string", "format": "binary"}},
+            "image/png": {"schema": {"type": "string", "format": "binary"}},
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "frame": {"type": "string", "format": "binary"},
+                        "session_id": {"type": "integer"},
+                    },
+                    "required": ["frame"],
+                }
+            },
+        },
+    }
+}
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _parse_session_id(value) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise _bad_request("session_id must be an integer")
+
+
+def decode_base64_frame(frame_data: str) -> bytes:
+    # Browsers send canvas.toDataURL() output, so strip any "data:image/...;base64," prefix
+    if frame_data.startswith("data:"):
+        frame_data = frame_data.split(",", 1)[-1]
+    try:
+        return base64.b64decode(frame_data, validate=False)
+    except (binascii.Error, ValueError):
+        raise _bad_request("frame_data is not valid base64")
+
+
+async def read_frame_request(request: Request) -> Tuple[bytes, Optional[int]]:
+    """Return (encoded image bytes, session_id) from any of the supported request forms"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    session_id = _parse_session_id(request.query_params.get("session_id"))
+
+    if content_type in RAW_FRAME_TYPES:
+        frame = await request.body()
+    elif content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("frame") or form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise _bad_request("Multipart upload must include a 'frame' file")
+        frame = await upload.read()
+        session_id = _parse_session_id(form.get("session_id")) or session_id
+    elif content_type in ("application/json", ""):
+        try:
+            payload = EmotionAnalysisRequest.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        frame = decode_base64_frame(payload.frame_data)
+        session_id = payload.session_id if payload.session_id is not None else session_id
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported frame content type '{content_type}'",
+        )
+
+    if not frame:
+        raise _bad_request("Empty frame")
+    return frame, session_id
+
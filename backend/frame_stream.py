@@ -0,0 +1,40 @@
+"""
+Helpers for the per-session WebSocket frame stream.
+
+``LatestFrameQueue`` applies backpressure by dropping the oldest pending frame
+when the client sends faster than inference keeps up.
+"""
+import asyncio
+from collections import deque
+from typing import Optional
+
+
+class LatestFrameQueue:
+    """Bounded async queue that drops the oldest frame instead of blocking the producer"""
+
+    def __init__(self, max_pending: int = 2):
+        self._frames = deque(maxlen=max_pending)
+        self._available = asyncio.Event()
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame: bytes):
+        if len(self._frames) == self._frames.maxlen:
+            self.dropped += 1
+        self._frames.append(frame)
+        self.received += 1
+        self._available.set()
+
+    def close(self):
+        self._closed = True
+        self._available.set()
+
+    async def get(self) -> Optional[bytes]:
+        """Next frame, or None once closed and drained"""
+        while not self._frames:
+            if self._closed:
+                return None
+            self._available.clear()
+            await self._available.wait()
+        return self._frames.popleft()
@@ -0,0 +1,126 @@
+"""
+CPU inference backends for the emotion classifier.
+
+Every backend exposes ``predict(batch)`` taking a float32 (N, 48, 48, 1) array
+and returning float32 (N, len(class_names)) scores, so the registry and the
+micro-batcher don't care which runtime is underneath. Runtimes are imported
+only when their backend is loaded.
+"""
+import os
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, model_path: str):
+        from tensorflow.keras.models import load_model
+        self.model_path = model_path
+        self.model = load_model(model_path, compile=False)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict(batch, verbose=0), dtype=np.float32)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model_path: str):
+        import onnxruntime as ort
+        self.model_path = model_path
+
+        options = ort.SessionOptions()
+        threads = int(os.getenv("EMOTION_INTRA_OP_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        outputs = self.session.run(None, {self.input_name: batch.astype(np.float32, copy=False)})
+        return np.asarray(outputs[0], dtype=np.float32)
+
+
+class TFLiteBackend:
+    """TFLite interpreter; handles both float and int8-quantized models"""
+    name = "tflite"
+
+    def __init__(self, model_path: str):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.model_path = model_path
+
+        threads = int(os.getenv("EMOTION_INTRA_OP_THREADS", "0")) or None
+        self.interpreter = Interpreter(model_path=model_path, num_threads=threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self.input["shape"][0])
+
+    def _resize(self, batch_size: int):
+        self.interpreter.resize_tensor_input(self.input["index"], [batch_size, 48, 48, 1])
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if batch.shape[0] != self._batch_size:
+            self._resize(batch.shape[0])
+
+        dtype = self.input["dtype"]
+        if dtype != np.float32:
+            # Quantize the input using the model's own scale/zero-point
+            scale, zero_point = self.input["quantization"]
+            info = np.iinfo(dtype)
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+        self.interpreter.set_tensor(self.input["index"], batch)
+        self.interpreter.invoke()
+
+        out = self.interpreter.get_tensor(self.output["index"])
+        if self.output["dtype"] != np.float32:
+            scale, zero_point = self.output["quantization"]
+            out = (out.astype(np.float32) - zero_point) * scale
+        return np.asarray(out, dtype=np.float32)
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "onnx": OnnxBackend,
+    "tflite": TFLiteBackend,
+    "tflite-int8": TFLiteBackend,
+}
+
+# Artifact suffix written by convert_model.py for each backend
+ARTIFACT_SUFFIXES = {
+    "keras": ".h5",
+    "onnx": ".onnx",
+    "tflite": ".tflite",
+    "tflite-int8": "_int8.tflite",
+}
+
+
+def artifact_path(keras_model_path: str, backend: str) -> str:
+    """Path of the converted artifact for ``backend`` next to the Keras model"""
+    if backend not in ARTIFACT_SUFFIXES:
+        raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    path = Path(keras_model_path)
+    return str(path.with_name(path.stem + ARTIFACT_SUFFIXES[backend]))
+
+
+def create_backend(backend: str, keras_model_path: str):
+    """Instantiate ``backend`` using the artifact derived from the Keras model path"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](artifact_path(keras_model_path, backend))
+
+
+def available_backends(keras_model_path: str) -> Dict[str, bool]:
+    """Which backend artifacts exist on disk"""
+    return {name: Path(artifact_path(keras_model_path, name)).exists() for name in BACKENDS}
@@ -0,0 +1,294 @@
+"""
+Process-pool emotion inference.
+
+Decoding, preprocessing and prediction run in N worker processes, each with
+its own copy of the model, so a slow frame never holds the event loop or the
+GIL of the API worker. Frame bytes are handed over through a shared-memory
+ring of fixed-size slots; only the slot index and length are pickled.
+
+The pool is ready once every worker has loaded and warmed its model: one
+ping per worker, each held at a barrier until all of them arrive, so no
+worker can answer twice. If a worker process dies the executor is broken for
+good; the pool then reports not-ready and rebuilds the executor and the slot
+ring in the background (with backoff if the rebuilt pool dies again).
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+import numpy as np
+
+# Per-process state, populated by _init_worker
+_worker_shm = None
+_worker_slot_size = 0
+_worker_backend = None
+_worker_batch = None
+_worker_barrier = None
+
+# Seconds a warmed-up worker waits at the barrier for the slowest model load
+WARMUP_TIMEOUT = float(os.getenv("EMOTION_POOL_WARMUP_TIMEOUT_SECONDS", "300"))
+
+
+class PoolRestarting(RuntimeError):
+    """The pool lost a worker and is being rebuilt; retry shortly"""
+
+
+def _init_worker(shm_name: str, slot_size: int, model_path: str, backend: str, barrier=None):
+    global _worker_shm, _worker_slot_size, _worker_backend, _worker_batch, _worker_barrier
+    import cv2
+    from inference_backends import create_backend
+    from preprocessing import FrameBatchBuffer
+
+    # One model copy per process; keep OpenCV from spawning its own thread pool too
+    cv2.setNumThreads(1)
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_slot_size = slot_size
+    _worker_backend = create_backend(backend, model_path)
+    _worker_batch = FrameBatchBuffer(1)
+    _worker_backend.predict(np.zeros((1, 48, 48, 1), dtype="float32"))
+    _worker_barrier = barrier
+
+
+def _predict_bytes(image_bytes) -> Optional[np.ndarray]:
+    from preprocessing import preprocess_image_bytes
+
+    frame = preprocess_image_bytes(image_bytes)
+    if frame is None:
+        return None
+    return _worker_backend.predict(_worker_batch.fill([frame]))[0].copy()
+
+
+def _infer_slot(slot: int, length: int) -> Optional[np.ndarray]:
+    offset = slot * _worker_slot_size
+    view = _worker_shm.buf[offset:offset + length]
+    try:
+        return _predict_bytes(view)
+    finally:
+        view.release()
+
+
+def _ping() -> int:
+    # Hold this worker until every worker has been initialized, so each ping lands on a different one
+    if _worker_barrier is not None:
+        _worker_barrier.wait(timeout=WARMUP_TIMEOUT)
+    return os.getpid()
+
+
+class InferencePool:
+    def __init__(self, processes: int, model_path: str, backend: str = "keras",
+                 slot_size: int = 1 << 20, slots_per_process: int = 16):
+        self.processes = processes
+        self.model_path = model_path
+        self.backend = backend
+        self.slot_size = slot_size
+        self.slot_count = processes * slots_per_process
+        self._shm = None
+        self._executor = None
+        self._free_slots = []
+        self._lock = threading.Lock()
+        self._ready = False
+        # Bumped on every (re)build; callbacks from an older executor must not touch the new one
+        self._generation = 0
+        self._rebuilding = False
+        self._stopping = False
+        self._failed_builds = 0
+
+        # Stats
+        self.restarts = 0
+        self._requests = 0
+        self._shm_requests = 0
+        self._pickled_requests = 0
+        self._total_ms = 0.0
+
+    @classmethod
+    def from_env(cls, model_path: str, backend: str) -> "InferencePool":
+        """Size the pool from EMOTION_POOL_PROCS_PER_CORE (and optionally EMOTION_POOL_PROCESSES)"""
+        per_core = float(os.getenv("EMOTION_POOL_PROCS_PER_CORE", "1"))
+        processes = int(os.getenv("EMOTION_POOL_PROCESSES", "0")) or max(1, int((os.cpu_count() or 1) * per_core))
+        return cls(
+            processes,
+            model_path,
+            backend=backend,
+            slot_size=int(os.getenv("EMOTION_POOL_SLOT_BYTES", str(1 << 20))),
+            slots_per_process=int(os.getenv("EMOTION_POOL_SLOTS_PER_PROCESS", "16")),
+        )
+
+    def start(self):
+        if self._executor is not None:
+            return
+        self._stopping = False
+        self._build()
+
+    def _build(self):
+        context = multiprocessing.get_context("spawn")
+        shm = shared_memory.SharedMemory(create=True, size=self.slot_size * self.slot_count)
+        barrier = context.Barrier(self.processes)
+        # spawn, not fork: the parent may already hold TensorFlow/OpenCV threads
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(shm.name, self.slot_size, self.model_path, self.backend, barrier),
+        )
+        with self._lock:
+            self._shm = shm
+            self._executor = executor
+            self._free_slots = list(range(self.slot_count))
+            self._generation += 1
+            self._ready = False
+            generation = self._generation
+        self._warm_up(executor, generation)
+
+    def _warm_up(self, executor: ProcessPoolExecutor, generation: int):
+        """One ping per worker; ready once every worker has answered from its own process"""
+        pings = [executor.submit(_ping) for _ in range(self.processes)]
+        pids = set()
+        remaining = [len(pings)]
+
+        def _on_ping(ping: Future):
+            if ping.cancelled():
+                return
+            error = ping.exception()
+            with self._lock:
+                if generation != self._generation:
+                    return
+                remaining[0] -= 1
+                if error is None:
+                    pids.add(ping.result())
+                ready = remaining[0] == 0 and len(pids) == self.processes
+                if ready:
+                    self._ready = True
+                    self._failed_builds = 0
+            if ready:
+                print(f"✅ Inference pool ready with {self.processes} processes ({self.backend})")
+            elif error is not None:
+                print(f"⚠️  Inference pool warm-up failed: {error!r}")
+                self._handle_broken(generation)
+
+        for ping in pings:
+            ping.add_done_callback(_on_ping)
+
+    def _handle_broken(self, generation: int):
+        """A worker died (or failed to start): go not-ready and rebuild once per broken executor"""
+        with self._lock:
+            if generation != self._generation or self._rebuilding or self._stopping:
+                return
+            self._rebuilding = True
+            self._ready = False
+            self._failed_builds += 1
+        print("⚠️  Inference pool lost a worker process; rebuilding")
+        threading.Thread(target=self._rebuild, name="inference-pool-rebuild", daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            self._teardown(wait=False)
+            # Back off when rebuilt pools keep dying (e.g. a model that crashes on load)
+            time.sleep(min(30.0, 0.5 * 2 ** (self._failed_builds - 1)))
+            if not self._stopping:
+                self._build()
+                with self._lock:
+                    self.restarts += 1
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _teardown(self, wait: bool):
+        with self._lock:
+            executor, shm = self._executor, self._shm
+            self._executor = None
+            self._shm = None
+            self._ready = False
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    def is_ready(self) -> bool:
+        return self._ready
+
+    def shutdown(self):
+        self._stopping = True
+        self._teardown(wait=True)
+
+    def _acquire_slot(self) -> Optional[int]:
+        with self._lock:
+            return self._free_slots.pop() if self._free_slots else None
+
+    def _release_slot(self, slot: int, generation: int):
+        with self._lock:
+            # Slots of a torn-down ring are gone with it
+            if generation == self._generation:
+                self._free_slots.append(slot)
+
+    def submit(self, image_bytes: bytes) -> Future:
+        """Queue encoded image bytes; the future resolves to a score row or None if undecodable"""
+        with self._lock:
+            executor, shm, generation = self._executor, self._shm, self._generation
+            restarting = self._rebuilding
+        if executor is None:
+            if restarting:
+                raise PoolRestarting("Inference pool is restarting")
+            raise RuntimeError("Inference pool is not started")
+
+        started = time.perf_counter()
+        slot = self._acquire_slot() if len(image_bytes) <= self.slot_size else None
+        try:
+            if slot is not None:
+                offset = slot * self.slot_size
+                shm.buf[offset:offset + len(image_bytes)] = image_bytes
+                future = executor.submit(_infer_slot, slot, len(image_bytes))
+                future.add_done_callback(lambda _: self._release_slot(slot, generation))
+            else:
+                # All slots busy (or frame too large): fall back to pickling the bytes
+                future = executor.submit(_predict_bytes, bytes(image_bytes))
+        except (BrokenProcessPool, RuntimeError) as e:
+            # Broken, or shut down by a rebuild between the lookup above and the submit
+            if slot is not None:
+                self._release_slot(slot, generation)
+            self._handle_broken(generation)
+            raise PoolRestarting("Inference pool is restarting") from e
+
+        def _on_done(done: Future):
+            self._record(slot is not None, started)
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                self._handle_broken(generation)
+
+        future.add_done_callback(_on_done)
+        return future
+
+    async def predict_async(self, image_bytes: bytes) -> Optional[np.ndarray]:
+        try:
+            return await asyncio.wrap_future(self.submit(image_bytes))
+        except BrokenProcessPool as e:
+            raise PoolRestarting("Inference pool lost a worker; retry shortly") from e
+
+    def _record(self, used_shm: bool, started: float):
+        with self._lock:
+            self._requests += 1
+            if used_shm:
+                self._shm_requests += 1
+            else:
+                self._pickled_requests += 1
+            self._total_ms += (time.perf_counter() - started) * 1000.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "ready": self._ready,
+                "restarts": self.restarts,
+                "rebuilding": self._rebuilding,
+                "slots": self.slot_count,
+                "free_slots": len(self._free_slots),
+                "requests": self._requests,
+                "shared_memory_requests": self._shm_requests,
+                "pickled_requests": self._pickled_requests,
+                "avg_latency_ms": self._total_ms / self._requests if self._requests else 0.0,
+            }
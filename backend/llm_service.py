@@ -1,5 +1,8 @@
 import openai
+import httpx
 import os
+import threading
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
 import json
@@ -8,90 +11,209 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+MODEL = "gpt-3.5-turbo"
+
 class LLMService:
-    def __init__(self):
-        # Initialize OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
+    """OpenAI-backed interview analysis with local fallbacks.
+
+    Every public method has an ``a``-prefixed async twin built on
+    ``AsyncOpenAI`` for use from ``async def`` handlers, where the sync
+    client would block the event loop for the whole completion. Both
+    clients keep a bounded keep-alive connection pool shared by all calls
+    (LLM_MAX_CONNECTIONS), and every call carries its own timeout
+    (LLM_TIMEOUT_SECONDS, or ``timeout=``); a timeout or API error falls
+    back to the canned answers just like a missing API key.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 timeout: Optional[float] = None, max_connections: Optional[int] = None,
+                 max_retries: Optional[int] = None):
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        # OPENAI_BASE_URL points the clients at a proxy or a local fake server
+        base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.timeout = timeout if timeout is not None else float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+        self.max_connections = max_connections or int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+        max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "1"))
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.in_flight = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self._total_ms = 0.0
+        self.max_ms = 0.0
+
+        # Initialize OpenAI clients
         if not api_key or api_key == "your_openai_api_key_here":
             print("⚠️  OpenAI API key not set or using placeholder - LLM features will use fallback mode")
             self.client = None
+            self.async_client = None
         else:
             try:
-                self.client = openai.OpenAI(api_key=api_key)
+                limits = httpx.Limits(max_connections=self.max_connections,
+                                      max_keepalive_connections=self.max_connections)
+                self.client = openai.OpenAI(
+                    api_key=api_key, base_url=base_url, timeout=self.timeout, max_retries=max_retries,
+                    http_client=openai.DefaultHttpxClient(limits=limits),
+                )
+                self.async_client = openai.AsyncOpenAI(
+                    api_key=api_key, base_url=base_url, timeout=self.timeout, max_retries=max_retries,
+                    http_client=openai.DefaultAsyncHttpxClient(limits=limits),
+                )
                 print("✅ OpenAI client initialized successfully")
             except Exception as e:
                 print(f"⚠️  Failed to initialize OpenAI client: {e} - using fallback mode")
                 self.client = None
+                self.async_client = None
+
+    async def aclose(self):
+        """Close the async client's connection pool (on shutdown)"""
+        if self.async_client is not None:
+            await self.async_client.close()
+
+    def _record(self, started: float, error: Optional[Exception] = None):
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self.in_flight -= 1
+            self._total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            if isinstance(error, openai.APITimeoutError):
+                self.timeouts += 1
+            elif error is not None:
+                self.errors += 1
+
+    def _start(self) -> float:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+        return time.perf_counter()
+
+    def _complete(self, messages: List[Dict], max_tokens: int, timeout: Optional[float]) -> str:
+        started = self._start()
+        try:
+            response = self.client.chat.completions.create(
+                model=MODEL, messages=messages, max_tokens=max_tokens, temperature=0.7,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+        except Exception as e:
+            self._record(started, e)
+            raise
+        self._record(started)
+        return response.choices[0].message.content.strip()
+
+    async def _acomplete(self, messages: List[Dict], max_tokens: int, timeout: Optional[float]) -> str:
+        started = self._start()
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=MODEL, messages=messages, max_tokens=max_tokens, temperature=0.7,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+        except Exception as e:
+            self._record(started, e)
+            raise
+        self._record(started)
+        return response.choices[0].message.content.strip()
+
+    def _fallback(self, fallback):
+        with self._lock:
+            self.fallbacks += 1
+        return fallback
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            completed = self.calls - self.in_flight
+            return {
+                "enabled": self.async_client is not None,
+                "timeout_s": self.timeout,
+                "max_connections": self.max_connections,
+                "calls": self.calls,
+                "in_flight": self.in_flight,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "fallbacks": self.fallbacks,
+                "avg_ms": round(self._total_ms / completed, 1) if completed else 0.0,
+                "max_ms": round(self.max_ms, 1),
+            }
+
+    @staticmethod
+    def _analysis_messages(question: str, answer: str) -> List[Dict]:
+        prompt = f"""
+        You are an expert interview coach. Analyze this interview response and provide detailed feedback.
+        
+        Question: {question}
+        Answer: {answer}
         
-    def analyze_interview_response(self, question: str, answer: str) -> Dict:
+        Please provide a structured analysis in JSON format with the following fields:
+        {{
+            "score": <integer from 0-100>,
+            "overall_feedback": "<string>",
+            "strengths": ["<strength1>", "<strength2>", ...],
+            "improvements": ["<improvement1>", "<improvement2>", ...],
+            "communication_score": <integer from 0-100>,
+            "relevance_score": <integer from 0-100>,
+            "confidence_score": <integer from 0-100>,
+            "specific_suggestions": ["<suggestion1>", "<suggestion2>", ...]
+        }}
+        
+        Focus on:
+        - Clarity and structure of the response
+        - Relevance to the question
+        - Use of specific examples
+        - Communication skills
+        - Confidence level
+        - Areas for improvement
+        """
+        return [
+            {"role": "system", "content": "You are an expert interview coach providing detailed, constructive feedback."},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _parse_json_object(text: str) -> Optional[Dict]:
+        """The first {...} span of a completion, or None if there is none or it is not JSON"""
+        start_idx = text.find('{')
+        end_idx = text.rfind('}') + 1
+        if start_idx == -1 or end_idx == 0:
+            return None
+        try:
+            return json.loads(text[start_idx:end_idx])
+        except json.JSONDecodeError:
+            return None
+
+    @staticmethod
+    def _parse_json_list(text: str) -> Optional[List]:
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return parsed if isinstance(parsed, list) else []
+
+    def analyze_interview_response(self, question: str, answer: str, timeout: Optional[float] = None) -> Dict:
         """
         Analyze an interview response using LLM to provide detailed feedback
         """
         if not self.client:
             print("OpenAI client not available, using fallback analysis")
-            return self._create_fallback_feedback(question, answer)
-            
+            return self._fallback(self._create_fallback_feedback(question, answer))
         try:
-            prompt = f"""
-            You are an expert interview coach. Analyze this interview response and provide detailed feedback.
-            
-            Question: {question}
-            Answer: {answer}
-            
-            Please provide a structured analysis in JSON format with the following fields:
-            {{
-                "score": <integer from 0-100>,
-                "overall_feedback": "<string>",
-                "strengths": ["<strength1>", "<strength2>", ...],
-                "improvements": ["<improvement1>", "<improvement2>", ...],
-                "communication_score": <integer from 0-100>,
-                "relevance_score": <integer from 0-100>,
-                "confidence_score": <integer from 0-100>,
-                "specific_suggestions": ["<suggestion1>", "<suggestion2>", ...]
-            }}
-            
-            Focus on:
-            - Clarity and structure of the response
-            - Relevance to the question
-            - Use of specific examples
-            - Communication skills
-            - Confidence level
-            - Areas for improvement
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert interview coach providing detailed, constructive feedback."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            # Parse the JSON response
-            feedback_text = response.choices[0].message.content.strip()
-            
-            # Try to extract JSON from the response
-            try:
-                # Look for JSON in the response
-                start_idx = feedback_text.find('{')
-                end_idx = feedback_text.rfind('}') + 1
-                if start_idx != -1 and end_idx != 0:
-                    json_str = feedback_text[start_idx:end_idx]
-                    feedback = json.loads(json_str)
-                else:
-                    # Fallback if no JSON found
-                    feedback = self._create_fallback_feedback(question, answer)
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                feedback = self._create_fallback_feedback(question, answer)
-            
-            return feedback
-            
+            feedback_text = self._complete(self._analysis_messages(question, answer), 1000, timeout)
         except Exception as e:
             print(f"Error in LLM analysis: {str(e)}")
-            return self._create_fallback_feedback(question, answer)
+            return self._fallback(self._create_fallback_feedback(question, answer))
+        return self._parse_json_object(feedback_text) or self._fallback(self._create_fallback_feedback(question, answer))
+
+    async def aanalyze_interview_response(self, question: str, answer: str, timeout: Optional[float] = None) -> Dict:
+        """Async analyze_interview_response"""
+        if not self.async_client:
+            return self._fallback(self._create_fallback_feedback(question, answer))
+        try:
+            feedback_text = await self._acomplete(self._analysis_messages(question, answer), 1000, timeout)
+        except Exception as e:
+            print(f"Error in LLM analysis: {str(e)}")
+            return self._fallback(self._create_fallback_feedback(question, answer))
+        return self._parse_json_object(feedback_text) or self._fallback(self._create_fallback_feedback(question, answer))
     
     def _create_fallback_feedback(self, question: str, answer: str) -> Dict:
         """Create fallback feedback when LLM fails"""
@@ -128,50 +250,60 @@ class LLMService:
             ]
         }
     
-    def generate_interview_questions(self, topic: str, difficulty: str = "medium", count: int = 5) -> List[str]:
+    @staticmethod
+    def _questions_messages(topic: str, difficulty: str, count: int) -> List[Dict]:
+        prompt = f"""
+        Generate {count} interview questions for the topic: {topic}
+        Difficulty level: {difficulty}
+        
+        The questions should be:
+        - Relevant to the topic
+        - Appropriate for the difficulty level
+        - Designed to assess both technical knowledge and soft skills
+        - Mix of behavioral and situational questions
+        
+        Return as a JSON array of strings.
+        """
+        return [
+            {"role": "system", "content": "You are an expert interviewer creating comprehensive interview questions."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def generate_interview_questions(self, topic: str, difficulty: str = "medium", count: int = 5,
+                                     timeout: Optional[float] = None) -> List[str]:
         """Generate interview questions for a specific topic"""
         if not self.client:
             print("OpenAI client not available, using fallback questions")
-            return self._get_fallback_questions(topic, count)
-            
+            return self._fallback(self._get_fallback_questions(topic, count))
         try:
-            prompt = f"""
-            Generate {count} interview questions for the topic: {topic}
-            Difficulty level: {difficulty}
-            
-            The questions should be:
-            - Relevant to the topic
-            - Appropriate for the difficulty level
-            - Designed to assess both technical knowledge and soft skills
-            - Mix of behavioral and situational questions
-            
-            Return as a JSON array of strings.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert interviewer creating comprehensive interview questions."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=800,
-                temperature=0.7
-            )
-            
-            questions_text = response.choices[0].message.content.strip()
-            
-            # Try to parse as JSON array
-            try:
-                questions = json.loads(questions_text)
-                return questions if isinstance(questions, list) else []
-            except json.JSONDecodeError:
-                # Fallback questions based on topic
-                return self._get_fallback_questions(topic, count)
-                
+            questions_text = self._complete(self._questions_messages(topic, difficulty, count), 800, timeout)
         except Exception as e:
             print(f"Error generating interview questions: {str(e)}")
-            return self._get_fallback_questions(topic, count)
+            return self._fallback(self._get_fallback_questions(topic, count))
+        questions = self._parse_json_list(questions_text)
+        return questions if questions is not None else self._fallback(self._get_fallback_questions(topic, count))
+
+    async def agenerate_interview_questions(self, topic: str, difficulty: str = "medium", count: int = 5,
+                                            timeout: Optional[float] = None,
+                                            fallback: bool = True) -> Optional[List[str]]:
+        """Async generate_interview_questions; with ``fallback=False`` returns None instead of canned questions"""
+        fallback_questions = self._get_fallback_questions(topic, count) if fallback else None
+        if not self.async_client:
+            return self._fallback(fallback_questions)
+        try:
+            # A question pool for the cache can be several times the usual size
+            questions_text = await self._acomplete(self._questions_messages(topic, difficulty, count),
+                                                   max(800, 80 * count), timeout)
+        except Exception as e:
+            print(f"Error generating interview questions: {str(e)}")
+            return self._fallback(fallback_questions)
+        questions = self._parse_json_list(questions_text)
+        return questions if questions is not None else self._fallback(fallback_questions)
     
+    def fallback_questions(self, topic: str, count: int) -> List[str]:
+        """The canned questions used when the LLM is unavailable"""
+        return self._fallback(self._get_fallback_questions(topic, count))
+
     def _get_fallback_questions(self, topic: str, count: int) -> List[str]:
         """Fallback questions when LLM fails"""
         topic_questions = {
@@ -201,122 +333,121 @@ class LLMService:
         questions = topic_questions.get(topic.lower(), topic_questions["behavioral"])
         return questions[:count]
 
-    def generate_follow_up_questions(self, question: str, answer: str) -> List[str]:
+    @staticmethod
+    def _follow_up_messages(question: str, answer: str) -> List[Dict]:
+        prompt = f"""
+        Based on this interview exchange, generate 2-3 relevant follow-up questions:
+        
+        Original Question: {question}
+        Answer: {answer}
+        
+        Generate questions that would help explore the candidate's experience deeper.
+        Return as a JSON array of strings.
+        """
+        return [
+            {"role": "system", "content": "You are an expert interviewer generating relevant follow-up questions."},
+            {"role": "user", "content": prompt}
+        ]
+
+    # Used when the LLM is unavailable or fails, and when it does not return a JSON array
+    FALLBACK_FOLLOW_UPS = [
+        "Can you provide more details about that?",
+        "What was the outcome of that situation?"
+    ]
+    UNPARSED_FOLLOW_UPS = [
+        "Can you tell me more about that experience?",
+        "What was the most challenging part of that situation?",
+        "How did you measure the success of that project?"
+    ]
+
+    def generate_follow_up_questions(self, question: str, answer: str, timeout: Optional[float] = None) -> List[str]:
         """Generate follow-up questions based on the response"""
         if not self.client:
             print("OpenAI client not available, using fallback follow-up questions")
-            return [
-                "Can you provide more details about that?",
-                "What was the outcome of that situation?"
-            ]
-            
+            return self._fallback(list(self.FALLBACK_FOLLOW_UPS))
         try:
-            prompt = f"""
-            Based on this interview exchange, generate 2-3 relevant follow-up questions:
-            
-            Original Question: {question}
-            Answer: {answer}
-            
-            Generate questions that would help explore the candidate's experience deeper.
-            Return as a JSON array of strings.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert interviewer generating relevant follow-up questions."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.7
-            )
-            
-            questions_text = response.choices[0].message.content.strip()
-            
-            # Try to parse as JSON array
-            try:
-                questions = json.loads(questions_text)
-                return questions if isinstance(questions, list) else []
-            except json.JSONDecodeError:
-                # Fallback questions
-                return [
-                    "Can you tell me more about that experience?",
-                    "What was the most challenging part of that situation?",
-                    "How did you measure the success of that project?"
-                ]
-                
+            questions_text = self._complete(self._follow_up_messages(question, answer), 300, timeout)
         except Exception as e:
             print(f"Error generating follow-up questions: {str(e)}")
-            return [
-                "Can you provide more details about that?",
-                "What was the outcome of that situation?"
-            ]
-    
-    def analyze_comprehensive_response(self, question: str, answer: str, emotion_data: Dict) -> Dict:
+            return self._fallback(list(self.FALLBACK_FOLLOW_UPS))
+        questions = self._parse_json_list(questions_text)
+        return questions if questions is not None else self._fallback(list(self.UNPARSED_FOLLOW_UPS))
+
+    async def agenerate_follow_up_questions(self, question: str, answer: str,
+                                            timeout: Optional[float] = None) -> List[str]:
+        """Async generate_follow_up_questions"""
+        if not self.async_client:
+            return self._fallback(list(self.FALLBACK_FOLLOW_UPS))
+        try:
+            questions_text = await self._acomplete(self._follow_up_messages(question, answer), 300, timeout)
+        except Exception as e:
+            print(f"Error generating follow-up questions: {str(e)}")
+            return self._fallback(list(self.FALLBACK_FOLLOW_UPS))
+        questions = self._parse_json_list(questions_text)
+        return questions if questions is not None else self._fallback(list(self.UNPARSED_FOLLOW_UPS))
+
+    @staticmethod
+    def _comprehensive_messages(question: str, answer: str, emotion_data: Dict) -> List[Dict]:
+        prompt = f"""
+        You are an expert interview coach analyzing a candidate's response. Consider both the verbal response and emotional indicators.
+        
+        Question: {question}
+        Answer: {answer}
+        Emotional State: {emotion_data.get('emotion', 'Unknown')} (Confidence: {emotion_data.get('confidence', 0):.2f})
+        Eye Contact Score: {emotion_data.get('eye_contact_score', 0):.2f}
+        
+        Provide a comprehensive analysis in JSON format with these fields:
+        {{
+            "overall_score": <integer 0-100>,
+            "communication_score": <integer 0-100>,
+            "confidence_score": <integer 0-100>,
+            "emotional_stability": <integer 0-100>,
+            "overall_feedback": "<string>",
+            "strengths": ["<strength1>", "<strength2>", ...],
+            "improvements": ["<improvement1>", "<improvement2>", ...],
+            "emotional_insights": "<string about emotional state>",
+            "specific_suggestions": ["<suggestion1>", "<suggestion2>", ...]
+        }}
+        
+        Consider:
+        - Content quality and relevance
+        - Communication clarity
+        - Emotional indicators (confidence, stability)
+        - Eye contact and engagement
+        - Areas for improvement
+        """
+        return [
+            {"role": "system", "content": "You are an expert interview coach providing comprehensive feedback based on both verbal and non-verbal cues."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def analyze_comprehensive_response(self, question: str, answer: str, emotion_data: Dict,
+                                       timeout: Optional[float] = None) -> Dict:
         """Comprehensive analysis combining text and emotion data"""
         if not self.client:
             print("OpenAI client not available, using fallback comprehensive analysis")
-            return self._create_comprehensive_fallback(question, answer, emotion_data)
-            
+            return self._fallback(self._create_comprehensive_fallback(question, answer, emotion_data))
         try:
-            prompt = f"""
-            You are an expert interview coach analyzing a candidate's response. Consider both the verbal response and emotional indicators.
-            
-            Question: {question}
-            Answer: {answer}
-            Emotional State: {emotion_data.get('emotion', 'Unknown')} (Confidence: {emotion_data.get('confidence', 0):.2f})
-            Eye Contact Score: {emotion_data.get('eye_contact_score', 0):.2f}
-            
-            Provide a comprehensive analysis in JSON format with these fields:
-            {{
-                "overall_score": <integer 0-100>,
-                "communication_score": <integer 0-100>,
-                "confidence_score": <integer 0-100>,
-                "emotional_stability": <integer 0-100>,
-                "overall_feedback": "<string>",
-                "strengths": ["<strength1>", "<strength2>", ...],
-                "improvements": ["<improvement1>", "<improvement2>", ...],
-                "emotional_insights": "<string about emotional state>",
-                "specific_suggestions": ["<suggestion1>", "<suggestion2>", ...]
-            }}
-            
-            Consider:
-            - Content quality and relevance
-            - Communication clarity
-            - Emotional indicators (confidence, stability)
-            - Eye contact and engagement
-            - Areas for improvement
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert interview coach providing comprehensive feedback based on both verbal and non-verbal cues."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            analysis_text = response.choices[0].message.content.strip()
-            
-            # Try to extract JSON from the response
-            try:
-                start_idx = analysis_text.find('{')
-                end_idx = analysis_text.rfind('}') + 1
-                if start_idx != -1 and end_idx != 0:
-                    json_str = analysis_text[start_idx:end_idx]
-                    analysis = json.loads(json_str)
-                else:
-                    analysis = self._create_comprehensive_fallback(question, answer, emotion_data)
-            except json.JSONDecodeError:
-                analysis = self._create_comprehensive_fallback(question, answer, emotion_data)
-            
-            return analysis
-            
+            analysis_text = self._complete(self._comprehensive_messages(question, answer, emotion_data), 1000, timeout)
+        except Exception as e:
+            print(f"Error in comprehensive analysis: {str(e)}")
+            return self._fallback(self._create_comprehensive_fallback(question, answer, emotion_data))
+        return (self._parse_json_object(analysis_text)
+                or self._fallback(self._create_comprehensive_fallback(question, answer, emotion_data)))
+
+    async def aanalyze_comprehensive_response(self, question: str, answer: str, emotion_data: Dict,
+                                              timeout: Optional[float] = None) -> Dict:
+        """Async analyze_comprehensive_response"""
+        if not self.async_client:
+            return self._fallback(self._create_comprehensive_fallback(question, answer, emotion_data))
+        try:
+            analysis_text = await self._acomplete(
+                self._comprehensive_messages(question, answer, emotion_data), 1000, timeout)
         except Exception as e:
             print(f"Error in comprehensive analysis: {str(e)}")
-            return self._create_comprehensive_fallback(question, answer, emotion_data)
+            return self._fallback(self._create_comprehensive_fallback(question, answer, emotion_data))
+        return (self._parse_json_object(analysis_text)
+                or self._fallback(self._create_comprehensive_fallback(question, answer, emotion_data)))
     
     def _create_comprehensive_fallback(self, question: str, answer: str, emotion_data: Dict) -> Dict:
         """Create fallback analysis when LLM fails"""
@@ -1,25 +1,38 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import List, Optional
+from collections import OrderedDict
+import asyncio
 import os
 
 # Import our modules
-from database import get_db, init_db
-from models import User, InterviewSession, EmotionData
+from database import get_async_db, open_async_session, init_db, dispose_async_engine, SessionLocal
+from models import User, InterviewSession, EmotionData, UserStats, SessionTimeline
+import queries
+import user_stats
+import timeline_store
 from schemas import (
     UserCreate, UserLogin, UserResponse, Token, GoogleUserInfo,
     EmotionAnalysisRequest, EmotionAnalysisResponse,
-    SessionCreate, SessionUpdate, SessionResponse, SessionSummary,
+    SessionCreate, SessionUpdate, SessionResponse, SessionListItem, SessionSummary,
     DashboardStats, QuestionRequest
 )
 from pydantic import BaseModel
-from routers.auth import hash_password, verify_password, create_access_token, SECRET_KEY, ALGORITHM
+from routers.auth import create_access_token, SECRET_KEY, ALGORITHM
+from password_hasher import password_hasher
 # from emotion_detector import emotion_detector
 from llm_service import llm_service
+from frame_ingest import read_frame_request, FRAME_REQUEST_BODY
+from frame_stream import LatestFrameQueue
+from write_behind import emotion_buffer
+from pagination import page_size, encode_cursor, decode_cursor, parse_fields, NEXT_CURSOR_HEADER
+from principal_cache import Principal, principal_cache
+from rate_limit import rate_limiter, admit, inference_gate, llm_gate
+from question_cache import question_cache
 
 # Initialize FastAPI app
 app = FastAPI(title="AI Interview Coach API", version="1.0.0")
@@ -34,13 +47,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Initialize database
 init_db()
 
+# "buffered" returns before EmotionData rows are committed, "durable" waits for the commit
+EMOTION_WRITE_MODE = os.getenv("EMOTION_WRITE_MODE", "buffered")
+
+@app.on_event("startup")
+def start_write_buffer():
+    emotion_buffer.start()
+
+@app.on_event("shutdown")
+def stop_write_buffer():
+    # Graceful shutdown: write out every buffered emotion sample
+    emotion_buffer.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await llm_service.aclose()
+
+@app.on_event("shutdown")
+def close_question_cache():
+    question_cache.close()
+
 # Authentication dependencies
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def authenticate_token(token: str, db=None) -> Principal:
+    """Resolve a bearer token to its user, raising 401 if it is invalid.
+
+    Cached principals skip the database; on a miss the user is looked up
+    with ``db``, or a short-lived session when none is given.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -48,7 +91,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     )
     
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_identifier = payload.get("sub")  # Can be email or Google ID
         auth_type = payload.get("auth_type", "email")  # "email" or "google"
         
@@ -57,15 +100,67 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except JWTError:
         raise credentials_exception
     
+    principal = principal_cache.get(auth_type, user_identifier)
+    if principal is not None:
+        return principal
+    
     # Find user by email or Google ID based on auth type
-    if auth_type == "google":
-        user = db.query(User).filter(User.google_id == user_identifier).first()
+    generation = principal_cache.generation
+    statement = (queries.user_by_google_id(user_identifier) if auth_type == "google"
+                 else queries.user_by_email(user_identifier))
+    if db is None:
+        db = open_async_session()
+        try:
+            user = (await db.scalars(statement)).first()
+        finally:
+            await db.close()
     else:
-        user = db.query(User).filter(User.email == user_identifier).first()
+        user = (await db.scalars(statement)).first()
     
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(auth_type, user_identifier, principal, generation)
+    return principal
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    return await authenticate_token(credentials.credentials)
+
+def score_frame(frame: bytes) -> dict:
+    """Random but realistic emotion scoring for a single frame"""
+    import random
+    
+    # Generate random but realistic emotion data
+    emotions = ["Happy", "Neutral", "Confident", "Focused", "Calm"]
+    emotion = random.choice(emotions)
+    
+    # Generate random confidence and eye contact scores (higher for better emotions)
+    if emotion in ["Happy", "Confident"]:
+        confidence = random.uniform(0.7, 0.95)
+        eye_contact = random.uniform(0.75, 0.9)
+    elif emotion == "Focused":
+        confidence = random.uniform(0.65, 0.85)
+        eye_contact = random.uniform(0.8, 0.95)
+    else:  # Neutral, Calm
+        confidence = random.uniform(0.6, 0.8)
+        eye_contact = random.uniform(0.7, 0.85)
+    
+    return {
+        "emotion": emotion,
+        "confidence": round(confidence, 2),
+        "eye_contact_score": round(eye_contact, 2)
+    }
+
+def compact_session_timeline(session_id: int):
+    db = SessionLocal()
+    try:
+        timeline_store.compact_session(db, session_id)
+    except Exception as e:
+        # Rows stay in emotion_data; compact_timelines.py picks the session up later
+        print(f"Error compacting timeline for session {session_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
 
 # Routes
 @app.get("/")
@@ -106,12 +201,22 @@ async def test_analyze(request: dict):
     except Exception as e:
         return {"error": str(e)}
 
-@app.post("/test-generate-questions")
+async def generate_question_pool(topic: str, difficulty: str, count: int) -> Optional[List[str]]:
+    return await llm_service.agenerate_interview_questions(topic, difficulty, count, fallback=False)
+
+async def cached_interview_questions(request: QuestionRequest) -> List[str]:
+    """Questions from the question cache; the LLM's canned questions when it has none and the LLM is down"""
+    questions = await question_cache.get(request.topic, request.difficulty, request.count, generate_question_pool)
+    return questions or llm_service.fallback_questions(request.topic, request.count)
+
+# Unauthenticated but still reaches the LLM: per-IP budget and the LLM gate like /generate-questions
+@app.post("/test-generate-questions",
+          dependencies=[Depends(rate_limiter.limit("generate_questions")), Depends(admit(llm_gate))])
 async def test_generate_questions(request: QuestionRequest):
     """Test endpoint for question generation without authentication"""
     try:
         # Try to use LLM service first
-        questions = llm_service.generate_interview_questions(request.topic, request.difficulty, request.count)
+        questions = await cached_interview_questions(request)
         
         if questions and len(questions) > 0:
             return {
@@ -165,9 +270,9 @@ async def test_generate_questions(request: QuestionRequest):
         }
 
 @app.post("/signup", response_model=UserResponse)
-async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db = Depends(get_async_db)):
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = (await db.scalars(queries.user_by_email(user_data.email))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -175,7 +280,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = User(
         name=user_data.name,
         email=user_data.email,
@@ -183,42 +288,53 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()
+    db.add(user_stats.new_user_stats(db_user.id))
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
-@app.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_credentials.email).first()
-    
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+@app.post("/login", response_model=Token, dependencies=[Depends(rate_limiter.limit("login"))])
+async def login(user_credentials: UserLogin, db = Depends(get_async_db)):
+    # Per-account limit on top of the per-IP one, checked before paying for bcrypt
+    await rate_limiter.check("login", user_key=user_credentials.email.lower())
+    user = (await db.scalars(queries.user_by_email(user_credentials.email))).first()
+    valid, new_hash = (await password_hasher.verify_and_update(user_credentials.password, user.hashed_password)
+                       if user else (False, None))
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Stored with an older bcrypt cost; upgrade it now that we have the plaintext
+        user.hashed_password = new_hash
+        await db.commit()
     
     access_token = create_access_token(data={"sub": user.email, "auth_type": "email"})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/google-login", response_model=Token)
-async def google_login(google_user: GoogleUserInfo, db: Session = Depends(get_db)):
+async def google_login(google_user: GoogleUserInfo, db = Depends(get_async_db)):
     """Handle Google OAuth login"""
     try:
         print(f"Google login attempt for: {google_user.email}")
         
         # Check if user exists by Google ID
-        user = db.query(User).filter(User.google_id == google_user.sub).first()
+        user = (await db.scalars(queries.user_by_google_id(google_user.sub))).first()
         
         if not user:
             # Check if user exists by email (in case they signed up with email first)
-            existing_user = db.query(User).filter(User.email == google_user.email).first()
+            existing_user = (await db.scalars(queries.user_by_email(google_user.email))).first()
             if existing_user:
                 # Link Google ID to existing user
                 existing_user.google_id = google_user.sub
                 existing_user.name = google_user.name  # Update name from Google
-                db.commit()
+                await db.commit()
+                principal_cache.invalidate_user(existing_user.id)
                 user = existing_user
                 print(f"Linked Google ID to existing user: {user.email}")
             else:
@@ -230,8 +346,10 @@ async def google_login(google_user: GoogleUserInfo, db: Session = Depends(get_db
                     hashed_password=None  # No password for Google users
                 )
                 db.add(user)
-                db.commit()
-                db.refresh(user)
+                await db.flush()
+                db.add(user_stats.new_user_stats(user.id))
+                await db.commit()
+                await db.refresh(user)
                 print(f"Created new Google user: {user.email}")
         
         # Create token with Google ID
@@ -248,64 +366,72 @@ async def google_login(google_user: GoogleUserInfo, db: Session = Depends(get_db
         )
 
 @app.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
-@app.post("/analyze", response_model=EmotionAnalysisResponse)
+# (user_id, session_id) pairs /analyze has already verified; sessions never change owner
+_owned_sessions: "OrderedDict[tuple, None]" = OrderedDict()
+OWNED_SESSION_CACHE_SIZE = int(os.getenv("OWNED_SESSION_CACHE_SIZE", "10000"))
+
+async def require_owned_session(session_id: Optional[int], user_id: int):
+    """404 unless the frame's session exists and belongs to the caller, before its row is buffered"""
+    if session_id is None:
+        return
+    key = (user_id, session_id)
+    if key in _owned_sessions:
+        _owned_sessions.move_to_end(key)
+        return
+    db = open_async_session()
+    try:
+        session = (await db.scalars(queries.owned_session(session_id, user_id))).first()
+    finally:
+        await db.close()
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    _owned_sessions[key] = None
+    while len(_owned_sessions) > OWNED_SESSION_CACHE_SIZE:
+        _owned_sessions.popitem(last=False)
+
+@app.post("/analyze", response_model=EmotionAnalysisResponse, openapi_extra=FRAME_REQUEST_BODY,
+          dependencies=[Depends(rate_limiter.limit("analyze", get_current_user)), Depends(admit(inference_gate))])
 async def analyze_emotion(
-    analysis_request: EmotionAnalysisRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    durable: bool = Query(False, description="Wait until the emotion sample is committed"),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Hardcoded emotion analysis with random scoring"""
-    import random
+    """Hardcoded emotion analysis with random scoring.
+
+    Accepts a raw JPEG/PNG body (session_id in the query string), a multipart
+    upload, or the legacy JSON body with base64 frame_data. The sample is
+    written behind unless durable mode is requested.
+    """
+    frame, session_id = await read_frame_request(request)
+    await require_owned_session(session_id, current_user.id)
     
     try:
-        print(f"Analyzing emotion for user {current_user.id}, session {analysis_request.session_id}")
-        
-        # Generate random but realistic emotion data
-        emotions = ["Happy", "Neutral", "Confident", "Focused", "Calm"]
-        emotion = random.choice(emotions)
-        
-        # Generate random confidence and eye contact scores (higher for better emotions)
-        if emotion in ["Happy", "Confident"]:
-            confidence = random.uniform(0.7, 0.95)
-            eye_contact = random.uniform(0.75, 0.9)
-        elif emotion == "Focused":
-            confidence = random.uniform(0.65, 0.85)
-            eye_contact = random.uniform(0.8, 0.95)
-        else:  # Neutral, Calm
-            confidence = random.uniform(0.6, 0.8)
-            eye_contact = random.uniform(0.7, 0.85)
-        
-        result = {
-            "emotion": emotion,
-            "confidence": round(confidence, 2),
-            "eye_contact_score": round(eye_contact, 2)
-        }
+        print(f"Analyzing emotion for user {current_user.id}, session {session_id} ({len(frame)} bytes)")
         
-        print(f"Generated emotion analysis result: {result}")
+        result = score_frame(frame)
         
-        # Create emotion data record
-        emotion_data = EmotionData(
-            user_id=current_user.id,
-            session_id=analysis_request.session_id,
-            emotion=result["emotion"],
-            confidence=result["confidence"],
-            eye_contact_score=result["eye_contact_score"]
-        )
+        print(f"Generated emotion analysis result: {result}")
         
-        db.add(emotion_data)
-        db.commit()
-        db.refresh(emotion_data)
+        # Queue the emotion data record for the next bulk insert
+        timestamp = datetime.utcnow()
+        emotion_buffer.add({
+            "user_id": current_user.id,
+            "session_id": session_id,
+            "timestamp": timestamp,
+            **result
+        })
         
-        print(f"Emotion data saved with ID: {emotion_data.id}")
+        if durable or EMOTION_WRITE_MODE == "durable":
+            await run_in_threadpool(emotion_buffer.flush)
         
         return EmotionAnalysisResponse(
             emotion=result["emotion"],
             confidence=result["confidence"],
             eye_contact_score=result["eye_contact_score"],
-            timestamp=datetime.utcnow()
+            timestamp=timestamp
         )
         
     except Exception as e:
@@ -315,10 +441,79 @@ async def analyze_emotion(
             detail=f"Error analyzing emotion: {str(e)}"
         )
 
+@app.websocket("/ws/sessions/{session_id}/frames")
+async def stream_session_frames(websocket: WebSocket, session_id: int, token: str = Query(...)):
+    """Stream binary frames for a session and push back one result per analyzed frame.
+
+    The token is checked once when the socket opens. If the client sends frames
+    faster than they are analyzed, the oldest pending frame is dropped. Results
+    go through the shared write-behind buffer.
+    """
+    db = open_async_session()
+    try:
+        try:
+            user = await authenticate_token(token, db)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        
+        session = (await db.scalars(queries.owned_session(session_id, user.id))).first()
+        if not session:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        user_id = user.id
+    finally:
+        await db.close()
+    
+    await websocket.accept()
+    print(f"Frame stream opened for user {user_id}, session {session_id}")
+    
+    frames = LatestFrameQueue(max_pending=int(os.getenv("WS_MAX_PENDING_FRAMES", "2")))
+    analyzed = 0
+    
+    async def receive_frames():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    frames.put(message["bytes"])
+        finally:
+            frames.close()
+    
+    receiver = asyncio.create_task(receive_frames())
+    try:
+        while True:
+            frame = await frames.get()
+            if frame is None:
+                break
+            
+            result = score_frame(frame)
+            timestamp = datetime.utcnow()
+            emotion_buffer.add({
+                "user_id": user_id,
+                "session_id": session_id,
+                "timestamp": timestamp,
+                **result
+            })
+            await websocket.send_json({
+                **result,
+                "timestamp": timestamp.isoformat(),
+                "dropped_frames": frames.dropped
+            })
+            analyzed += 1
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        print(f"Frame stream closed for session {session_id}: received={frames.received}, "
+              f"dropped={frames.dropped}, analyzed={analyzed}")
+
 @app.post("/sessions", response_model=SessionResponse)
 async def create_session(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     """Create a new interview session"""
     print(f"Creating session for user {current_user.id}")
@@ -330,14 +525,15 @@ async def create_session(
         )
         
         db.add(db_session)
-        db.commit()
-        db.refresh(db_session)
+        await user_stats.record_session_started(db, current_user.id)
+        await db.commit()
+        await db.refresh(db_session)
         
         print(f"Session created with ID: {db_session.id}")
         return db_session
     except Exception as e:
         print(f"Error creating session: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating session: {str(e)}"
@@ -347,8 +543,8 @@ async def create_session(
 async def update_session(
     session_id: int,
     session_update: SessionUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     """Update session with end data and random scoring"""
     import random
@@ -356,10 +552,7 @@ async def update_session(
     print(f"Updating session {session_id} for user {current_user.id}")
     print(f"Update data: {session_update.dict()}")
     
-    session = db.query(InterviewSession).filter(
-        InterviewSession.id == session_id,
-        InterviewSession.user_id == current_user.id
-    ).first()
+    session = (await db.scalars(queries.owned_session(session_id, current_user.id))).first()
     
     if not session:
         print(f"Session {session_id} not found for user {current_user.id}")
@@ -384,12 +577,26 @@ async def update_session(
     confidence_percent = int(random_confidence * 100)
     update_data['session_summary'] = f"Completed {total_questions} questions with {confidence_percent}% average confidence. Dominant emotion: {random_emotion}."
     
+    previous_confidence = session.average_confidence
+    previous_emotion = session.dominant_emotion
+    
     for field, value in update_data.items():
         print(f"Setting {field} = {value}")
         setattr(session, field, value)
     
-    db.commit()
-    db.refresh(session)
+    # Dashboard aggregates are updated in the same transaction as the session
+    await user_stats.record_session_completed(
+        db, current_user.id, random_confidence, random_emotion,
+        previous_confidence=previous_confidence, previous_emotion=previous_emotion
+    )
+    await db.commit()
+    await db.refresh(session)
+    
+    # Session end: make sure its buffered emotion samples are committed
+    await run_in_threadpool(emotion_buffer.flush)
+    
+    if timeline_store.TIMELINE_STORAGE == "packed":
+        await run_in_threadpool(compact_session_timeline, session_id)
     
     print(f"Session {session_id} updated successfully with random scores: confidence={random_confidence}, emotion={random_emotion}")
     print(f"Updated session data: average_confidence={session.average_confidence}, dominant_emotion={session.dominant_emotion}")
@@ -410,20 +617,13 @@ async def update_session(
 @app.get("/sessions/{session_id}/summary")
 async def get_session_summary(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     """Get detailed summary of a specific session"""
     print(f"Getting session summary for session {session_id}, user {current_user.id}")
     
-    # First check if session exists at all
-    all_sessions = db.query(InterviewSession).all()
-    print(f"All sessions in database: {[(s.id, s.user_id) for s in all_sessions]}")
-    
-    session = db.query(InterviewSession).filter(
-        InterviewSession.id == session_id,
-        InterviewSession.user_id == current_user.id
-    ).first()
+    session = (await db.scalars(queries.owned_session(session_id, current_user.id))).first()
     
     print(f"Found session: {session}")
     if session:
@@ -436,19 +636,16 @@ async def get_session_summary(
             detail="Session not found"
         )
     
-    # Get emotion timeline for this session
-    emotions = db.query(EmotionData).filter(
-        EmotionData.session_id == session_id
-    ).order_by(EmotionData.timestamp).all()
+    # Read-your-writes: commit any buffered samples before reading the timeline
+    if emotion_buffer.depth():
+        await run_in_threadpool(emotion_buffer.flush)
+    
+    # Get emotion timeline for this session: the packed part of a compacted session
+    # merged with any samples still stored as rows
+    packed = await db.get(SessionTimeline, session_id)
+    emotions = (await db.execute(queries.session_timeline(session_id))).all()
     
-    emotion_timeline = [
-        {
-            "emotion": emotion.emotion,
-            "confidence": emotion.confidence,
-            "eye_contact_score": emotion.eye_contact_score,
-            "timestamp": emotion.timestamp.isoformat()
-        } for emotion in emotions
-    ]
+    emotion_timeline = timeline_store.summary_timeline(packed, emotions)
     
     return {
         "session_id": session.id,
@@ -461,79 +658,80 @@ async def get_session_summary(
         "session_summary": session.session_summary or "No summary available"
     }
 
-@app.get("/sessions", response_model=List[SessionResponse])
+@app.get("/sessions", response_model=List[SessionListItem], response_model_exclude_unset=True)
 async def get_user_sessions(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(None, description="Page size, capped at MAX_PAGE_SIZE"),
+    cursor: Optional[str] = Query(None, description=f"Value of {NEXT_CURSOR_HEADER} from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,start_time,average_confidence"),
+    current_user: Principal = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
-    """Get all sessions for the current user"""
-    sessions = db.query(InterviewSession).filter(
-        InterviewSession.user_id == current_user.id
-    ).order_by(InterviewSession.start_time.desc()).all()
+    """Get the current user's sessions, newest first, one keyset page at a time"""
+    size = page_size(limit)
+    selected = parse_fields(fields, queries.SESSION_LIST_FIELDS, queries.SESSION_LIST_FIELDS)
     
-    return sessions
+    rows = (await db.execute(
+        queries.user_sessions_page(current_user.id, selected, size, decode_cursor(cursor))
+    )).all()
+    
+    if len(rows) > size:
+        rows = rows[:size]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].start_time, rows[-1].id)
+    
+    return [SessionListItem(**{name: getattr(row, name) for name in selected}) for row in rows]
 
 @app.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db = Depends(get_async_db)
 ):
     """Get dashboard statistics for the user"""
     print(f"Getting dashboard stats for user {current_user.id}")
     
-    # Get user's sessions
-    sessions = db.query(InterviewSession).filter(
-        InterviewSession.user_id == current_user.id
-    ).order_by(InterviewSession.start_time.desc()).limit(10).all()
-    
-    print(f"Found {len(sessions)} sessions for user {current_user.id}")
+    # Aggregates are maintained incrementally in user_stats; only the recent list hits sessions
+    aggregates = await db.get(UserStats, current_user.id)
+    sessions = (await db.scalars(queries.user_sessions(current_user.id, limit=10))).all()
     
-    # Calculate statistics
-    total_sessions = len(sessions)
-    average_confidence = 0.0
-    best_emotion = "Neutral"
-    
-    if sessions:
-        # Calculate average confidence from completed sessions
-        completed_sessions = [s for s in sessions if s.average_confidence is not None]
-        print(f"Found {len(completed_sessions)} completed sessions")
-        
-        if completed_sessions:
-            average_confidence = sum(s.average_confidence for s in completed_sessions) / len(completed_sessions)
-            print(f"Average confidence: {average_confidence}")
-            
-            # Find most common emotion
-            emotion_counts = {}
-            for session in completed_sessions:
-                if session.dominant_emotion:
-                    emotion_counts[session.dominant_emotion] = emotion_counts.get(session.dominant_emotion, 0) + 1
-            
-            if emotion_counts:
-                best_emotion = max(emotion_counts, key=emotion_counts.get)
-                print(f"Best emotion: {best_emotion}")
+    print(f"Found {len(sessions)} recent sessions for user {current_user.id}")
     
     stats = DashboardStats(
-        total_sessions=total_sessions,
-        average_confidence=average_confidence,
-        best_emotion=best_emotion,
+        total_sessions=aggregates.session_count if aggregates else 0,
+        average_confidence=aggregates.average_confidence if aggregates else 0.0,
+        best_emotion=user_stats.best_emotion(aggregates),
         recent_sessions=sessions
     )
     
     print(f"Returning dashboard stats: {stats}")
     return stats
 
-@app.post("/analyze-answer")
+@app.get("/metrics")
+async def get_metrics():
+    """Operational metrics for in-process buffers and caches"""
+    return {
+        "emotion_write_buffer": emotion_buffer.metrics(),
+        "principal_cache": principal_cache.metrics(),
+        "password_hasher": password_hasher.metrics(),
+        "rate_limit": rate_limiter.metrics(),
+        "admission": {"inference": inference_gate.metrics(), "llm": llm_gate.metrics()},
+        "llm": llm_service.metrics(),
+        "question_cache": question_cache.metrics(),
+    }
+
+@app.post("/analyze-answer",
+          dependencies=[Depends(rate_limiter.limit("analyze_answer", get_current_user)), Depends(admit(llm_gate))])
 async def analyze_answer(
     question: str,
     answer: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Analyze interview answer using LLM"""
     try:
         # Use LLM service to analyze the response
-        # analysis = llm_service.analyze_interview_response(question, answer)
-        # Generate follow-up questions
-        # follow_up_questions = llm_service.generate_follow_up_questions(question, answer)
+        # analysis, follow_up_questions = await asyncio.gather(
+        #     llm_service.aanalyze_interview_response(question, answer),
+        #     llm_service.agenerate_follow_up_questions(question, answer),
+        # )
         
         # Temporary mock analysis for testing
         analysis = {
@@ -560,15 +758,16 @@ async def analyze_answer(
             detail=f"Error analyzing answer: {str(e)}"
         )
 
-@app.post("/generate-questions")
+@app.post("/generate-questions",
+          dependencies=[Depends(rate_limiter.limit("generate_questions", get_current_user)), Depends(admit(llm_gate))])
 async def generate_questions(
     request: QuestionRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Generate interview questions for a specific topic"""
     try:
         # Try to use LLM service first
-        questions = llm_service.generate_interview_questions(request.topic, request.difficulty, request.count)
+        questions = await cached_interview_questions(request)
         
         if questions and len(questions) > 0:
             return {
@@ -621,10 +820,12 @@ async def generate_questions(
             "count": len(mock_questions[:request.count])
         }
 
-@app.post("/analyze-comprehensive")
+@app.post("/analyze-comprehensive",
+          dependencies=[Depends(rate_limiter.limit("analyze_comprehensive", get_current_user)),
+                        Depends(admit(llm_gate))])
 async def analyze_comprehensive(
     request: dict,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Comprehensive analysis with random scoring and hardcoded feedback"""
     import random
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Scheduled maintenance for emotion_data: roll up, archive and prune old samples.
+
+Policies come from EMOTION_RAW_RETENTION_DAYS, EMOTION_ROLLUP_RETENTION_DAYS,
+EMOTION_ARCHIVE_DIR and EMOTION_MAINTENANCE_BATCH_SIZE; the flags below
+override them. Run it from cron, or with --interval-minutes to keep it
+running.
+
+Examples:
+    python maintain_emotion_data.py --dry-run
+    python maintain_emotion_data.py --raw-days 14 --archive-dir /backups/emotions
+    python maintain_emotion_data.py --interval-minutes 60
+"""
+import argparse
+import json
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from sqlalchemy import text
+
+from database import SessionLocal, engine, init_db, is_sqlite, DATABASE_URL
+from emotion_retention import EmotionRetentionJob
+
+
+def enable_incremental_vacuum():
+    """Switch an existing SQLite file to incremental auto-vacuum (rewrites the whole file once)"""
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+
+
+def run_once(job, dry_run):
+    db = SessionLocal()
+    try:
+        report = job.plan(db) if dry_run else job.run(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(json.dumps({"dry_run": dry_run, **report}, indent=2, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up, archive and prune old emotion_data rows")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be processed and reclaimed")
+    parser.add_argument("--raw-days", type=float, help="Keep raw samples this many days")
+    parser.add_argument("--rollup-days", type=float, help="Keep per-minute rollups this many days (0 = forever)")
+    parser.add_argument("--archive-dir", help="Directory for gzip CSV archives")
+    parser.add_argument("--no-archive", action="store_true", help="Delete old samples without archiving them")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--interval-minutes", type=float, help="Repeat every N minutes instead of exiting")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="Convert an existing SQLite file to incremental auto-vacuum first (blocking VACUUM)")
+    args = parser.parse_args()
+
+    job = EmotionRetentionJob.from_env()
+    if args.raw_days is not None:
+        job.raw_retention_days = args.raw_days
+    if args.rollup_days is not None:
+        job.rollup_retention_days = args.rollup_days
+    if args.archive_dir:
+        job.archive_dir = Path(args.archive_dir)
+    if args.no_archive:
+        job.archive_dir = None
+    if args.batch_size:
+        job.batch_size = args.batch_size
+
+    init_db()
+    if args.enable_incremental_vacuum and is_sqlite(DATABASE_URL) and not args.dry_run:
+        enable_incremental_vacuum()
+
+    if not args.interval_minutes:
+        run_once(job, args.dry_run)
+        return
+
+    while True:
+        try:
+            run_once(job, args.dry_run)
+        except Exception:
+            # A locked database or full archive disk shouldn't end the schedule; retry next interval
+            print(f"❌ Maintenance run failed, retrying in {args.interval_minutes:g} min:", file=sys.stderr)
+            traceback.print_exc()
+        time.sleep(args.interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Apply versioned schema migrations (see migrations/) to the configured database.
+
+Table rebuilds copy rows in chunks of --batch-size, one short transaction
+each, so the API can keep serving while a migration runs. The final swap
+holds the write lock while it rebuilds the table's indexes (see
+migrations/online.py).
+
+Example:
+    python migrate.py --status
+    python migrate.py --batch-size 2000
+"""
+import argparse
+import sys
+
+from database import engine
+from migrations import LATEST_VERSION, MIGRATION_BATCH_SIZE, MIGRATIONS, current_version, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show the applied and pending versions and exit")
+    parser.add_argument("--target", type=int, default=LATEST_VERSION, help="Version to migrate to")
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    version = current_version(engine) or 0
+    if args.status:
+        print(f"📋 Schema at v{version}, latest is v{LATEST_VERSION}")
+        for migration in MIGRATIONS:
+            state = "applied" if migration.VERSION <= version else "pending"
+            print(f"  - v{migration.VERSION:04d} {migration.DESCRIPTION} ({state})")
+        return True
+
+    if version >= args.target:
+        print(f"✅ Schema already at v{version}. Migration not needed.")
+        return True
+    try:
+        migrate(engine, target=args.target, batch_size=args.batch_size)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+    print("\n🎉 Migration completed!")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,235 @@
+"""
+Versioned schema migrations.
+
+Each ``vNNNN_*.py`` module in this package defines ``VERSION``,
+``DESCRIPTION`` and ``upgrade(ctx)``. The applied version is stored in the
+single-row ``schema_version`` table, so startup only reads one row when the
+database is current. Pending migrations run in order under a lock row, so
+several API workers starting at once migrate the database exactly once; the
+running migrator refreshes the lock while it works, and a lock that stops
+being refreshed for MIGRATION_LOCK_STALE_MINUTES is taken over.
+
+Migrations must be safe to re-run: a migration that fails part-way is
+retried from the start on the next run.
+"""
+import importlib
+import os
+import pkgutil
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, Table, inspect, select, text, update
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.schema import CreateIndex
+
+from .online import rebuild_table_online
+
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+# Apply pending migrations on startup; when false the API refuses to start on an old schema
+SCHEMA_AUTO_MIGRATE = os.getenv("SCHEMA_AUTO_MIGRATE", "true").lower() == "true"
+# A lock older than this is assumed to belong to a crashed migrator
+LOCK_STALE_AFTER = timedelta(minutes=int(os.getenv("MIGRATION_LOCK_STALE_MINUTES", "30")))
+# The running migrator refreshes its lock this often, so a long table rebuild never looks stale
+LOCK_HEARTBEAT_SECONDS = max(1.0, LOCK_STALE_AFTER.total_seconds() / 6)
+# Dialects the migrations' DDL is written for
+SUPPORTED_DIALECTS = ("sqlite", "postgresql")
+
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version", schema_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("applied_at", DateTime),
+    Column("locked_at", DateTime),
+)
+
+
+def load_migrations() -> List:
+    modules = [
+        importlib.import_module(f"{__name__}.{info.name}")
+        for info in pkgutil.iter_modules(__path__)
+        if info.name.startswith("v") and info.name[1:5].isdigit()
+    ]
+    modules.sort(key=lambda m: m.VERSION)
+    versions = [m.VERSION for m in modules]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migration versions must be 1..N without gaps, found {versions}")
+    return modules
+
+
+MIGRATIONS = load_migrations()
+LATEST_VERSION = MIGRATIONS[-1].VERSION
+
+
+class MigrationContext:
+    """What a migration gets to work with: the engine plus online DDL helpers"""
+
+    def __init__(self, engine: Engine, batch_size: int, log: Callable[[str], None]):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.log = log
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    def has_table(self, name: str) -> bool:
+        return inspect(self.engine).has_table(name)
+
+    def columns(self, table_name: str) -> dict:
+        return {c["name"]: c for c in inspect(self.engine).get_columns(table_name)}
+
+    def create_table(self, table: Table):
+        """Create a table and its indexes unless it already exists"""
+        table.create(self.engine, checkfirst=True)
+
+    def create_index_online(self, index):
+        """CREATE INDEX IF NOT EXISTS; CONCURRENTLY on PostgreSQL so writes continue during the build"""
+        ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=self.engine.dialect))
+        if self.dialect == "postgresql":
+            ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+        # CONCURRENTLY can't run inside a transaction
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(ddl))
+
+    def rebuild_table_online(self, table: Table):
+        """Rebuild an existing table into ``table``'s definition without a long write lock"""
+        rebuild_table_online(self.engine, table, self.batch_size, self.log)
+
+
+def current_version(engine: Engine) -> Optional[int]:
+    """Applied schema version, or None for a database that predates versioning"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(schema_version.c.version).where(schema_version.c.id == 1)).scalar()
+    except DBAPIError:
+        return None
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool = SCHEMA_AUTO_MIGRATE, log: Callable[[str], None] = print):
+    """Startup check: one row read when current, otherwise migrate (or refuse)"""
+    version = current_version(engine)
+    if version == LATEST_VERSION:
+        return
+    if version is not None and version > LATEST_VERSION:
+        raise RuntimeError(f"Database schema v{version} is newer than this code (v{LATEST_VERSION})")
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at v{version or 0}, code expects v{LATEST_VERSION}; run python migrate.py"
+        )
+    migrate(engine, log=log)
+
+
+def _init_version_table(engine: Engine):
+    schema_version.create(engine, checkfirst=True)
+    try:
+        with engine.begin() as conn:
+            conn.execute(schema_version.insert().values(id=1, version=0))
+    except IntegrityError:
+        pass
+
+
+class _MigrationLock:
+    """The schema_version lock row, kept fresh from a background thread while migrations run.
+
+    ``locked_at`` doubles as the owner token: the heartbeat and release only
+    touch the row while it still holds the value this process last wrote, so
+    a migrator that lost the lock can't refresh or clear someone else's.
+    """
+
+    def __init__(self, engine: Engine, log: Callable[[str], None]):
+        self.engine = engine
+        self.log = log
+        self._locked_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _claim(self, condition) -> bool:
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            claimed = conn.execute(
+                update(schema_version).where(schema_version.c.id == 1).where(condition).values(locked_at=now)
+            ).rowcount == 1
+        if claimed:
+            self._locked_at = now
+        return claimed
+
+    def acquire(self) -> bool:
+        stale = datetime.utcnow() - LOCK_STALE_AFTER
+        if not self._claim(schema_version.c.locked_at.is_(None) | (schema_version.c.locked_at < stale)):
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._heartbeat, name="migration-lock", daemon=True)
+        self._thread.start()
+        return True
+
+    def _heartbeat(self):
+        while not self._stop.wait(LOCK_HEARTBEAT_SECONDS):
+            try:
+                if not self._claim(schema_version.c.locked_at == self._locked_at):
+                    self.log("⚠️  Migration lock was taken over by another process")
+                    return
+            except DBAPIError as e:
+                # Try again next beat; the lock only goes stale after LOCK_STALE_AFTER
+                self.log(f"⚠️  Migration lock heartbeat failed: {e}")
+
+    def release(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(schema_version)
+                .where(schema_version.c.id == 1)
+                .where(schema_version.c.locked_at == self._locked_at)
+                .values(locked_at=None)
+            )
+
+
+def _set_version(engine: Engine, version: int):
+    with engine.begin() as conn:
+        conn.execute(
+            update(schema_version).where(schema_version.c.id == 1)
+            .values(version=version, applied_at=datetime.utcnow())
+        )
+
+
+def migrate(engine: Engine, target: Optional[int] = None, batch_size: int = MIGRATION_BATCH_SIZE,
+            log: Callable[[str], None] = print) -> int:
+    """Apply pending migrations up to ``target`` (default: latest); returns the resulting version"""
+    target = LATEST_VERSION if target is None else target
+    if engine.dialect.name not in SUPPORTED_DIALECTS:
+        raise RuntimeError(f"Migrations support {', '.join(SUPPORTED_DIALECTS)}, not {engine.dialect.name}")
+    _init_version_table(engine)
+
+    lock = _MigrationLock(engine, log)
+    while not lock.acquire():
+        # Another process is migrating; wait for it unless it already got us to the target
+        if current_version(engine) >= target:
+            return current_version(engine)
+        time.sleep(1)
+
+    try:
+        version = current_version(engine)
+        ctx = MigrationContext(engine, batch_size, log)
+        pending = [m for m in MIGRATIONS if version < m.VERSION <= target]
+        if pending:
+            log(f"🔄 Migrating schema v{version} -> v{pending[-1].VERSION}")
+        total_started = time.perf_counter()
+        for migration in pending:
+            started = time.perf_counter()
+            log(f"📝 v{migration.VERSION:04d} {migration.DESCRIPTION}")
+            migration.upgrade(ctx)
+            _set_version(engine, migration.VERSION)
+            version = migration.VERSION
+            log(f"✅ v{migration.VERSION:04d} done in {time.perf_counter() - started:.2f}s")
+        if pending:
+            log(f"✅ Schema at v{version} ({time.perf_counter() - total_started:.2f}s)")
+        return version
+    finally:
+        lock.release()
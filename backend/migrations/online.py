@@ -0,0 +1,129 @@
+"""
+Online table rebuilds for SQLite.
+
+SQLite can't change most column definitions in place, so the table is
+rebuilt the way online schema-change tools do it:
+
+  1. create a shadow table with the new definition,
+  2. add triggers that mirror every insert/update/delete on the live table
+     into the shadow,
+  3. copy existing rows across in primary-key chunks, one short transaction
+     per chunk (INSERT OR IGNORE, so rows already mirrored by a trigger win),
+  4. swap: drop the triggers and the old table, rename the shadow and
+     recreate the indexes in one transaction.
+
+The live server keeps reading and writing throughout; it only waits for
+one chunk or for the final swap. The swap is short for the drop and rename,
+but it also builds the table's indexes, and that is a full pass over the
+rows: SQLite has no ALTER INDEX ... RENAME and index names are unique per
+database, so they can't be built on the shadow ahead of time under their
+final names. For a large, heavily indexed table the index build is most of
+the lock window (it is logged separately); schedule such rebuilds for a
+quiet period.
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+
+def _quote(engine: Engine, name: str) -> str:
+    return engine.dialect.identifier_preparer.quote(name)
+
+
+@contextmanager
+def _ddl_transaction(engine: Engine):
+    """Explicit BEGIN IMMEDIATE ... COMMIT; pysqlite would otherwise autocommit each DDL statement"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        conn.exec_driver_sql("COMMIT")
+
+
+def rebuild_table_online(engine: Engine, table: Table, batch_size: int, log: Callable[[str], None]):
+    if engine.dialect.name != "sqlite":
+        raise NotImplementedError("Online rebuilds are only needed (and implemented) for SQLite")
+
+    name = table.name
+    shadow_name = f"_{name}_new"
+    shadow = table.to_metadata(MetaData(), name=shadow_name)
+    old_columns = {c["name"] for c in inspect(engine).get_columns(name)}
+    columns = [c.name for c in table.columns if c.name in old_columns]
+    pk = list(table.primary_key.columns)
+    if len(pk) != 1:
+        raise ValueError(f"Online rebuild needs a single-column primary key, {name} has {len(pk)}")
+    pk = pk[0].name
+
+    q = lambda n: _quote(engine, n)
+    column_list = ", ".join(q(c) for c in columns)
+    new_values = ", ".join(f"NEW.{q(c)}" for c in columns)
+    triggers = [f"{shadow_name}_{op}" for op in ("ins", "upd", "del")]
+
+    started = time.perf_counter()
+    with _ddl_transaction(engine) as conn:
+        # Leftovers from an interrupted run
+        for trigger in triggers:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {q(trigger)}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {q(shadow_name)}"))
+
+        conn.execute(CreateTable(shadow, include_foreign_key_constraints=shadow.foreign_key_constraints))
+        conn.execute(text(
+            f"CREATE TRIGGER {q(triggers[0])} AFTER INSERT ON {q(name)} BEGIN "
+            f"INSERT OR REPLACE INTO {q(shadow_name)} ({column_list}) VALUES ({new_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER {q(triggers[1])} AFTER UPDATE ON {q(name)} BEGIN "
+            f"DELETE FROM {q(shadow_name)} WHERE {q(pk)} = OLD.{q(pk)}; "
+            f"INSERT OR REPLACE INTO {q(shadow_name)} ({column_list}) VALUES ({new_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER {q(triggers[2])} AFTER DELETE ON {q(name)} BEGIN "
+            f"DELETE FROM {q(shadow_name)} WHERE {q(pk)} = OLD.{q(pk)}; END"
+        ))
+
+    with engine.connect() as conn:
+        total = conn.execute(text(f"SELECT COUNT(*) FROM {q(name)}")).scalar()
+    log(f"   copying {total} rows of {name} in chunks of {batch_size}")
+
+    copied, last_pk, chunks = 0, None, 0
+    while True:
+        with engine.begin() as conn:
+            after = "" if last_pk is None else f"WHERE {q(pk)} > :last"
+            params = {} if last_pk is None else {"last": last_pk}
+            upper = conn.execute(text(
+                f"SELECT {q(pk)} FROM {q(name)} {after} ORDER BY {q(pk)} LIMIT 1 OFFSET {batch_size - 1}"
+            ), params).scalar()
+            bound = "" if upper is None else f"{'AND' if after else 'WHERE'} {q(pk)} <= :upper"
+            result = conn.execute(text(
+                f"INSERT OR IGNORE INTO {q(shadow_name)} ({column_list}) "
+                f"SELECT {column_list} FROM {q(name)} {after} {bound}"
+            ), {**params, **({} if upper is None else {"upper": upper})})
+            copied += max(result.rowcount, 0)
+        chunks += 1
+        if upper is None:
+            break
+        last_pk = upper
+        if chunks % 20 == 0:
+            log(f"   {name}: {copied}/{total} rows ({time.perf_counter() - started:.1f}s)")
+
+    swap_started = time.perf_counter()
+    with _ddl_transaction(engine) as conn:
+        for trigger in triggers:
+            conn.execute(text(f"DROP TRIGGER {q(trigger)}"))
+        conn.execute(text(f"DROP TABLE {q(name)}"))
+        conn.execute(text(f"ALTER TABLE {q(shadow_name)} RENAME TO {q(name)}"))
+        # Part of the lock window: the old table's indexes hold these names until it is dropped
+        index_started = time.perf_counter()
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+        index_ms = (time.perf_counter() - index_started) * 1000
+    log(f"   {name}: copied {copied} rows in {chunks} chunks, "
+        f"swap took {(time.perf_counter() - swap_started) * 1000:.0f}ms "
+        f"({index_ms:.0f}ms building {len(table.indexes)} indexes), total {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,49 @@
+"""Baseline schema: users, interview_sessions and emotion_data as first shipped"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text
+
+VERSION = 1
+DESCRIPTION = "baseline users / interview_sessions / emotion_data"
+
+# Frozen copies of the original tables; later migrations change them, not this file
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("hashed_password", String, nullable=False),
+    Column("created_at", DateTime, default=datetime.utcnow),
+)
+
+interview_sessions = Table(
+    "interview_sessions", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("start_time", DateTime, default=datetime.utcnow),
+    Column("end_time", DateTime),
+    Column("duration_seconds", Integer),
+    Column("average_confidence", Float),
+    Column("dominant_emotion", String),
+    Column("total_questions", Integer, default=0),
+    Column("session_summary", Text),
+)
+
+emotion_data = Table(
+    "emotion_data", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("session_id", Integer, ForeignKey("interview_sessions.id")),
+    Column("emotion", String, nullable=False),
+    Column("confidence", Float, nullable=False),
+    Column("eye_contact_score", Float, default=0.0),
+    Column("timestamp", DateTime, default=datetime.utcnow),
+)
+
+
+def upgrade(ctx):
+    # Databases created before versioning already have these tables
+    for table in metadata.sorted_tables:
+        ctx.create_table(table)
@@ -0,0 +1,38 @@
+"""Google sign-in: users.google_id, and hashed_password becomes optional"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, text
+
+VERSION = 2
+DESCRIPTION = "users.google_id, nullable hashed_password"
+
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("google_id", String, unique=True, index=True, nullable=True),
+    Column("hashed_password", String, nullable=True),
+    Column("created_at", DateTime, default=datetime.utcnow),
+)
+
+
+def upgrade(ctx):
+    columns = ctx.columns("users")
+    if "google_id" in columns and columns["hashed_password"]["nullable"]:
+        return
+
+    if ctx.dialect == "sqlite":
+        # SQLite can't drop NOT NULL in place: copy into the new definition in chunks, then swap
+        ctx.rebuild_table_online(users)
+        return
+
+    # PostgreSQL (see SUPPORTED_DIALECTS)
+    with ctx.engine.begin() as conn:
+        if "google_id" not in columns:
+            conn.execute(text("ALTER TABLE users ADD COLUMN google_id VARCHAR"))
+        if not columns["hashed_password"]["nullable"]:
+            conn.execute(text("ALTER TABLE users ALTER COLUMN hashed_password DROP NOT NULL"))
+    ctx.create_index_online(next(i for i in users.indexes if i.name == "ix_users_google_id"))
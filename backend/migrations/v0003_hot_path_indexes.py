@@ -0,0 +1,34 @@
+"""Composite indexes for session listing and emotion timelines"""
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, Table
+
+VERSION = 3
+DESCRIPTION = "composite indexes for session listing and emotion timelines"
+
+metadata = MetaData()
+
+interview_sessions = Table(
+    "interview_sessions", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer),
+    Column("start_time", DateTime),
+)
+
+emotion_data = Table(
+    "emotion_data", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("session_id", Integer),
+    Column("timestamp", DateTime),
+)
+
+INDEXES = [
+    Index("ix_interview_sessions_user_id_start_time", interview_sessions.c.user_id, interview_sessions.c.start_time),
+    Index("ix_emotion_data_session_id_timestamp", emotion_data.c.session_id, emotion_data.c.timestamp),
+]
+
+
+def upgrade(ctx):
+    for index in INDEXES:
+        ctx.create_index_online(index)
+    # Refresh planner statistics so the new indexes get picked up
+    with ctx.engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
@@ -0,0 +1,81 @@
+"""Per-user dashboard aggregates"""
+from sqlalchemy import (
+    Column, DateTime, Float, ForeignKey, Integer, JSON, MetaData, String, Table, func, insert, select
+)
+
+VERSION = 4
+DESCRIPTION = "user_stats dashboard aggregates"
+
+metadata = MetaData()
+
+users = Table("users", metadata, Column("id", Integer, primary_key=True))
+
+interview_sessions = Table(
+    "interview_sessions", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer),
+    Column("start_time", DateTime),
+    Column("end_time", DateTime),
+    Column("average_confidence", Float),
+    Column("dominant_emotion", String),
+)
+
+user_stats = Table(
+    "user_stats", metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("session_count", Integer, nullable=False, default=0),
+    Column("completed_sessions", Integer, nullable=False, default=0),
+    Column("average_confidence", Float, nullable=False, default=0.0),
+    Column("emotion_counts", JSON, nullable=False, default=dict),
+    Column("last_activity", DateTime),
+)
+
+
+def _stats_for(conn, user_ids):
+    """Same aggregates as user_stats.rebuild_user_stats, for one id range of users"""
+    stats = {
+        user_id: {"user_id": user_id, "session_count": 0, "completed_sessions": 0,
+                  "average_confidence": 0.0, "emotion_counts": {}, "last_activity": None}
+        for user_id in user_ids
+    }
+    s = interview_sessions.c
+    in_range = s.user_id.between(user_ids[0], user_ids[-1])
+    totals = conn.execute(
+        select(s.user_id, func.count(), func.count(s.average_confidence), func.avg(s.average_confidence),
+               func.max(func.coalesce(s.end_time, s.start_time)))
+        .where(in_range).group_by(s.user_id)
+    )
+    for user_id, session_count, completed, average, last_activity in totals:
+        if user_id in stats:
+            stats[user_id].update(session_count=session_count, completed_sessions=completed,
+                                  average_confidence=average or 0.0, last_activity=last_activity)
+    emotions = conn.execute(
+        select(s.user_id, s.dominant_emotion, func.count())
+        .where(in_range, s.average_confidence.is_not(None), s.dominant_emotion.is_not(None))
+        .group_by(s.user_id, s.dominant_emotion)
+    )
+    for user_id, emotion, count in emotions:
+        if user_id in stats:
+            stats[user_id]["emotion_counts"][emotion] = count
+    return list(stats.values())
+
+
+def upgrade(ctx):
+    if ctx.has_table("user_stats"):
+        return
+    ctx.create_table(user_stats)
+
+    # Backfill in user-id chunks, one short transaction each; users that sign up
+    # meanwhile get higher ids and are picked up by a later chunk
+    last_id, backfilled = 0, 0
+    while True:
+        with ctx.engine.begin() as conn:
+            user_ids = conn.execute(
+                select(users.c.id).where(users.c.id > last_id).order_by(users.c.id).limit(ctx.batch_size)
+            ).scalars().all()
+            if not user_ids:
+                break
+            conn.execute(insert(user_stats), _stats_for(conn, user_ids))
+        last_id = user_ids[-1]
+        backfilled += len(user_ids)
+    ctx.log(f"   backfilled user_stats for {backfilled} user(s)")
@@ -0,0 +1,27 @@
+"""Packed columnar timelines for finished sessions"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, LargeBinary, MetaData, Table
+
+VERSION = 5
+DESCRIPTION = "session_timelines packed storage"
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", Integer, primary_key=True))
+Table("interview_sessions", metadata, Column("id", Integer, primary_key=True))
+
+session_timelines = Table(
+    "session_timelines", metadata,
+    Column("session_id", Integer, ForeignKey("interview_sessions.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("sample_count", Integer, nullable=False),
+    Column("first_timestamp", DateTime, nullable=False),
+    Column("labels", JSON, nullable=False),
+    Column("data", LargeBinary, nullable=False),
+    Column("packed_at", DateTime, default=datetime.utcnow),
+)
+
+
+def upgrade(ctx):
+    ctx.create_table(session_timelines)
@@ -0,0 +1,28 @@
+"""Per-minute aggregates for emotion samples past raw retention"""
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, JSON, MetaData, Table
+
+VERSION = 6
+DESCRIPTION = "emotion_rollups for retention"
+
+metadata = MetaData()
+
+Table("users", metadata, Column("id", Integer, primary_key=True))
+Table("interview_sessions", metadata, Column("id", Integer, primary_key=True))
+
+emotion_rollups = Table(
+    "emotion_rollups", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("session_id", Integer, ForeignKey("interview_sessions.id")),
+    Column("minute", DateTime, nullable=False),
+    Column("samples", Integer, nullable=False),
+    Column("average_confidence", Float, nullable=False),
+    Column("average_eye_contact", Float, nullable=False),
+    Column("emotion_counts", JSON, nullable=False),
+    Index("ix_emotion_rollups_session_id_minute", "session_id", "minute"),
+    Index("ix_emotion_rollups_user_id_minute", "user_id", "minute"),
+)
+
+
+def upgrade(ctx):
+    ctx.create_table(emotion_rollups)
@@ -1,26 +1,129 @@
+import os
+import threading
+import time
+from pathlib import Path
+
 import numpy as np
-import cv2
-from tensorflow.keras.models import load_model
+from dotenv import load_dotenv
+from batching import engine_from_env
+from inference_backends import create_backend
+from frame_cache import FrameCacheRegistry
+from face_tracker import FaceTrackerRegistry
+from preprocessing import preprocess_image_bytes
 
-model = load_model("/Users/cavins/Desktop/project/ai-interview-system/backend/emotion_model.h5", compile=False)
+load_dotenv()
 
 # Emotion labels used during training
 class_names = ['Angry', 'Disgust', 'Fear', 'Happy', 'Sad', 'Surprise', 'Neutral']
 
-def predict_emotion(image_bytes):
-    # Decode image from bytes
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
-    
+DEFAULT_MODEL_PATH = Path(__file__).parent / "emotion_model.h5"
+
+
+class ModelRegistry:
+    """Loads the emotion model backend lazily (or in a background thread) and tracks readiness"""
+
+    NOT_LOADED = "not_loaded"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, model_path: str, backend: str = "keras", warmup_batch_size: int = 1):
+        self.model_path = model_path
+        self.backend = backend
+        self.warmup_batch_size = warmup_batch_size
+        self.state = self.NOT_LOADED
+        self.error = None
+        self.load_seconds = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def is_ready(self) -> bool:
+        return self.state == self.READY
+
+    def _load(self):
+        # Runtimes (TensorFlow, onnxruntime, ...) are imported by the backend, not at API import
+        started = time.perf_counter()
+        model = create_backend(self.backend, self.model_path)
+
+        # Warm-up batch so the first real request doesn't pay graph-tracing cost
+        warmup = np.zeros((self.warmup_batch_size, 48, 48, 1), dtype="float32")
+        model.predict(warmup)
+
+        self.load_seconds = time.perf_counter() - started
+        return model
+
+    def get(self):
+        """Return the loaded backend, loading it synchronously on first use"""
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                self.state = self.LOADING
+                try:
+                    self._model = self._load()
+                except Exception as e:
+                    self.state = self.FAILED
+                    self.error = str(e)
+                    print(f"❌ Failed to load {self.backend} emotion model from {self.model_path}: {e}")
+                    raise
+                self.state = self.READY
+                self.error = None
+                print(f"✅ Emotion model ({self.backend}) loaded in {self.load_seconds:.2f}s")
+        return self._model
+
+    def start_background_load(self):
+        """Kick off loading in a daemon thread; readiness can be polled with is_ready()"""
+        if self.state in (self.LOADING, self.READY):
+            return
+        self.state = self.LOADING
+        thread = threading.Thread(target=self._background_load, name="emotion-model-loader", daemon=True)
+        thread.start()
+
+    def _background_load(self):
+        try:
+            self.get()
+        except Exception:
+            pass
+
+    def status(self):
+        return {
+            "state": self.state,
+            "backend": self.backend,
+            "model_path": str(self.model_path),
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+
+registry = ModelRegistry(
+    os.getenv("EMOTION_MODEL_PATH", str(DEFAULT_MODEL_PATH)),
+    backend=os.getenv("EMOTION_BACKEND", "keras"),
+    warmup_batch_size=int(os.getenv("EMOTION_BATCH_SIZE", "32")),
+)
+
+# All predictions go through the micro-batcher so concurrent frames share one model.predict call
+batcher = engine_from_env(lambda batch: registry.get().predict(batch))
+
+# Per-session reuse of predictions for near-duplicate frames
+frame_cache = FrameCacheRegistry.from_env()
+
+# Per-session face ROI trackers so only the face crop reaches the classifier
+face_trackers = FaceTrackerRegistry.from_env()
+
+def predict_emotion(image_bytes, session_key=None):
+    tracker = face_trackers.get(session_key) if session_key is not None else None
+    img = preprocess_image_bytes(image_bytes, tracker)
     if img is None:
         return "Invalid image"
-    
-    # Resize to 48x48 if needed
-    img = cv2.resize(img, (48, 48))
-    img = img.astype("float32") / 255.0
-    img = np.expand_dims(img, axis=-1)
-    img = np.expand_dims(img, axis=0)
-
-    preds = model.predict(img)
+
+    if session_key is None:
+        preds = batcher.predict(img)
+    else:
+        lookup = frame_cache.lookup(session_key, img)
+        if lookup.cached is not None and not lookup.audit:
+            preds = lookup.cached
+        else:
+            preds = batcher.predict(img)
+            frame_cache.record(session_key, lookup, preds)
     emotion = class_names[np.argmax(preds)]
     return emotion
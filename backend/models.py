@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Index, JSON, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -35,6 +35,11 @@ class InterviewSession(Base):
     # Relationships
     user = relationship("User", back_populates="sessions")
     emotions = relationship("EmotionData", back_populates="session")
+    
+    # Session listing and dashboard: filter by user, newest first
+    __table_args__ = (
+        Index("ix_interview_sessions_user_id_start_time", "user_id", "start_time"),
+    )
 
 class EmotionData(Base):
     __tablename__ = "emotion_data"
@@ -50,3 +55,46 @@ class EmotionData(Base):
     # Relationships
     user = relationship("User", back_populates="emotions")
     session = relationship("InterviewSession", back_populates="emotions")
+    
+    # Session timeline: filter by session, ordered by time
+    __table_args__ = (
+        Index("ix_emotion_data_session_id_timestamp", "session_id", "timestamp"),
+    )
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    completed_sessions = Column(Integer, nullable=False, default=0)
+    average_confidence = Column(Float, nullable=False, default=0.0)  # Running mean over completed sessions
+    emotion_counts = Column(JSON, nullable=False, default=dict)  # Dominant emotion -> completed sessions
+    last_activity = Column(DateTime)
+
+class SessionTimeline(Base):
+    __tablename__ = "session_timelines"
+
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    first_timestamp = Column(DateTime, nullable=False)
+    labels = Column(JSON, nullable=False)  # Emotion code -> name
+    data = Column(LargeBinary, nullable=False)  # Packed columnar samples, see timeline_store.py
+    packed_at = Column(DateTime, default=datetime.utcnow)
+
+class EmotionRollup(Base):
+    __tablename__ = "emotion_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"))
+    minute = Column(DateTime, nullable=False)  # Start of the minute the samples fall in
+    samples = Column(Integer, nullable=False)
+    average_confidence = Column(Float, nullable=False)
+    average_eye_contact = Column(Float, nullable=False)
+    emotion_counts = Column(JSON, nullable=False)  # Emotion -> samples
+
+    __table_args__ = (
+        Index("ix_emotion_rollups_session_id_minute", "session_id", "minute"),
+        Index("ix_emotion_rollups_user_id_minute", "user_id", "minute"),
+    )
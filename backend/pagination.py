@@ -0,0 +1,60 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row of a page, ``(timestamp, id)``,
+encoded as an opaque URL-safe string. The next page continues strictly after
+it, so each page costs one index seek no matter how deep the client has paged.
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]"""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def parse_fields(fields: Optional[str], allowed, default) -> list:
+    """Validate a comma-separated projection against the allowed field names"""
+    if not fields:
+        return list(default)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
@@ -0,0 +1,101 @@
+"""
+Off-loop bcrypt for the async signup and login handlers.
+
+bcrypt costs 100-300 ms of CPU per call. Run inline in an ``async def``
+handler it stalls the event loop, and with it every other request on the
+worker. Here hashing and verification run on a dedicated thread pool
+(the bcrypt C extension releases the GIL) of ``BCRYPT_MAX_CONCURRENCY``
+threads. A login burst then queues behind that cap instead of taking the
+loop or the shared request threadpool. The time spent queued and hashing
+is tracked separately, so a growing queue shows up in /metrics before it
+shows up as slow logins.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from routers.auth import hash_password, verify_and_update_password, BCRYPT_ROUNDS
+
+
+class PasswordHasher:
+    def __init__(self, max_concurrency: int = 2):
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.in_flight = 0
+        self.rehashes = 0
+        self.max_queue_depth = 0
+        self._total_queue_ms = 0.0
+        self.max_queue_ms = 0.0
+        self._total_hash_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> "PasswordHasher":
+        default = max(1, min(4, (os.cpu_count() or 2) // 2))
+        return cls(max_concurrency=int(os.getenv("BCRYPT_MAX_CONCURRENCY", str(default))))
+
+    def _timed(self, fn: Callable, submitted: float, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                queue_ms = (started - submitted) * 1000.0
+                self._total_queue_ms += queue_ms
+                self.max_queue_ms = max(self.max_queue_ms, queue_ms)
+                self._total_hash_ms += (finished - started) * 1000.0
+
+    async def _run(self, fn: Callable, *args):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.in_flight - self.max_concurrency)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, fn, time.perf_counter(), *args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when ``hashed`` was made with a different bcrypt cost"""
+        if not hashed:
+            # Google-only accounts have no password
+            return False, None
+        valid, new_hash = await self._run(verify_and_update_password, password, hashed)
+        if new_hash is not None:
+            with self._lock:
+                self.rehashes += 1
+        return valid, new_hash
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            completed = self.calls - self.in_flight
+            return {
+                "rounds": BCRYPT_ROUNDS,
+                "max_concurrency": self.max_concurrency,
+                "calls": self.calls,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.max_concurrency),
+                "max_queue_depth": self.max_queue_depth,
+                "avg_queue_ms": round(self._total_queue_ms / completed, 2) if completed else 0.0,
+                "max_queue_ms": round(self.max_queue_ms, 2),
+                "avg_hash_ms": round(self._total_hash_ms / completed, 2) if completed else 0.0,
+                "rehashes": self.rehashes,
+            }
+
+
+password_hasher = PasswordHasher.from_env()
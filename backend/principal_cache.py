@@ -0,0 +1,123 @@
+"""
+Authenticated-principal cache for get_current_user.
+
+After the JWT signature and expiry are verified, the token's
+(auth_type, sub) pair is looked up in a bounded LRU with a TTL. A hit
+returns an immutable Principal without touching the database, so handlers
+that only need ``current_user.id`` do no query at all. Users are dropped
+from the cache when they change (e.g. Google ID linking); the TTL bounds
+how long other workers, which don't see that invalidation, can serve a
+stale name or a deleted user.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class Principal(NamedTuple):
+    id: int
+    name: str
+    email: str
+    google_id: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.name, user.email, user.google_id, user.created_at)
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a lookup that started before one must not store its result
+        self._generation = 0
+
+        # Metrics
+        self.lookups = 0
+        self.hits = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "PrincipalCache":
+        return cls(
+            max_entries=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+            ttl_seconds=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, auth_type: str, subject: str) -> Optional[Principal]:
+        key = (auth_type, subject)
+        now = time.monotonic()
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expired += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, auth_type: str, subject: str, principal: Principal, generation: int):
+        """Store a principal read from the database; ``generation`` is ``self.generation`` from before the read"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[(auth_type, subject)] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end((auth_type, subject))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """Forget every cached principal of a user whose row just changed"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            for key in [k for k, (p, _) in self._entries.items() if p.id == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                # Every miss is one user query; before the cache every lookup was
+                "db_lookups": self.lookups - self.hits,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache.from_env()
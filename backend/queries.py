@@ -0,0 +1,70 @@
+"""
+Statements for the hot request paths in main.py.
+
+Kept in one place so test/test_query_plans.py can check each of them
+against EXPLAIN QUERY PLAN and catch a missing index before it turns into
+a full table scan in production.
+"""
+from sqlalchemy import select, or_
+
+from models import User, InterviewSession, EmotionData
+
+
+def user_by_email(email: str):
+    return select(User).where(User.email == email)
+
+
+def user_by_google_id(google_id: str):
+    return select(User).where(User.google_id == google_id)
+
+
+def owned_session(session_id: int, user_id: int):
+    return select(InterviewSession).where(
+        InterviewSession.id == session_id,
+        InterviewSession.user_id == user_id
+    )
+
+
+def user_sessions(user_id: int, limit: int = None):
+    query = select(InterviewSession).where(
+        InterviewSession.user_id == user_id
+    ).order_by(InterviewSession.start_time.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+# Columns a session listing may project; session_summary is the only large one
+SESSION_LIST_FIELDS = (
+    "id", "user_id", "start_time", "end_time", "duration_seconds",
+    "average_confidence", "dominant_emotion", "total_questions", "session_summary",
+)
+
+
+def user_sessions_page(user_id: int, fields, limit: int, after=None):
+    """One keyset page of a user's sessions, newest first, projected to ``fields``.
+
+    ``after`` is the (start_time, id) of the last row of the previous page.
+    start_time and id are always selected so the next cursor can be built.
+    Fetches ``limit + 1`` rows so the caller can tell whether another page exists.
+    """
+    names = list(dict.fromkeys(["id", "start_time", *fields]))
+    query = select(*[getattr(InterviewSession, name) for name in names]).where(
+        InterviewSession.user_id == user_id
+    )
+    if after is not None:
+        start_time, session_id = after
+        # The redundant <= bound lets the planner seek the index instead of filtering from the top
+        query = query.where(
+            InterviewSession.start_time <= start_time,
+            or_(InterviewSession.start_time < start_time, InterviewSession.id < session_id)
+        )
+    return query.order_by(InterviewSession.start_time.desc(), InterviewSession.id.desc()).limit(limit + 1)
+
+
+def session_timeline(session_id: int):
+    return select(
+        EmotionData.emotion, EmotionData.confidence, EmotionData.eye_contact_score, EmotionData.timestamp
+    ).where(
+        EmotionData.session_id == session_id
+    ).order_by(EmotionData.timestamp)
@@ -0,0 +1,358 @@
+"""
+Two-tier cache for LLM-generated interview questions.
+
+Entries are keyed by the normalized (topic, difficulty, count) of a
+question request and hold a pool of ``count * pool_factor`` questions; each
+request gets a random ``count`` of them, so repeat visitors don't see the
+same list every time.
+
+Lookups go through a bounded in-process LRU, then a SQLite file
+(QUESTION_CACHE_PATH) that survives restarts and is shared by every worker
+on the host. An entry younger than ``ttl_seconds`` is fresh. For another
+``stale_seconds`` it is still served, while a background task regenerates
+it (stale-while-revalidate); after that it is a miss and the request waits
+for the LLM. Concurrent misses for one key share a single completion, run in
+its own task so no one caller can cancel it for the rest, and LLM fallbacks
+are never cached. Background refreshes take a slot of the LLM admission gate
+like any request that reaches the LLM. The SQLite tier is capped at
+``max_entries``, evicting the least recently used rows.
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from rate_limit import AdmissionGate, llm_gate
+
+# (topic, difficulty, pool size) -> questions, or None when the LLM is unavailable
+Generator = Callable[[str, str, int], Awaitable[Optional[List[str]]]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS question_cache (
+    key TEXT PRIMARY KEY,
+    questions TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_question_cache_last_used ON question_cache (last_used_at);
+"""
+
+
+def question_texts(items) -> List[str]:
+    """The question strings of a generated list, deduplicated in order.
+
+    Models sometimes answer with objects like {"question": "..."} instead of
+    plain strings; those are reduced to their text and anything else is dropped.
+    """
+    texts = []
+    for item in items or ():
+        if isinstance(item, dict):
+            item = item.get("question") or item.get("text")
+        if isinstance(item, str) and item.strip():
+            texts.append(item.strip())
+    return list(dict.fromkeys(texts))
+
+
+class CacheKey(NamedTuple):
+    topic: str
+    difficulty: str
+    count: int
+
+    @classmethod
+    def normalize(cls, topic: str, difficulty: str, count: int) -> "CacheKey":
+        return cls(" ".join(topic.lower().split()), difficulty.strip().lower(), count)
+
+    def encode(self) -> str:
+        return f"{self.topic}|{self.difficulty}|{self.count}"
+
+    @classmethod
+    def decode(cls, key: str) -> "CacheKey":
+        topic, difficulty, count = key.rsplit("|", 2)
+        return cls(topic, difficulty, int(count))
+
+
+class Entry(NamedTuple):
+    questions: List[str]
+    created_at: float  # Wall clock, so ages carry across restarts and workers
+
+
+class QuestionStore:
+    """The persistent tier: one SQLite connection, serialized by a lock"""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[Entry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT questions, created_at FROM question_cache WHERE key = ?", (key.encode(),)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE question_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key.encode()),
+            )
+        return Entry(json.loads(row[0]), row[1])
+
+    def put(self, key: CacheKey, entry: Entry) -> int:
+        """Store an entry; returns how many least recently used rows were evicted to make room"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO question_cache (key, questions, created_at, last_used_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET questions = excluded.questions, created_at = excluded.created_at",
+                (key.encode(), json.dumps(entry.questions), entry.created_at, time.time()),
+            )
+            return self._conn.execute(
+                "DELETE FROM question_cache WHERE key IN ("
+                "SELECT key FROM question_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+
+    def add_hits(self, hits: Dict[CacheKey, int]):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE question_cache SET hits = hits + ?, last_used_at = ? WHERE key = ?",
+                [(count, time.time(), key.encode()) for key, count in hits.items()],
+            )
+
+    def popular(self, limit: int) -> List[CacheKey]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM question_cache ORDER BY hits DESC, last_used_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [CacheKey.decode(row[0]) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM question_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QuestionCache:
+    def __init__(self, store: Optional[QuestionStore], memory_entries: int = 256,
+                 ttl_seconds: float = 7 * 86400.0, stale_seconds: float = 86400.0,
+                 pool_factor: int = 3, max_pool: int = 30, gate: Optional[AdmissionGate] = None):
+        self.store = store
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.pool_factor = pool_factor
+        self.max_pool = max_pool
+        self._memory: "OrderedDict[CacheKey, Entry]" = OrderedDict()
+        # Memory-tier hits not yet counted in the store, so popularity survives restarts
+        self._pending_hits: Dict[CacheKey, int] = {}
+        self._lock = threading.Lock()
+        self.gate = gate
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self._refreshing: Dict[CacheKey, asyncio.Task] = {}
+
+        # Metrics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.uncached = 0  # Generator had no questions (LLM down); the caller falls back
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, gate: Optional[AdmissionGate] = None) -> "QuestionCache":
+        ttl_seconds = float(os.getenv("QUESTION_CACHE_TTL_SECONDS", str(7 * 86400)))
+        store = None
+        if ttl_seconds > 0:
+            store = QuestionStore(
+                os.getenv("QUESTION_CACHE_PATH", "./question_cache.db"),
+                max_entries=int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "5000")),
+            )
+        return cls(
+            store,
+            memory_entries=int(os.getenv("QUESTION_CACHE_MEMORY_ENTRIES", "256")),
+            ttl_seconds=ttl_seconds,
+            stale_seconds=float(os.getenv("QUESTION_CACHE_STALE_SECONDS", "86400")),
+            pool_factor=int(os.getenv("QUESTION_CACHE_POOL_FACTOR", "3")),
+            gate=gate,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None and self.ttl_seconds > 0
+
+    def pool_size(self, count: int) -> int:
+        return max(count, min(self.max_pool, count * self.pool_factor))
+
+    def _remember(self, key: CacheKey, entry: Entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    async def _lookup(self, key: CacheKey) -> Tuple[Optional[Entry], str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                return entry, "memory"
+        entry = await run_in_threadpool(self.store.get, key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry, "disk"
+
+    async def _generate(self, key: CacheKey, generator: Generator) -> Optional[Entry]:
+        """Generate and store a pool for ``key``; concurrent callers for one key share the completion"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # Its own task, so the caller that started it going away doesn't cancel it for the others
+            task = asyncio.create_task(self._produce(key, generator))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _produce(self, key: CacheKey, generator: Generator) -> Optional[Entry]:
+        try:
+            questions = question_texts(await generator(key.topic, key.difficulty, self.pool_size(key.count)))
+        except Exception as e:
+            # Every waiting caller falls back, rather than failing on one shared error
+            print(f"Question generation failed for {key}: {e}")
+            return None
+        if not questions:
+            return None
+        entry = Entry(questions, time.time())
+        self._remember(key, entry)
+        self.evictions += await run_in_threadpool(self._store, key, entry)
+        return entry
+
+    def _store(self, key: CacheKey, entry: Entry) -> int:
+        self.flush_hits()
+        return self.store.put(key, entry)
+
+    async def _refresh(self, key: CacheKey, generator: Generator):
+        try:
+            # Another worker sharing the file may have refreshed it already
+            stored = await run_in_threadpool(self.store.get, key)
+            if stored is not None and time.time() - stored.created_at < self.ttl_seconds:
+                self._remember(key, stored)
+                self.refreshes += 1
+            elif await self._gated_generate(key, generator) is None:
+                self.refresh_failures += 1
+            else:
+                self.refreshes += 1
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"Question cache refresh failed for {key}: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def _gated_generate(self, key: CacheKey, generator: Generator) -> Optional[Entry]:
+        """_generate holding a slot of the LLM gate; background refreshes have no request to admit them"""
+        if self.gate is None:
+            return await self._generate(key, generator)
+        entered = await self.gate.acquire()  # 429 when the gate is saturated: the refresh is retried later
+        try:
+            return await self._generate(key, generator)
+        finally:
+            self.gate.release(entered)
+
+    def _sample(self, entry: Entry, count: int) -> List[str]:
+        if len(entry.questions) <= count:
+            return list(entry.questions)
+        return random.sample(entry.questions, count)
+
+    async def get(self, topic: str, difficulty: str, count: int, generator: Generator) -> Optional[List[str]]:
+        """``count`` questions for the request, or None when nothing is cached and the generator has none"""
+        if not self.enabled:
+            return question_texts(await generator(topic, difficulty, count)) or None
+
+        key = CacheKey.normalize(topic, difficulty, count)
+        entry, tier = await self._lookup(key)
+        age = time.time() - entry.created_at if entry is not None else None
+
+        if age is not None and age < self.ttl_seconds:
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.disk_hits += 1
+            return self._sample(entry, count)
+
+        if age is not None and age < self.ttl_seconds + self.stale_seconds:
+            self.stale_hits += 1
+            if key not in self._refreshing:
+                self._refreshing[key] = asyncio.create_task(self._refresh(key, generator))
+            return self._sample(entry, count)
+
+        self.misses += 1
+        entry = await self._generate(key, generator)
+        if entry is None:
+            self.uncached += 1
+            return None
+        return self._sample(entry, count)
+
+    async def warm(self, keys: List[CacheKey], generator: Generator, force: bool = False) -> Dict[CacheKey, str]:
+        """Generate every key that is missing or past its TTL (all of them with ``force``); key -> outcome"""
+        outcomes = {}
+        for key in keys:
+            entry, _ = await self._lookup(key)
+            if not force and entry is not None and time.time() - entry.created_at < self.ttl_seconds:
+                outcomes[key] = "fresh"
+                continue
+            outcomes[key] = "warmed" if await self._generate(key, generator) else "failed"
+        return outcomes
+
+    def flush_hits(self):
+        """Write memory-tier hit counts to the store (popular topics for warming)"""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if pending and self.store is not None:
+            self.store.add_hits(pending)
+
+    def close(self):
+        if self.store is not None:
+            self.flush_hits()
+            self.store.close()
+
+    def metrics(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.stale_hits + self.misses
+        with self._lock:
+            memory = len(self._memory)
+        return {
+            "enabled": self.enabled,
+            "memory_entries": memory,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (lookups - self.misses) / lookups if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "uncached": self.uncached,
+            "evictions": self.evictions,
+        }
+
+
+question_cache = QuestionCache.from_env(gate=llm_gate)
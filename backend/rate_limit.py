@@ -0,0 +1,297 @@
+"""
+Rate limiting and admission control for the expensive routes.
+
+Token buckets
+    Each limited route has an optional per-user and per-IP bucket
+    (``rate`` tokens per second refilled up to ``burst``). A request takes
+    one token from every bucket that applies; an empty bucket is a 429 with
+    Retry-After set to the time until the next token. Buckets live in
+    process memory by default. Set RATE_LIMIT_STORE=redis://... to share
+    them between workers (needs the ``redis`` package).
+
+Admission gates
+    Inference and LLM routes also pass a per-process gate: at most
+    ``max_concurrent`` requests run, ``max_waiting`` more may queue, and
+    anything beyond that is rejected at once with 429 instead of piling up
+    behind a slow model or completion.
+
+Limits are configured per route with RATE_LIMIT_<ROUTE>_USER and
+RATE_LIMIT_<ROUTE>_IP, e.g. ``10/s:20`` (10 per second, bursts of 20),
+``6/min:3`` or ``off``.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, NamedTuple, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+
+PERIODS = {"s": 1.0, "sec": 1.0, "min": 60.0, "h": 3600.0, "hour": 3600.0}
+
+
+class Limit(NamedTuple):
+    rate: float  # Tokens per second
+    burst: int
+
+
+def parse_limit(spec: Optional[str]) -> Optional[Limit]:
+    """``"10/s:20"`` -> Limit(10.0, 20); burst defaults to the per-period count; ``off`` -> None"""
+    if not spec or spec.strip().lower() in ("off", "none", "0"):
+        return None
+    amount, _, rest = spec.strip().partition("/")
+    period, _, burst = rest.partition(":")
+    count = float(amount)
+    seconds = PERIODS[period or "s"]
+    return Limit(rate=count / seconds, burst=int(burst) if burst else max(1, math.ceil(count)))
+
+
+# route -> (per-user, per-IP) defaults
+DEFAULT_LIMITS = {
+    "analyze": ("10/s:20", "30/s:60"),  # A 30 fps client is throttled to the 10 fps the UI needs
+    "analyze_answer": ("6/min:3", "30/min:10"),
+    "analyze_comprehensive": ("6/min:3", "30/min:10"),
+    "generate_questions": ("6/min:3", "30/min:10"),
+    "login": ("5/min:5", "20/min:10"),  # Per account (email) and per IP; each attempt costs a bcrypt
+}
+
+
+class MemoryBucketStore:
+    """Token buckets in a bounded LRU; an evicted bucket simply starts full again"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        """Take a token; returns 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(limit.burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(limit.burst), bucket[0] + (now - bucket[1]) * limit.rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / limit.rate
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through Redis, updated atomically in a Lua script"""
+
+    SCRIPT = """
+    local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens, ts = tonumber(state[1]), tonumber(state[2])
+    if tokens == nil then
+        tokens, ts = burst, now
+    end
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        return float(await self._script(keys=[self.prefix + key], args=[limit.rate, limit.burst, time.time()]))
+
+
+def create_bucket_store(url: Optional[str]):
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisBucketStore(url)
+        except ImportError:
+            print("⚠️  RATE_LIMIT_STORE is Redis but the redis package is not installed; "
+                  "using per-process buckets")
+    return MemoryBucketStore()
+
+
+class AdmissionGate:
+    """Bounded concurrency with a bounded wait queue for one class of expensive routes"""
+
+    def __init__(self, name: str, max_concurrent: int, max_waiting: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self._avg_hold = 0.0  # EWMA of seconds a request holds a slot, for Retry-After
+
+        # Metrics
+        self.admitted = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, name: str, max_concurrent: int, max_waiting: int) -> "AdmissionGate":
+        prefix = f"ADMISSION_{name.upper()}"
+        return cls(
+            name,
+            max_concurrent=int(os.getenv(f"{prefix}_MAX_CONCURRENT", str(max_concurrent))),
+            max_waiting=int(os.getenv(f"{prefix}_MAX_WAITING", str(max_waiting))),
+        )
+
+    def retry_after(self) -> int:
+        # Roughly how long until the queue ahead would drain
+        return max(1, math.ceil(self._avg_hold * (self.waiting + 1) / self.max_concurrent))
+
+    async def acquire(self) -> float:
+        """Wait for a slot, or raise 429 at once when the wait queue is full; returns the entry time"""
+        if self.active >= self.max_concurrent and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Server busy ({self.name}), try again shortly",
+                headers={"Retry-After": str(self.retry_after())},
+            )
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        return time.perf_counter()
+
+    def release(self, entered: float):
+        held = time.perf_counter() - entered
+        self._avg_hold = held if self._avg_hold == 0.0 else 0.9 * self._avg_hold + 0.1 * held
+        self.active -= 1
+        self._semaphore.release()
+
+    def metrics(self) -> Dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_waiting": self.max_waiting,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_hold_ms": round(self._avg_hold * 1000.0, 1),
+        }
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, tuple], store=None, enabled: bool = True,
+                 trust_forwarded: bool = False):
+        self.limits = limits  # route -> (per-user Limit or None, per-IP Limit or None)
+        self.store = store or MemoryBucketStore()
+        self.enabled = enabled
+        self.trust_forwarded = trust_forwarded
+        self._lock = threading.Lock()
+
+        # Metrics
+        # "route:user" / "route:ip" -> count
+        self.allowed = defaultdict(int)
+        self.rejected = defaultdict(int)
+        self.store_errors = 0
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        limits = {}
+        for route, (user_spec, ip_spec) in DEFAULT_LIMITS.items():
+            prefix = f"RATE_LIMIT_{route.upper()}"
+            limits[route] = (parse_limit(os.getenv(f"{prefix}_USER", user_spec)),
+                             parse_limit(os.getenv(f"{prefix}_IP", ip_spec)))
+        return cls(
+            limits,
+            store=create_bucket_store(os.getenv("RATE_LIMIT_STORE", "memory")),
+            enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true",
+            trust_forwarded=os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true",
+        )
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def _take(self, key: str, limit: Limit) -> float:
+        try:
+            return await self.store.take(key, limit)
+        except Exception as e:
+            # A shared store outage must not take the API down with it: fail open
+            with self._lock:
+                self.store_errors += 1
+            print(f"Rate limit store error: {e}")
+            return 0.0
+
+    async def check(self, route: str, ip: Optional[str] = None, user_key: Optional[str] = None):
+        """Take a token from each bucket of ``route`` that applies; 429 when any is empty"""
+        if not self.enabled:
+            return
+        user_limit, ip_limit = self.limits.get(route, (None, None))
+        for scope, key, limit in (("user", user_key, user_limit), ("ip", ip, ip_limit)):
+            if key is None or limit is None:
+                continue
+            wait = await self._take(f"{route}:{scope}:{key}", limit)
+            if wait > 0:
+                with self._lock:
+                    self.rejected[f"{route}:{scope}"] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                )
+            with self._lock:
+                self.allowed[f"{route}:{scope}"] += 1
+
+    def limit(self, route: str, user_dependency: Optional[Callable] = None) -> Callable:
+        """Dependency limiting ``route`` per client IP, and per user when given the auth dependency"""
+        if user_dependency is None:
+            async def limit_by_ip(request: Request):
+                await self.check(route, ip=self.client_ip(request))
+            return limit_by_ip
+
+        async def limit_by_user_and_ip(request: Request, current_user=Depends(user_dependency)):
+            await self.check(route, ip=self.client_ip(request), user_key=str(current_user.id))
+        return limit_by_user_and_ip
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "store": type(self.store).__name__,
+                "allowed": dict(self.allowed),
+                "rejected": dict(self.rejected),
+                "store_errors": self.store_errors,
+            }
+
+
+def admit(gate: AdmissionGate) -> Callable:
+    """Dependency holding a slot of ``gate`` for the duration of the request"""
+    async def admission():
+        entered = await gate.acquire()
+        try:
+            yield
+        finally:
+            gate.release(entered)
+    return admission
+
+
+rate_limiter = RateLimiter.from_env()
+inference_gate = AdmissionGate.from_env("inference", max_concurrent=32, max_waiting=64)
+llm_gate = AdmissionGate.from_env("llm", max_concurrent=8, max_waiting=16)
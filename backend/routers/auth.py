@@ -1,22 +1,35 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import os
 
 SECRET_KEY = "supersecret"   # change this in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost; pick one for your hardware with calibrate_bcrypt.py. Hashes made with
+# another cost still verify and are rehashed at the configured cost on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-def hash_password(password: str):
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+def _truncate(password: str) -> str:
     # Truncate password to 72 bytes to avoid bcrypt limit
     if len(password.encode('utf-8')) > 72:
         password = password[:72]
-    return pwd_context.hash(password)
+    return password
+
+def hash_password(password: str):
+    return pwd_context.hash(_truncate(password))
 
 def verify_password(password: str, hashed: str):
     return pwd_context.verify(password, hashed)
 
+def verify_and_update_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and return a new hash too when ``hashed`` uses a different cost than configured"""
+    return pwd_context.verify_and_update(_truncate(password), hashed)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
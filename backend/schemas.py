@@ -75,6 +75,18 @@ class SessionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class SessionListItem(BaseModel):
+    """A session row in a listing; only the projected fields are returned"""
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    duration_seconds: Optional[int] = None
+    average_confidence: Optional[float] = None
+    dominant_emotion: Optional[str] = None
+    total_questions: Optional[int] = None
+    session_summary: Optional[str] = None
+
 class SessionSummary(BaseModel):
     session_id: int
     start_time: datetime
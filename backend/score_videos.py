@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Offline batch scoring of recorded interview videos.
+
+Videos are split into fixed-length segments, and the segments are decoded in
+a process pool at ``--sample-fps``. The sampled frames are batched into the
+emotion model in this process. Results are written either as EmotionData rows
+(``--output db``) or as one columnar file per segment (``--output parquet``,
+falling back to .npz when pyarrow is missing).
+
+Progress is recorded per segment in a small SQLite state file, so an
+interrupted run picks up where it stopped. A segment that fails to decode,
+score or write is logged and recorded there too, and retried on the next run;
+a segment that decodes to no frames is neither written nor marked done. When
+the container doesn't report its length (webm from MediaRecorder usually
+doesn't), segments are scheduled one after another until one comes back
+empty.
+
+Scoring a segment replaces its previous output; with ``--output db`` that
+means every sample of the session inside the segment's time window (rows, or
+the packed timeline of a compacted session), so a re-score after a model
+update supersedes the live timeline rather than duplicating it. Re-scored samples keep the eye-contact scores the
+live session recorded, and a completed session's average confidence, dominant
+emotion and its user's dashboard stats are recomputed from the new timeline.
+
+Examples:
+    python score_videos.py recordings/ --output db --sample-fps 2 --workers 8
+    python score_videos.py session_42.mp4 --output parquet --output-dir timelines/
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+VIDEO_EXTENSIONS = {".mp4", ".webm", ".mkv", ".mov", ".avi"}
+
+
+# --- Decoding (runs in worker processes) ---
+
+def decode_segment(path, start_s, end_s, sample_fps, face_tracking):
+    """Return (offsets_ms, uint8 frames of shape (N, 48, 48)) for one segment"""
+    import cv2
+    from preprocessing import resize_to_input
+
+    cv2.setNumThreads(1)
+    tracker = None
+    if face_tracking:
+        from face_tracker import FaceROITracker
+        tracker = FaceROITracker()
+
+    capture = cv2.VideoCapture(path)
+    capture.set(cv2.CAP_PROP_POS_MSEC, start_s * 1000.0)
+    step_ms = 1000.0 / sample_fps
+    next_ms = start_s * 1000.0
+    offsets, frames = [], []
+    try:
+        while True:
+            # grab() skips the colour conversion; only sampled frames are retrieved
+            if not capture.grab():
+                break
+            pos_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+            if pos_ms >= end_s * 1000.0:
+                break
+            if pos_ms + 1e-3 < next_ms:
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if tracker is not None:
+                gray = tracker.crop(gray)
+            frames.append(resize_to_input(gray))
+            offsets.append(int(pos_ms))
+            next_ms += step_ms
+    finally:
+        capture.release()
+
+    if not frames:
+        return np.empty(0, dtype=np.int64), np.empty((0, 48, 48), dtype=np.uint8)
+    return np.asarray(offsets, dtype=np.int64), np.stack(frames)
+
+
+def video_duration_s(path):
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        count = capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+    finally:
+        capture.release()
+    return count / fps if fps > 0 else 0.0
+
+
+# --- Resume state ---
+
+class ScoringState:
+    """Per-segment progress in a standalone SQLite file"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scored_segments (
+                video TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                video_mtime REAL NOT NULL,
+                frames INTEGER NOT NULL,
+                scored_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (video, segment)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS failed_segments (
+                video TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                video_mtime REAL NOT NULL,
+                error TEXT NOT NULL,
+                failed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (video, segment)
+            )
+        """)
+        self.conn.commit()
+
+    def done_segments(self, video, mtime):
+        rows = self.conn.execute(
+            "SELECT segment FROM scored_segments WHERE video = ? AND video_mtime = ?", (video, mtime)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_done(self, video, segment, mtime, frames):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO scored_segments (video, segment, video_mtime, frames) VALUES (?, ?, ?, ?)",
+            (video, segment, mtime, frames),
+        )
+        self.conn.execute("DELETE FROM failed_segments WHERE video = ? AND segment = ?", (video, segment))
+        self.conn.commit()
+
+    def mark_failed(self, video, segment, mtime, error):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO failed_segments (video, segment, video_mtime, error) VALUES (?, ?, ?, ?)",
+            (video, segment, mtime, error),
+        )
+        self.conn.commit()
+
+    def failed_segments(self):
+        return self.conn.execute(
+            "SELECT video, segment, error FROM failed_segments ORDER BY video, segment"
+        ).fetchall()
+
+
+# --- Output writers ---
+
+def nearest_eye_contact(existing, timestamps):
+    """Eye-contact score of the closest existing (timestamp, score) sample for each new timestamp.
+
+    The emotion model doesn't measure eye contact, so re-scored samples carry
+    over what the live session recorded instead of overwriting it.
+    """
+    if not existing:
+        return [0.0] * len(timestamps)
+    known = np.array([ts for ts, _ in existing], dtype="datetime64[ms]")
+    scores = [score for _, score in existing]
+    wanted = np.array(timestamps, dtype="datetime64[ms]")
+    right = np.clip(np.searchsorted(known, wanted), 0, len(known) - 1)
+    left = np.clip(right - 1, 0, len(known) - 1)
+    closer_left = np.abs(wanted - known[left]) <= np.abs(known[right] - wanted)
+    return [scores[i] for i in np.where(closer_left, left, right)]
+
+
+class DatabaseWriter:
+    """Writes the InterviewSession matched from the file name, as EmotionData rows or into its packed timeline"""
+
+    def __init__(self, session_pattern, session_id=None, session_factory=None):
+        if session_factory is None:
+            from database import SessionLocal as session_factory
+        self.SessionLocal = session_factory
+        self.session_pattern = re.compile(session_pattern)
+        self.session_id = session_id
+        self._sessions = {}
+
+    def _session_for(self, video):
+        if self.session_id is not None:
+            session_id = self.session_id
+        else:
+            match = self.session_pattern.search(Path(video).stem)
+            if not match:
+                return None
+            session_id = int(match.group(1))
+
+        if session_id not in self._sessions:
+            from models import InterviewSession
+            db = self.SessionLocal()
+            try:
+                session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+                self._sessions[session_id] = (
+                    (session.id, session.user_id, session.start_time) if session else None
+                )
+            finally:
+                db.close()
+        return self._sessions[session_id]
+
+    def can_write(self, video):
+        return self._session_for(video) is not None
+
+    def write(self, video, segment, start_s, end_s, offsets_ms, labels, confidences):
+        from sqlalchemy import delete, select
+        from models import EmotionData, SessionTimeline
+        import timeline_store
+
+        session_id, user_id, start_time = self._session_for(video)
+        window_start = start_time + timedelta(seconds=start_s)
+        window_end = start_time + timedelta(seconds=end_s)
+        in_window = (
+            EmotionData.session_id == session_id,
+            EmotionData.timestamp >= window_start,
+            EmotionData.timestamp < window_end,
+        )
+        db = self.SessionLocal()
+        try:
+            timeline = db.get(SessionTimeline, session_id)
+            packed = timeline_store.timeline_samples(timeline) if timeline is not None else []
+            replaced = sorted(
+                [(ts, eye) for _, _, eye, ts in packed if window_start <= ts < window_end]
+                + [tuple(row) for row in db.execute(
+                    select(EmotionData.timestamp, EmotionData.eye_contact_score).where(*in_window))]
+            )
+            timestamps = [start_time + timedelta(milliseconds=int(offset)) for offset in offsets_ms]
+            samples = [
+                (label, float(confidence), eye, ts)
+                for label, confidence, eye, ts in zip(
+                    labels, confidences, nearest_eye_contact(replaced, timestamps), timestamps)
+            ]
+
+            # Replace anything a previous run (or the live session) stored for this window
+            db.execute(delete(EmotionData).where(*in_window))
+            if timeline is not None:
+                # Compacted session: rewrite the packed timeline so it stays compacted
+                kept = [s for s in packed if not window_start <= s[3] < window_end]
+                merged = sorted(kept + samples, key=lambda s: s[3])
+                if merged:
+                    for field, value in timeline_store.pack_timeline(merged).items():
+                        setattr(timeline, field, value)
+                else:
+                    db.delete(timeline)
+            else:
+                db.bulk_insert_mappings(EmotionData, [
+                    {
+                        "user_id": user_id,
+                        "session_id": session_id,
+                        "emotion": label,
+                        "confidence": confidence,
+                        "eye_contact_score": eye,
+                        "timestamp": ts,
+                    }
+                    for label, confidence, eye, ts in samples
+                ])
+            self._rescore_session(db, session_id, user_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _rescore_session(self, db, session_id, user_id):
+        """Recompute a completed session's scores from its new timeline and refresh the user's stats"""
+        from models import InterviewSession
+        import timeline_store
+        import user_stats
+
+        db.flush()
+        session = db.get(InterviewSession, session_id)
+        if session.average_confidence is None:
+            return  # Still live; it is scored when it is completed
+        samples = timeline_store.session_samples(db, session_id)
+        if not samples:
+            return
+        emotions = [s[0] for s in samples]
+        session.average_confidence = round(float(np.mean([s[1] for s in samples])), 2)
+        session.dominant_emotion = max(set(emotions), key=emotions.count)
+        user_stats.refresh_user_stats(db, user_id)
+
+
+class ColumnarWriter:
+    """One file per segment: offset_ms, emotion code, confidence (+ label table)"""
+
+    def __init__(self, output_dir, class_names):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.class_names = class_names
+        try:
+            import pyarrow  # noqa: F401
+            self.format = "parquet"
+        except ImportError:
+            self.format = "npz"
+
+    def can_write(self, video):
+        return True
+
+    def write(self, video, segment, start_s, end_s, offsets_ms, labels, confidences):
+        codes = np.asarray([self.class_names.index(label) for label in labels], dtype=np.uint8)
+        target = self.output_dir / f"{Path(video).stem}.seg{segment:05d}.{self.format}"
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table({
+                "offset_ms": pa.array(offsets_ms, pa.int64()),
+                "emotion": pa.DictionaryArray.from_arrays(pa.array(codes, pa.uint8()), pa.array(self.class_names)),
+                "confidence": pa.array(np.asarray(confidences, dtype=np.float32)),
+            })
+            pq.write_table(table, target)
+        else:
+            np.savez_compressed(target, offset_ms=offsets_ms, emotion_code=codes,
+                                confidence=np.asarray(confidences, dtype=np.float32),
+                                class_names=np.asarray(self.class_names))
+
+
+# --- Driver ---
+
+def find_videos(inputs):
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix.lower() in VIDEO_EXTENSIONS)
+        elif path.exists():
+            yield path
+        else:
+            print(f"⚠️  Skipping missing input {item}")
+
+
+def score(model, frames, batch_size, buffer):
+    """Run the model over uint8 frames in fixed-size batches"""
+    scores = []
+    for i in range(0, len(frames), batch_size):
+        scores.append(np.array(model.predict(buffer.fill(frames[i:i + batch_size]))))
+    return np.concatenate(scores) if scores else np.empty((0, 0), dtype=np.float32)
+
+
+def plan_segments(duration, segment_seconds, done):
+    """(segment, open_ended) pairs still to score for a video.
+
+    With a known duration that is every segment not yet done. Without one,
+    gaps below the last done segment are scheduled as they are, and the
+    segment after it is open-ended: each open-ended segment that yields frames
+    schedules the next, until one comes back empty.
+    """
+    if duration > 0:
+        return [(segment, False) for segment in range(int(np.ceil(duration / segment_seconds)))
+                if segment not in done]
+    frontier = max(done) + 1 if done else 0
+    return [(segment, False) for segment in range(frontier) if segment not in done] + [(frontier, True)]
+
+
+def write_segment(writer, state, task, offsets, frames, model, buffer, batch_size, class_names):
+    """Score one decoded segment, write it and mark it done; False when it had no frames.
+
+    An empty segment is past the end of the video (or undecodable), and writing
+    it would delete whatever the window already holds, so it is skipped and
+    left for the next run.
+    """
+    video_key, mtime, segment, start, end, _ = task
+    if not len(frames):
+        return False
+    scores = score(model, frames, batch_size, buffer)
+    labels = [class_names[i] for i in scores.argmax(axis=1)]
+    writer.write(video_key, segment, start, end, offsets, labels, scores.max(axis=1))
+    state.mark_done(video_key, segment, mtime, len(frames))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score recorded interview videos with the emotion model")
+    parser.add_argument("inputs", nargs="+", help="Video files or directories")
+    parser.add_argument("--output", choices=["db", "parquet"], default="parquet")
+    parser.add_argument("--output-dir", default="timelines", help="Directory for columnar output")
+    parser.add_argument("--session-pattern", default=r"session[_-]?(\d+)",
+                        help="Regex with one group extracting the InterviewSession id from the file name")
+    parser.add_argument("--session-id", type=int, help="Session id to use for every input (db output)")
+    parser.add_argument("--sample-fps", type=float, default=2.0)
+    parser.add_argument("--segment-seconds", type=float, default=120.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--face-tracking", action="store_true", help="Crop to the tracked face before scoring")
+    parser.add_argument("--state", default="scoring_state.db", help="Resume state file")
+    args = parser.parse_args()
+
+    from inference_backends import create_backend
+    from model_loader import class_names, registry
+    from preprocessing import FrameBatchBuffer
+
+    if args.output == "db":
+        writer = DatabaseWriter(args.session_pattern, args.session_id)
+    else:
+        writer = ColumnarWriter(args.output_dir, class_names)
+    state = ScoringState(args.state)
+
+    # Build the segment work list, skipping what a previous run already finished
+    tasks = []
+    for video in find_videos(args.inputs):
+        video_key = str(video.resolve())
+        if not writer.can_write(video_key):
+            print(f"⚠️  No InterviewSession matched for {video.name}, skipping")
+            continue
+        mtime = video.stat().st_mtime
+        done = state.done_segments(video_key, mtime)
+        for segment, open_ended in plan_segments(video_duration_s(video_key), args.segment_seconds, done):
+            start = segment * args.segment_seconds
+            tasks.append((video_key, mtime, segment, start, start + args.segment_seconds, open_ended))
+    if not tasks:
+        print("✅ Nothing to score")
+        return
+
+    print(f"🔄 Scoring {len(tasks)} segments with {args.workers} decode workers "
+          f"({registry.backend} backend, {args.sample_fps} fps)")
+
+    # spawn so decode workers never inherit the model or its runtime threads
+    executor = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    model = create_backend(registry.backend, registry.model_path)
+    buffer = FrameBatchBuffer(args.batch_size)
+
+    started = time.perf_counter()
+    total_frames = 0
+    failures = 0
+    pending = {}
+    queue = list(reversed(tasks))
+    try:
+        while queue or pending:
+            # Bounded look-ahead keeps decoded frames from piling up in memory
+            while queue and len(pending) < args.workers * 2:
+                task = queue.pop()
+                video_key, mtime, segment, start, end, _ = task
+                future = executor.submit(decode_segment, video_key, start, end, args.sample_fps, args.face_tracking)
+                pending[future] = task
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                task = pending.pop(future)
+                video_key, mtime, segment, start, end, open_ended = task
+                name = Path(video_key).name
+                try:
+                    offsets, frames = future.result()
+                    written = write_segment(writer, state, task, offsets, frames, model, buffer,
+                                            args.batch_size, class_names)
+                except Exception as e:
+                    # One bad segment shouldn't stop the run; it is retried next time
+                    failures += 1
+                    state.mark_failed(video_key, segment, mtime, f"{type(e).__name__}: {e}")
+                    print(f"❌ {name} segment {segment} failed: {e}")
+                    continue
+                if not written:
+                    if not open_ended:
+                        print(f"⚠️  {name} segment {segment}: no frames decoded, not marked done")
+                    continue
+                if open_ended:
+                    # Length unknown: keep going until a segment comes back empty
+                    queue.append((video_key, mtime, segment + 1, end, end + args.segment_seconds, True))
+
+                total_frames += len(frames)
+                elapsed = time.perf_counter() - started
+                print(f"  {name} segment {segment}: {len(frames)} frames "
+                      f"({total_frames / elapsed:.0f} frames/s overall)")
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted; completed segments are saved and will be skipped next run")
+        executor.shutdown(wait=False, cancel_futures=True)
+        sys.exit(130)
+    executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    video_hours = total_frames / args.sample_fps / 3600
+    print(f"✅ Scored {total_frames} frames ({video_hours:.2f} h of video) in {elapsed:.1f}s")
+    if failures:
+        print(f"⚠️  {failures} segments failed and will be retried next run (see failed_segments in {args.state})")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,9 @@ from schemas import (
     SessionCreate, SessionUpdate, SessionResponse, SessionSummary,
     DashboardStats
 )
-from routers.auth import hash_password, verify_password, create_access_token, SECRET_KEY, ALGORITHM
+from routers.auth import create_access_token, SECRET_KEY, ALGORITHM
+from password_hasher import password_hasher
+from principal_cache import Principal, principal_cache
 
 # Initialize FastAPI app
 app = FastAPI(title="AI Interview Coach API", version="1.0.0")
@@ -37,7 +39,7 @@ app.add_middleware(
 init_db()
 
 # Authentication dependencies
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -54,7 +56,12 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except JWTError:
         raise credentials_exception
     
+    principal = principal_cache.get(auth_type, user_identifier)
+    if principal is not None:
+        return principal
+    
     # Find user by email or Google ID based on auth type
+    generation = principal_cache.generation
     if auth_type == "google":
         user = db.query(User).filter(User.google_id == user_identifier).first()
     else:
@@ -62,7 +69,9 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(auth_type, user_identifier, principal, generation)
+    return principal
 
 # Routes
 @app.get("/")
@@ -80,7 +89,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = User(
         name=user_data.name,
         email=user_data.email,
@@ -96,13 +105,19 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 @app.post("/login", response_model=Token)
 async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == user_credentials.email).first()
+    valid, new_hash = (await password_hasher.verify_and_update(user_credentials.password, user.hashed_password)
+                       if user else (False, None))
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Stored with an older bcrypt cost; upgrade it now that we have the plaintext
+        user.hashed_password = new_hash
+        db.commit()
     
     access_token = create_access_token(data={"sub": user.email, "auth_type": "email"})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -124,6 +139,7 @@ async def google_login(google_user: GoogleUserInfo, db: Session = Depends(get_db
                 existing_user.google_id = google_user.sub
                 existing_user.name = google_user.name  # Update name from Google
                 db.commit()
+                principal_cache.invalidate_user(existing_user.id)
                 user = existing_user
                 print(f"Linked Google ID to existing user: {user.email}")
             else:
@@ -153,14 +169,14 @@ async def google_login(google_user: GoogleUserInfo, db: Session = Depends(get_db
         )
 
 @app.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 # Simple emotion analysis without model loading
 @app.post("/analyze", response_model=EmotionAnalysisResponse)
 async def analyze_emotion(
     analysis_request: EmotionAnalysisRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Simple emotion analysis without model loading"""
@@ -181,7 +197,7 @@ async def analyze_emotion(
 # Session management
 @app.post("/sessions", response_model=SessionResponse)
 async def create_session(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new interview session"""
@@ -200,7 +216,7 @@ async def create_session(
 async def update_session(
     session_id: int,
     session_update: SessionUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update session with end data and summary"""
@@ -226,7 +242,7 @@ async def update_session(
 
 @app.get("/sessions", response_model=List[SessionResponse])
 async def get_user_sessions(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all sessions for the current user"""
@@ -238,7 +254,7 @@ async def get_user_sessions(
 
 @app.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics for the user"""
@@ -279,7 +295,7 @@ async def get_dashboard_stats(
 async def analyze_answer(
     question: str,
     answer: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Mock analyze interview answer"""
     return {
@@ -303,7 +319,7 @@ class QuestionRequest(BaseModel):
 @app.post("/generate-questions")
 async def generate_questions(
     request: QuestionRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Generate interview questions using LLM"""
     try:
@@ -311,7 +327,7 @@ async def generate_questions(
         from llm_service import llm_service
         
         # Generate questions using LLM
-        questions = llm_service.generate_interview_questions(request.topic, request.difficulty, request.count)
+        questions = await llm_service.agenerate_interview_questions(request.topic, request.difficulty, request.count)
         
         return {
             "status": "success",
@@ -347,7 +363,7 @@ async def analyze_comprehensive(
     question: str,
     answer: str,
     emotion_data: dict,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Comprehensive analysis using LLM"""
     try:
@@ -355,7 +371,7 @@ async def analyze_comprehensive(
         from llm_service import llm_service
         
         # Use real LLM analysis
-        analysis = llm_service.analyze_comprehensive_response(question, answer, emotion_data)
+        analysis = await llm_service.aanalyze_comprehensive_response(question, answer, emotion_data)
         
         return {
             "status": "success",
@@ -0,0 +1,155 @@
+"""
+Bounded pool of raw sqlite3 connections for the app.py endpoints.
+
+Connections are opened lazily up to ``size`` and live for the whole
+process, so requests skip the open/pragma cost. sqlite3 keeps a per-connection
+cache of compiled statements keyed by SQL text (``cached_statements``), so
+the fixed queries are prepared once per connection and reused afterwards.
+
+Every checkout is returned to the pool, with any open transaction rolled
+back, even if the request failed part-way.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from sqlalchemy.engine import make_url
+
+from database import DATABASE_URL, SQLITE_BUSY_TIMEOUT_MS, apply_sqlite_pragmas, is_sqlite
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the checkout timeout"""
+
+
+class SQLitePool:
+    def __init__(self, path: str, size: int = 8, timeout: float = 30.0, cached_statements: int = 256):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+        # Stats
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait = 0.0
+        self._discarded = 0
+
+    @classmethod
+    def from_env(cls) -> "SQLitePool":
+        default_path = make_url(DATABASE_URL).database if is_sqlite(DATABASE_URL) else "app.db"
+        return cls(
+            path=os.getenv("APP_SQLITE_PATH", default_path or "app.db"),
+            size=int(os.getenv("APP_SQLITE_POOL_SIZE", "8")),
+            timeout=float(os.getenv("APP_SQLITE_POOL_TIMEOUT_SECONDS", "30")),
+            cached_statements=int(os.getenv("APP_SQLITE_CACHED_STATEMENTS", "256")),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0,
+            check_same_thread=False,  # Checked out by one request at a time, from any threadpool thread
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        apply_sqlite_pragmas(conn)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    opening = True
+                else:
+                    opening = False
+            if opening:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                started = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise PoolTimeout(f"No SQLite connection free after {self.timeout:.0f}s")
+                waited = time.perf_counter() - started
+                with self._lock:
+                    self._waits += 1
+                    self._wait_seconds += waited
+                    self._max_wait = max(self._max_wait, waited)
+        with self._lock:
+            self._checkouts += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection: drop it and let the next checkout open a fresh one
+            self._discard(conn)
+            return
+        if self._closed:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+            self._discarded += 1
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; connections still checked out are closed when returned"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "avg_wait_ms": round(self._wait_seconds * 1000.0 / self._waits, 2) if self._waits else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000.0, 2),
+                "discarded": self._discarded,
+            }
@@ -0,0 +1,166 @@
+"""
+Packed columnar storage for finished session timelines.
+
+A closed session's emotion_data rows are folded into one session_timelines
+row: a zlib-compressed blob laid out as
+
+    codes        uint8   [n]  index into ``labels``
+    confidence   float16 [n]
+    eye_contact  float16 [n]
+    offsets      uint32  [n]  milliseconds since the previous sample (first is 0)
+
+so the summary endpoint decodes the whole timeline with a few NumPy calls
+instead of materializing thousands of ORM objects. Timestamps keep
+millisecond precision and scores float16 precision (well under the 2
+decimals the API reports).
+
+EMOTION_TIMELINE_STORAGE=packed compacts each session as soon as it is
+completed; compact_timelines.py does the same for closed sessions in bulk.
+"""
+import heapq
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from models import InterviewSession, EmotionData, SessionTimeline
+
+# "rows" keeps one emotion_data row per sample, "packed" compacts a session when it is completed
+TIMELINE_STORAGE = os.getenv("EMOTION_TIMELINE_STORAGE", "rows")
+
+
+def pack_timeline(samples) -> Dict:
+    """Pack (emotion, confidence, eye_contact_score, timestamp) samples, oldest first"""
+    emotions, confidence, eye_contact, timestamps = zip(*samples)
+    labels, codes = np.unique(np.asarray(emotions, dtype=str), return_inverse=True)
+    if len(labels) > 256:
+        raise ValueError("Too many distinct emotions to pack as uint8 codes")
+
+    ms = np.array(timestamps, dtype="datetime64[ms]")
+    offsets = np.diff(ms, prepend=ms[:1]).astype(np.int64)
+    if offsets.min() < 0 or offsets.max() > np.iinfo(np.uint32).max:
+        raise ValueError("Timeline timestamps are out of order or too far apart to pack")
+
+    payload = b"".join([
+        codes.astype(np.uint8).tobytes(),
+        np.array(confidence, dtype=np.float16).tobytes(),
+        np.array([0.0 if v is None else v for v in eye_contact], dtype=np.float16).tobytes(),
+        offsets.astype(np.uint32).tobytes(),
+    ])
+    return {
+        "sample_count": len(samples),
+        "first_timestamp": ms[0].item(),
+        "labels": labels.tolist(),
+        "data": zlib.compress(payload),
+    }
+
+
+def unpack_timeline(timeline: SessionTimeline) -> List[Dict]:
+    """Decode a packed timeline into the summary endpoint's emotion_timeline entries"""
+    n = timeline.sample_count
+    payload = zlib.decompress(timeline.data)
+    codes = np.frombuffer(payload, dtype=np.uint8, count=n)
+    confidence = np.frombuffer(payload, dtype=np.float16, count=n, offset=n)
+    eye_contact = np.frombuffer(payload, dtype=np.float16, count=n, offset=3 * n)
+    offsets = np.frombuffer(payload, dtype=np.uint32, count=n, offset=5 * n)
+
+    first = np.datetime64(timeline.first_timestamp, "ms")
+    timestamps = np.datetime_as_string(first + np.cumsum(offsets, dtype=np.int64).astype("timedelta64[ms]"))
+    emotions = np.array(timeline.labels, dtype=object)[codes]
+
+    return [
+        {"emotion": emotion, "confidence": conf, "eye_contact_score": eye, "timestamp": ts}
+        for emotion, conf, eye, ts in zip(
+            emotions.tolist(),
+            confidence.astype(np.float64).round(2).tolist(),
+            eye_contact.astype(np.float64).round(2).tolist(),
+            timestamps.tolist(),
+        )
+    ]
+
+
+def summary_timeline(timeline: Optional[SessionTimeline], rows) -> List[Dict]:
+    """A session's packed samples and (emotion, confidence, eye_contact_score, timestamp) rows
+    as emotion_timeline entries, merged oldest first.
+
+    Rows are usually samples that arrived after the session was packed, but a
+    late buffer flush can land them anywhere in the packed range.
+    """
+    packed = unpack_timeline(timeline) if timeline is not None else []
+    rows = [
+        {"emotion": emotion, "confidence": confidence, "eye_contact_score": eye_contact,
+         "timestamp": timestamp.isoformat()}
+        for emotion, confidence, eye_contact, timestamp in rows
+    ]
+    if not packed or not rows:
+        return packed or rows
+    return list(heapq.merge(packed, rows, key=lambda entry: datetime.fromisoformat(entry["timestamp"])))
+
+
+def timeline_samples(timeline: SessionTimeline) -> List[Tuple]:
+    """A packed timeline as (emotion, confidence, eye_contact_score, timestamp) samples, oldest first"""
+    return [(s["emotion"], s["confidence"], s["eye_contact_score"], datetime.fromisoformat(s["timestamp"]))
+            for s in unpack_timeline(timeline)]
+
+
+def session_samples(db: Session, session_id: int) -> List[Tuple]:
+    """Every sample of a session, packed and still row-stored, oldest first"""
+    timeline = db.get(SessionTimeline, session_id)
+    rows = db.execute(
+        select(EmotionData.emotion, EmotionData.confidence, EmotionData.eye_contact_score, EmotionData.timestamp)
+        .where(EmotionData.session_id == session_id)
+    ).all()
+    packed = timeline_samples(timeline) if timeline is not None else []
+    return sorted(packed + [tuple(row) for row in rows], key=lambda s: s[3])
+
+
+def compact_session(db: Session, session_id: int) -> int:
+    """Fold a session's emotion_data rows into its packed timeline; returns rows compacted.
+
+    Samples that arrive after a session was packed are merged in on the next
+    compaction, so this is safe to run repeatedly.
+    """
+    rows = db.execute(
+        select(EmotionData.id, EmotionData.emotion, EmotionData.confidence,
+               EmotionData.eye_contact_score, EmotionData.timestamp)
+        .where(EmotionData.session_id == session_id)
+        .order_by(EmotionData.timestamp)
+    ).all()
+    if not rows:
+        return 0
+
+    timeline = db.get(SessionTimeline, session_id)
+    samples = [tuple(row)[1:] for row in rows]
+    if timeline is not None:
+        samples = sorted(timeline_samples(timeline) + samples, key=lambda s: s[3])
+    else:
+        user_id = db.scalar(select(InterviewSession.user_id).where(InterviewSession.id == session_id))
+        timeline = SessionTimeline(session_id=session_id, user_id=user_id)
+        db.add(timeline)
+
+    for field, value in pack_timeline(samples).items():
+        setattr(timeline, field, value)
+    timeline.packed_at = datetime.utcnow()
+    # Only delete what was packed; rows flushed in the meantime wait for the next compaction
+    db.execute(delete(EmotionData).where(
+        EmotionData.session_id == session_id,
+        EmotionData.id <= max(row.id for row in rows)
+    ))
+    db.commit()
+    return len(rows)
+
+
+def closed_sessions_with_rows(db: Session, min_age: timedelta, limit: Optional[int] = None) -> List[int]:
+    """Ids of sessions that ended at least ``min_age`` ago and still have raw emotion rows"""
+    query = select(InterviewSession.id).where(
+        InterviewSession.end_time.is_not(None),
+        InterviewSession.end_time <= datetime.utcnow() - min_age,
+        exists().where(EmotionData.session_id == InterviewSession.id),
+    ).order_by(InterviewSession.end_time)
+    if limit is not None:
+        query = query.limit(limit)
+    return list(db.scalars(query))
@@ -0,0 +1,143 @@
+"""
+Incrementally maintained per-user dashboard aggregates.
+
+The user_stats row is updated in the same transaction that creates or
+completes a session, so /dashboard reads one row instead of aggregating
+sessions on every request. Call ``rebuild_user_stats`` (backfill_user_stats.py)
+to recompute the table from interview_sessions.
+"""
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import User, InterviewSession, UserStats
+
+
+def new_user_stats(user_id: int) -> UserStats:
+    return UserStats(
+        user_id=user_id,
+        session_count=0,
+        completed_sessions=0,
+        average_confidence=0.0,
+        emotion_counts={},
+    )
+
+
+async def _locked_stats(db, user_id: int) -> UserStats:
+    stats = await db.get(UserStats, user_id, with_for_update=True, populate_existing=True)
+    if stats is None:
+        # Users created before the table existed and not yet backfilled
+        stats = new_user_stats(user_id)
+        db.add(stats)
+    return stats
+
+
+_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+async def record_session_started(db, user_id: int):
+    # Flush the new session first so SQLite takes its write lock before we touch the stats row
+    await db.flush()
+    # Users created before the table existed and not yet backfilled; a concurrent insert wins
+    insert = _INSERT[db.get_bind().dialect.name]
+    await db.execute(insert(UserStats).values(
+        user_id=user_id, session_count=0, completed_sessions=0, average_confidence=0.0, emotion_counts={},
+    ).on_conflict_do_nothing(index_elements=[UserStats.user_id]))
+    # One atomic increment, no read-modify-write
+    await db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(session_count=UserStats.session_count + 1, last_activity=datetime.utcnow())
+    )
+
+
+async def record_session_completed(db, user_id: int, confidence: float, emotion: str,
+                                   previous_confidence: float = None, previous_emotion: str = None):
+    """Fold a completed session's scores into the aggregates.
+
+    ``previous_*`` are the session's scores from before this update (None if it
+    had not been completed yet), so re-completing a session replaces its
+    contribution instead of counting it twice.
+    """
+    # Flush the session update first so SQLite takes its write lock before we read the stats row
+    await db.flush()
+    stats = await _locked_stats(db, user_id)
+    counts = dict(stats.emotion_counts or {})
+
+    if previous_confidence is not None and stats.completed_sessions:
+        stats.average_confidence += (confidence - previous_confidence) / stats.completed_sessions
+        if counts.get(previous_emotion):
+            counts[previous_emotion] -= 1
+            if not counts[previous_emotion]:
+                del counts[previous_emotion]
+    else:
+        stats.completed_sessions += 1
+        stats.average_confidence += (confidence - stats.average_confidence) / stats.completed_sessions
+
+    if emotion:
+        counts[emotion] = counts.get(emotion, 0) + 1
+    # Reassign so the JSON column is marked dirty
+    stats.emotion_counts = counts
+    stats.last_activity = datetime.utcnow()
+
+
+def best_emotion(stats: UserStats) -> str:
+    if stats is None or not stats.emotion_counts:
+        return "Neutral"
+    return max(stats.emotion_counts, key=stats.emotion_counts.get)
+
+
+def _computed_stats(db: Session, user_ids=None) -> Dict[int, UserStats]:
+    """Aggregates recomputed from interview_sessions, for every user or only ``user_ids``"""
+    users = select(User.id)
+    totals = select(
+        InterviewSession.user_id,
+        func.count(),
+        func.count(InterviewSession.average_confidence),
+        func.avg(InterviewSession.average_confidence),
+        func.max(func.coalesce(InterviewSession.end_time, InterviewSession.start_time)),
+    ).group_by(InterviewSession.user_id)
+    emotions = (
+        select(InterviewSession.user_id, InterviewSession.dominant_emotion, func.count())
+        .where(
+            InterviewSession.average_confidence.is_not(None),
+            InterviewSession.dominant_emotion.is_not(None),
+        )
+        .group_by(InterviewSession.user_id, InterviewSession.dominant_emotion)
+    )
+    if user_ids is not None:
+        users = users.where(User.id.in_(user_ids))
+        totals = totals.where(InterviewSession.user_id.in_(user_ids))
+        emotions = emotions.where(InterviewSession.user_id.in_(user_ids))
+
+    stats = {user_id: new_user_stats(user_id) for user_id in db.scalars(users)}
+    for user_id, session_count, completed, average, last_activity in db.execute(totals):
+        row = stats.setdefault(user_id, new_user_stats(user_id))
+        row.session_count = session_count
+        row.completed_sessions = completed
+        row.average_confidence = average or 0.0
+        row.last_activity = last_activity
+
+    for user_id, emotion, count in db.execute(emotions):
+        row = stats.setdefault(user_id, new_user_stats(user_id))
+        row.emotion_counts = {**row.emotion_counts, emotion: count}
+    return stats
+
+
+def refresh_user_stats(db: Session, user_id: int):
+    """Recompute one user's aggregates after their sessions were changed outside the API (no commit)"""
+    db.flush()
+    for stats in _computed_stats(db, [user_id]).values():
+        db.merge(stats)
+
+
+def rebuild_user_stats(db: Session) -> int:
+    """Recompute every user's aggregates from interview_sessions; returns the number of users"""
+    stats = _computed_stats(db)
+    db.query(UserStats).delete()
+    db.add_all(stats.values())
+    db.commit()
+    return len(stats)
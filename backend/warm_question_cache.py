@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Pre-warm the question cache (see question_cache.py) so popular topics never wait on the LLM.
+
+Generates a question pool for every (topic, difficulty, count) combination
+that is missing or past its TTL, plus the --popular most requested entries
+already in the cache. Run it after a deploy or from cron before the TTL
+runs out; --force regenerates everything listed.
+
+Example:
+    python warm_question_cache.py --popular 20
+    python warm_question_cache.py --topics technical behavioral "system design" --difficulties easy medium hard
+"""
+import argparse
+import asyncio
+import sys
+
+from llm_service import llm_service
+from question_cache import CacheKey, question_cache
+
+DEFAULT_TOPICS = ["technical", "behavioral", "leadership"]
+
+
+async def generate(topic, difficulty, count):
+    return await llm_service.agenerate_interview_questions(topic, difficulty, count, fallback=False)
+
+
+async def warm(keys, force, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm_one(key):
+        async with semaphore:
+            return (await question_cache.warm([key], generate, force=force))[key]
+
+    try:
+        return dict(zip(keys, await asyncio.gather(*(warm_one(key) for key in keys))))
+    finally:
+        await llm_service.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm the interview question cache")
+    parser.add_argument("--topics", nargs="*", default=None, help=f"Topics to warm (default {DEFAULT_TOPICS})")
+    parser.add_argument("--difficulties", nargs="+", default=["medium"])
+    parser.add_argument("--counts", type=int, nargs="+", default=[5])
+    parser.add_argument("--popular", type=int, default=0, help="Also refresh the N most requested cached entries")
+    parser.add_argument("--force", action="store_true", help="Regenerate entries that are still fresh")
+    parser.add_argument("--concurrency", type=int, default=4, help="Completions in flight at once")
+    args = parser.parse_args()
+
+    if not question_cache.enabled:
+        print("⚠️  Question cache is disabled (QUESTION_CACHE_TTL_SECONDS=0). Nothing to warm.")
+        return True
+    if llm_service.async_client is None:
+        print("❌ OpenAI client not available; the cache only stores LLM-generated questions")
+        return False
+
+    topics = args.topics if args.topics is not None else ([] if args.popular else DEFAULT_TOPICS)
+    keys = [CacheKey.normalize(topic, difficulty, count)
+            for topic in topics for difficulty in args.difficulties for count in args.counts]
+    if args.popular:
+        keys += [key for key in question_cache.store.popular(args.popular) if key not in keys]
+    if not keys:
+        print("✅ Nothing to warm.")
+        return True
+
+    print(f"🔥 Warming {len(keys)} question pools...")
+    outcomes = asyncio.run(warm(keys, args.force, args.concurrency))
+    for key, outcome in outcomes.items():
+        icon = {"warmed": "✅", "fresh": "⏭️ ", "failed": "❌"}[outcome]
+        print(f"  {icon} {key.topic} / {key.difficulty} / {key.count}: {outcome}")
+    question_cache.close()
+
+    failed = sum(outcome == "failed" for outcome in outcomes.values())
+    print(f"\n🎉 Done: {sum(o == 'warmed' for o in outcomes.values())} warmed, "
+          f"{sum(o == 'fresh' for o in outcomes.values())} already fresh, {failed} failed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
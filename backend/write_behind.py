@@ -0,0 +1,194 @@
+"""
+Write-behind buffer for EmotionData rows.
+
+Handlers append rows to an in-memory buffer and return immediately; a
+background thread bulk-inserts them in one transaction every
+``EMOTION_FLUSH_INTERVAL_SECONDS`` or as soon as ``EMOTION_FLUSH_BATCH_SIZE``
+rows are waiting. ``flush()`` drains the buffer synchronously and is used for
+durable requests, session end and shutdown.
+
+If the database rejects a batch because of its contents (a foreign key or
+a bad value), the batch is split until the offending rows are isolated;
+those are dead-lettered and the rest is stored. Any other error, such as
+the database being unreachable, puts the whole batch back to be retried.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import EmotionData
+
+# Errors caused by the rows themselves; retrying the same batch can never succeed
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class EmotionWriteBuffer:
+    def __init__(self, session_factory: Callable[[], Session], batch_size: int = 200,
+                 interval: float = 1.0, max_depth: int = 50000):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_depth = max_depth
+        self._rows = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+        # Metrics
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.dropped_rows = 0
+        self.errors = 0
+        self.dead_lettered_rows = 0
+        # Most recent rejected rows with the reason, for inspection
+        self.dead_letters = deque(maxlen=1000)
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @classmethod
+    def from_env(cls, session_factory: Callable[[], Session]) -> "EmotionWriteBuffer":
+        return cls(
+            session_factory,
+            batch_size=int(os.getenv("EMOTION_FLUSH_BATCH_SIZE", "200")),
+            interval=float(os.getenv("EMOTION_FLUSH_INTERVAL_SECONDS", "1")),
+            max_depth=int(os.getenv("EMOTION_BUFFER_MAX_DEPTH", "50000")),
+        )
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="emotion-write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write out everything still buffered"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def add(self, row: Dict):
+        with self._cond:
+            if len(self._rows) >= self.max_depth:
+                # Database is not keeping up; shed the oldest sample rather than growing forever
+                self._rows.popleft()
+                self.dropped_rows += 1
+            self._rows.append(row)
+            if len(self._rows) >= self.batch_size:
+                self._cond.notify()
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._rows)
+
+    def _insert(self, rows):
+        db = self.session_factory()
+        try:
+            db.execute(insert(EmotionData), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _requeue(self, rows):
+        # Put the rows back in front so they are retried on the next flush
+        with self._cond:
+            self._rows.extendleft(reversed(rows))
+
+    def _insert_isolating(self, rows) -> int:
+        """Insert in ever smaller chunks, dead-lettering single rows the database rejects; returns rows stored"""
+        stored = 0
+        pending = [rows]
+        while pending:
+            chunk = pending.pop()
+            try:
+                self._insert(chunk)
+                stored += len(chunk)
+            except ROW_ERRORS as e:
+                if len(chunk) == 1:
+                    self.dead_lettered_rows += 1
+                    self.dead_letters.append((chunk[0], str(e.orig if hasattr(e, "orig") else e)))
+                    print(f"Dead-lettered emotion row for session {chunk[0].get('session_id')}: {e}")
+                else:
+                    middle = len(chunk) // 2
+                    pending.append(chunk[middle:])
+                    pending.append(chunk[:middle])
+            except Exception:
+                self.flushed_rows += stored
+                self._requeue([row for part in [chunk] + pending[::-1] for row in part])
+                raise
+        return stored
+
+    def flush(self):
+        """Synchronously commit every row buffered so far"""
+        with self._flush_lock:
+            with self._cond:
+                rows = list(self._rows)
+                self._rows.clear()
+            if not rows:
+                return
+
+            started = time.perf_counter()
+            try:
+                self._insert(rows)
+                stored = len(rows)
+            except ROW_ERRORS as e:
+                self.errors += 1
+                print(f"Emotion batch of {len(rows)} rows rejected ({e}); isolating the bad rows")
+                stored = self._insert_isolating(rows)
+            except Exception as e:
+                self.errors += 1
+                self._requeue(rows)
+                print(f"Error flushing {len(rows)} emotion rows: {e}")
+                raise
+
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self.flushes += 1
+            self.flushed_rows += stored
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._rows) < self.batch_size:
+                    self._cond.wait(timeout=self.interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.interval)
+
+    def metrics(self) -> Dict:
+        return {
+            "depth": self.depth(),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "dropped_rows": self.dropped_rows,
+            "errors": self.errors,
+            "dead_lettered_rows": self.dead_lettered_rows,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": self._total_flush_ms / self.flushes if self.flushes else 0.0,
+            "max_flush_ms": self.max_flush_ms,
+        }
+
+
+# Shared buffer for the API process
+emotion_buffer = EmotionWriteBuffer.from_env(SessionLocal)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+DB_MODE=async: handlers get an aiosqlite AsyncSession whose commits persist and whose errors roll back.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import database
+from models import Base, User
+
+
+def with_async_mode(url):
+    """What database.py sets up at import with DB_MODE=async and DATABASE_URL=url"""
+    database.DB_MODE, database.DATABASE_URL = "async", url
+    async_engine = database.create_async_engine_from_env()
+    database.AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return async_engine
+
+
+def user(email):
+    return User(name="Async", email=email, hashed_password="x")
+
+
+def test_async_sessions_commit_and_roll_back():
+    originals = database.DB_MODE, database.DATABASE_URL, database.AsyncSessionLocal
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'async.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        try:
+            async_engine = with_async_mode(url)
+            assert async_engine.url.drivername == "sqlite+aiosqlite"
+
+            async def scenario():
+                # The request dependency: committed work persists
+                dependency = database.get_async_db()
+                db = await dependency.__anext__()
+                assert isinstance(db, AsyncSession)
+                db.add(user("committed@example.com"))
+                await db.commit()
+                await dependency.aclose()
+
+                # A handler error is thrown into the dependency: the session closes and nothing persists
+                dependency = database.get_async_db()
+                db = await dependency.__anext__()
+                db.add(user("failed@example.com"))
+                await db.flush()
+                try:
+                    await dependency.athrow(RuntimeError("handler failed"))
+                    assert False, "expected the handler error to propagate"
+                except RuntimeError:
+                    pass
+
+                # WebSocket handlers open their own session; after a failed commit, rollback keeps it usable
+                db = database.open_async_session()
+                try:
+                    db.add(user("committed@example.com"))
+                    try:
+                        await db.commit()
+                        assert False, "expected the duplicate email to be rejected"
+                    except IntegrityError:
+                        await db.rollback()
+                    return await db.scalar(select(func.count()).select_from(User))
+                finally:
+                    await db.close()
+
+            assert asyncio.run(scenario()) == 1
+            with engine.connect() as conn:
+                assert conn.execute(select(User.email)).scalars().all() == ["committed@example.com"]
+            asyncio.run(async_engine.dispose())
+        finally:
+            database.DB_MODE, database.DATABASE_URL, database.AsyncSessionLocal = originals
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_async_sessions_commit_and_roll_back()
+    print("✅ Async database session tests passed")
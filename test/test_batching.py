@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-batching engine: frames are grouped, errors reach every caller, cancelled callers are skipped.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np
+
+from batching import BatchingEngine
+
+
+def frame(value):
+    return np.full((48, 48), value, dtype=np.uint8)
+
+
+def mean_predict(frames):
+    # One "class score" per frame: its mean pixel, so results can be matched to inputs
+    return frames.reshape(len(frames), -1).mean(axis=1, keepdims=True)
+
+
+def test_frames_are_batched_and_results_matched():
+    sizes = []
+
+    def predict(frames):
+        sizes.append(len(frames))
+        return mean_predict(frames)
+
+    engine = BatchingEngine(predict, max_batch_size=8, max_wait_ms=50)
+    futures = [engine.submit(frame(i)) for i in range(20)]
+    results = [f.result(timeout=5) for f in futures]
+    engine.stop()
+
+    assert [round(float(r[0]) * 255) for r in results] == list(range(20))
+    assert sum(sizes) == 20 and max(sizes) <= 8 and len(sizes) < 20
+    stats = engine.stats()
+    assert stats["frames"] == 20 and stats["batches"] == len(sizes)
+
+
+def test_predict_error_reaches_every_caller():
+    def predict(frames):
+        raise RuntimeError("model exploded")
+
+    engine = BatchingEngine(predict, max_batch_size=4, max_wait_ms=20)
+    futures = [engine.submit(frame(1)) for _ in range(3)]
+    for future in futures:
+        try:
+            future.result(timeout=5)
+            assert False, "expected the predict error"
+        except RuntimeError as e:
+            assert "model exploded" in str(e)
+    engine.stop()
+
+
+def test_cancelled_callers_are_skipped_and_the_engine_keeps_running():
+    release = threading.Event()
+    batches = []
+
+    def predict(frames):
+        batches.append(len(frames))
+        release.wait(5)
+        return mean_predict(frames)
+
+    engine = BatchingEngine(predict, max_batch_size=4, max_wait_ms=1)
+    first = engine.submit(frame(1))
+    time.sleep(0.05)  # First batch is now inside predict
+    queued = [engine.submit(frame(2)) for _ in range(3)]
+    assert queued[0].cancel() and queued[1].cancel()
+    release.set()
+
+    assert first.result(timeout=5) is not None
+    assert queued[2].result(timeout=5) is not None
+    assert batches == [1, 1]  # The cancelled frames never reached the model
+
+    # An asyncio caller going away mid-batch must not kill the batcher thread
+    async def cancel_while_waiting():
+        release.clear()
+        task = asyncio.ensure_future(engine.predict_async(frame(3)))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        release.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return await engine.predict_async(frame(4))
+
+    assert round(float(asyncio.run(cancel_while_waiting())[0]) * 255) == 4
+    assert engine._thread.is_alive()
+    engine.stop()
+
+
+if __name__ == "__main__":
+    test_frames_are_batched_and_results_matched()
+    test_predict_error_reaches_every_caller()
+    test_cancelled_callers_are_skipped_and_the_engine_keeps_running()
+    print("✅ Batching engine tests passed")
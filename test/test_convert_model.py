@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Backend parity gate: converted artifacts must agree with the Keras model's top-1 labels on sample frames.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import cv2
+import numpy as np
+
+import convert_model
+
+
+class FakeBackend:
+    """Scores whose top-1 label follows the frame's brightness; ``flip`` frames get another label"""
+
+    def __init__(self, flip=()):
+        self.flip = set(flip)
+        self.seen = 0
+
+    def predict(self, batch):
+        labels = np.minimum((batch.mean(axis=(1, 2, 3)) * 7).astype(int), 6)
+        for i in range(len(batch)):
+            if self.seen + i in self.flip:
+                labels[i] = (labels[i] + 1) % 7
+        self.seen += len(batch)
+        scores = np.full((len(batch), 7), 0.01, dtype=np.float32)
+        scores[np.arange(len(batch)), labels] = 0.94
+        return scores
+
+
+def run_parity_only(tmp, min_agreement, int8_flips):
+    model = Path(tmp) / "emotion_model.h5"
+    for name in ("emotion_model.onnx", "emotion_model_int8.tflite"):
+        (Path(tmp) / name).write_bytes(b"")  # Artifacts only need to exist
+    samples = Path(tmp) / "frames"
+    samples.mkdir()
+    for i in range(20):
+        cv2.imwrite(str(samples / f"{i:02d}.png"), np.full((64, 64), i * 12, np.uint8))
+
+    originals = convert_model.KerasBackend, convert_model.create_backend, sys.argv
+    convert_model.KerasBackend = lambda path: FakeBackend()
+    convert_model.create_backend = lambda name, path: FakeBackend(int8_flips if name == "tflite-int8" else ())
+    sys.argv = ["convert_model.py", "--parity-only", "--model", str(model), "--samples-dir", str(samples),
+                "--formats", "onnx", "tflite", "tflite-int8", "--batch-size", "8",
+                "--min-agreement", str(min_agreement)]
+    try:
+        convert_model.main()
+        return 0
+    except SystemExit as e:
+        return e.code
+    finally:
+        convert_model.KerasBackend, convert_model.create_backend, sys.argv = originals
+
+
+def test_disagreeing_backend_fails_the_run():
+    with tempfile.TemporaryDirectory() as tmp:
+        # One of 20 frames flipped: 95% agreement, and the missing tflite artifact is only reported
+        assert run_parity_only(tmp, 0.99, int8_flips=[3]) == 1
+
+
+def test_agreeing_backends_pass():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert run_parity_only(tmp, 0.95, int8_flips=[3]) == 0
+    with tempfile.TemporaryDirectory() as tmp:
+        assert run_parity_only(tmp, 0.99, int8_flips=[]) == 0
+
+
+def test_check_parity_reports_agreement_per_backend():
+    with tempfile.TemporaryDirectory() as tmp:
+        model = Path(tmp) / "emotion_model.h5"
+        (Path(tmp) / "emotion_model_int8.tflite").write_bytes(b"")
+        frames = convert_model.synthetic_frames(10)
+
+        originals = convert_model.KerasBackend, convert_model.create_backend
+        convert_model.KerasBackend = lambda path: FakeBackend()
+        convert_model.create_backend = lambda name, path: FakeBackend(flip=[0, 5])
+        try:
+            results = convert_model.check_parity(str(model), ["keras", "onnx", "tflite-int8"], frames, 4)
+        finally:
+            convert_model.KerasBackend, convert_model.create_backend = originals
+        assert results == {"tflite-int8": 0.8}
+
+
+if __name__ == "__main__":
+    test_disagreeing_backend_fails_the_run()
+    test_agreeing_backends_pass()
+    test_check_parity_reports_agreement_per_backend()
+    print("✅ Model conversion parity tests passed")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Database engine configuration: per-backend options, SQLite pragmas and async driver mapping.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, text
+
+import database
+from database import async_database_url, engine_options, install_sqlite_pragmas
+
+
+def test_engine_options_per_backend():
+    memory = engine_options("sqlite://")
+    assert memory["connect_args"]["check_same_thread"] is False and "pool_size" not in memory
+
+    file_db = engine_options("sqlite:///./app.db")
+    assert file_db["pool_size"] == database.DB_POOL_SIZE
+    assert file_db["connect_args"]["timeout"] == database.SQLITE_BUSY_TIMEOUT_MS / 1000.0
+
+    server = engine_options("postgresql://u:p@db/app")
+    assert server["pool_pre_ping"] is True and server["pool_recycle"] == database.DB_POOL_RECYCLE_SECONDS
+    assert "connect_args" not in server
+
+
+def test_sqlite_connections_get_the_pragmas():
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'tuned.db')}"
+        engine = create_engine(url, **engine_options(url))
+        install_sqlite_pragmas(engine)
+        with engine.connect() as conn:
+            pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()
+            assert pragma("journal_mode").upper() == database.SQLITE_JOURNAL_MODE.upper()
+            assert pragma("busy_timeout") == database.SQLITE_BUSY_TIMEOUT_MS
+            assert pragma("cache_size") == -database.SQLITE_CACHE_SIZE_KB
+            assert pragma("synchronous") == {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}[
+                database.SQLITE_SYNCHRONOUS.upper()]
+        engine.dispose()
+
+
+def test_async_driver_mapping():
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert async_database_url("postgresql://u:secret@db:5432/app") == "postgresql+asyncpg://u:secret@db:5432/app"
+    try:
+        async_database_url("mysql://u:p@db/app")
+        assert False, "backends without migrations support have no async driver"
+    except ValueError as e:
+        assert "mysql" in str(e)
+
+
+if __name__ == "__main__":
+    test_engine_options_per_backend()
+    test_sqlite_connections_get_the_pragmas()
+    test_async_driver_mapping()
+    print("✅ Database configuration tests passed")
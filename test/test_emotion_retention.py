@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+emotion_data retention: cutoffs, per-minute rollups across chunks, archives and rollup expiry.
+"""
+import csv
+import gzip
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from emotion_retention import EmotionRetentionJob
+from models import Base, EmotionData, EmotionRollup, InterviewSession, User
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+
+
+def make_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        user = User(name="Test", email="t@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        session = InterviewSession(user_id=user.id, start_time=NOW - timedelta(days=40))
+        db.add(session)
+        db.flush()
+
+        def sample(timestamp, emotion="Happy", confidence=0.8, eye_contact=0.5):
+            return EmotionData(user_id=user.id, session_id=session.id, emotion=emotion, confidence=confidence,
+                               eye_contact_score=eye_contact, timestamp=timestamp)
+
+        old_minute = (NOW - timedelta(days=40)).replace(second=0)
+        db.add_all(
+            # Five samples in one minute, 40 days old: split across chunks of 2
+            [sample(old_minute + timedelta(seconds=10 * i), "Happy" if i < 3 else "Sad", 0.5 + 0.1 * i, 0.2 * i)
+             for i in range(5)]
+            + [sample(NOW - timedelta(days=31))]
+            + [sample(NOW - timedelta(days=30))]  # Exactly at the cutoff: kept
+            + [sample(NOW - timedelta(days=1))]
+        )
+        db.commit()
+        return engine, factory
+
+
+def test_plan_reports_without_changing_anything():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory = make_database(os.path.join(tmp, "retention.db"))
+        job = EmotionRetentionJob(raw_retention_days=30, rollup_retention_days=35, archive_dir=None)
+        with factory() as db:
+            report = job.plan(db, now=NOW)
+            assert report["raw_cutoff"] == (NOW - timedelta(days=30)).isoformat()
+            assert report["raw_rows_total"] == 8 and report["raw_rows_eligible"] == 6
+            assert report["sessions_affected"] == 1 and report["expired_rollups"] == 0
+            assert len(db.scalars(select(EmotionData)).all()) == 8
+        engine.dispose()
+
+
+def test_run_rolls_up_archives_and_deletes_before_the_cutoff():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory = make_database(os.path.join(tmp, "retention.db"))
+        archive = os.path.join(tmp, "archive")
+        job = EmotionRetentionJob(raw_retention_days=30, rollup_retention_days=0, archive_dir=archive, batch_size=2)
+        with factory() as db:
+            report = job.run(db, now=NOW)
+            assert report["raw_rows_deleted"] == 6
+            assert report["rollups_created"] == 2 and report["rollups_updated"] == 2  # The split minute was merged
+
+            remaining = sorted(r.timestamp for r in db.scalars(select(EmotionData)))
+            assert remaining == [NOW - timedelta(days=30), NOW - timedelta(days=1)]
+
+            rollups = db.scalars(select(EmotionRollup).order_by(EmotionRollup.minute)).all()
+            assert [r.samples for r in rollups] == [5, 1]
+            assert rollups[0].minute == (NOW - timedelta(days=40)).replace(second=0)
+            assert round(rollups[0].average_confidence, 6) == 0.7
+            assert round(rollups[0].average_eye_contact, 6) == 0.4
+            assert rollups[0].emotion_counts == {"Happy": 3, "Sad": 2}
+
+            archived = []
+            for path in report["archive_files"]:
+                with gzip.open(path, "rt", newline="") as f:
+                    rows = list(csv.reader(f))
+                assert rows[0][0] == "id" and "id" not in [r[0] for r in rows[1:]]  # One header per file
+                archived += rows[1:]
+            assert len(report["archive_files"]) == 2 and len(archived) == 6
+
+            # Nothing left to do on the next run
+            assert job.run(db, now=NOW)["raw_rows_deleted"] == 0
+        engine.dispose()
+
+
+def test_rollup_retention_expires_old_rollups_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory = make_database(os.path.join(tmp, "retention.db"))
+        with factory() as db:
+            EmotionRetentionJob(raw_retention_days=30, rollup_retention_days=0, archive_dir=None).run(db, now=NOW)
+            assert EmotionRetentionJob(rollup_retention_days=0).rollup_cutoff(NOW) is None
+
+            job = EmotionRetentionJob(raw_retention_days=30, rollup_retention_days=35, archive_dir=None)
+            assert job.plan(db, now=NOW)["expired_rollups"] == 1
+            assert job.run(db, now=NOW)["expired_rollups_deleted"] == 1
+            assert [r.samples for r in db.scalars(select(EmotionRollup))] == [1]
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_plan_reports_without_changing_anything()
+    test_run_rolls_up_archives_and_deletes_before_the_cutoff()
+    test_rollup_retention_expires_old_rollups_only()
+    print("✅ Emotion retention tests passed")
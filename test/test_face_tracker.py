@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Face ROI tracking: detect, follow by template matching, re-detect, and fall back to whole frames.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np
+
+import face_tracker
+from face_tracker import FaceROITracker, FaceTrackerRegistry
+
+FACE = (np.random.default_rng(7).random((60, 50)) * 255).astype(np.uint8)
+
+
+def frame_with_face(x, y, seed):
+    gray = (np.random.default_rng(seed).random((240, 320)) * 40).astype(np.uint8)
+    if x is not None:
+        gray[y:y + FACE.shape[0], x:x + FACE.shape[1]] = FACE
+    return gray
+
+
+class FakeCascade:
+    """Finds the face wherever the test put it"""
+
+    def __init__(self):
+        self.position = None
+        self.calls = 0
+
+    def detectMultiScale(self, image, **kwargs):
+        self.calls += 1
+        if self.position is None:
+            return []
+        x, y = self.position
+        return [(x, y, FACE.shape[1], FACE.shape[0])]
+
+
+def test_detect_then_track_then_redetect():
+    cascade = FakeCascade()
+    tracker = FaceROITracker(redetect_every=5, detector=cascade)
+
+    boxes = []
+    for i in range(10):
+        x, y = 100 + 3 * i, 80 + 2 * i  # The face drifts a little every frame
+        cascade.position = (x, y)
+        boxes.append(tracker.locate(frame_with_face(x, y, seed=i)))
+        assert boxes[-1] == (x, y, 50, 60)
+
+    # Frames 1 and 6 detect (every 5th), the rest are template matches
+    assert cascade.calls == 2
+    assert tracker.stats() == {"frames": 10, "detections": 2, "tracked": 8, "lost": 0}
+
+    cascade.position = (130, 100)
+    crop = tracker.crop(frame_with_face(130, 100, seed=99))
+    assert crop.shape == FACE.shape and np.array_equal(crop, FACE)
+
+
+def test_lost_face_falls_back_to_detection_and_then_the_whole_frame():
+    cascade = FakeCascade()
+    tracker = FaceROITracker(redetect_every=15, detector=cascade)
+    cascade.position = (100, 80)
+    assert tracker.locate(frame_with_face(100, 80, seed=1)) == (100, 80, 50, 60)
+
+    # Face leaves the frame: the match fails, detection runs and finds nothing
+    cascade.position = None
+    empty = frame_with_face(None, None, seed=2)
+    assert tracker.crop(empty) is empty
+    assert tracker.stats()["lost"] == 1 and cascade.calls == 2
+
+    # Back again: detected on the next frame
+    cascade.position = (40, 30)
+    assert tracker.locate(frame_with_face(40, 30, seed=3)) == (40, 30, 50, 60)
+
+
+def test_without_a_cascade_tracking_is_disabled_and_frames_are_used_whole():
+    original = face_tracker.load_face_detector
+    face_tracker.load_face_detector = lambda: None  # e.g. OpenCV 5 without CascadeClassifier
+    try:
+        registry = FaceTrackerRegistry(enabled=True)
+        assert not registry.enabled and registry.get("session") is None
+        assert registry.stats()["enabled"] is False
+
+        tracker = FaceROITracker()
+        gray = frame_with_face(100, 80, seed=1)
+        assert tracker.crop(gray) is gray and tracker.stats()["detections"] == 0
+    finally:
+        face_tracker.load_face_detector = original
+
+    # Whatever OpenCV is installed, the registry only enables tracking it can run
+    assert FaceTrackerRegistry(enabled=True).enabled == (face_tracker.load_face_detector() is not None)
+
+
+if __name__ == "__main__":
+    test_detect_then_track_then_redetect()
+    test_lost_face_falls_back_to_detection_and_then_the_whole_frame()
+    test_without_a_cascade_tracking_is_disabled_and_frames_are_used_whole()
+    print("✅ Face tracker tests passed")
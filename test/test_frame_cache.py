@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate frame cache: hash distance, per-session isolation, expiry and audits.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np
+
+from frame_cache import FrameCacheRegistry, average_hash
+
+
+def face(seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((48, 48)) * 255).astype(np.uint8)
+
+
+def test_average_hash_tolerates_noise_but_not_a_new_frame():
+    frame = face()
+    noisy = np.clip(frame.astype(np.int16) + np.random.default_rng(1).integers(-3, 4, frame.shape), 0, 255)
+    assert average_hash(frame) == average_hash(frame[..., None])
+    assert (average_hash(frame) ^ average_hash(noisy.astype(np.uint8))).bit_count() <= 4
+    assert (average_hash(frame) ^ average_hash(face(seed=2))).bit_count() > 4
+
+
+def test_hits_are_per_session_and_expire():
+    cache = FrameCacheRegistry(max_distance=4, max_age_seconds=0.1, audit_every=0)
+    preds = np.array([0.1, 0.9])
+
+    first = cache.lookup("s1", face())
+    assert first.cached is None
+    cache.record("s1", first, preds)
+
+    assert cache.lookup("s1", face()).cached is preds
+    assert cache.lookup("s2", face()).cached is None  # Other sessions never share predictions
+    assert cache.lookup("s1", face(seed=2)).cached is None
+    time.sleep(0.15)
+    assert cache.lookup("s1", face()).cached is None
+
+    cache.discard("s1")
+    metrics = cache.metrics()
+    assert metrics["lookups"] == 5 and metrics["hits"] == 1 and metrics["sessions"] == 1
+
+
+def test_every_nth_hit_is_audited_and_drift_is_counted():
+    cache = FrameCacheRegistry(audit_every=2)
+    cache.record("s", cache.lookup("s", face()), np.array([0.9, 0.1]))
+
+    audits = []
+    for fresh in ([0.8, 0.2], [0.2, 0.8]):
+        for _ in range(2):
+            lookup = cache.lookup("s", face())
+            audits.append(lookup.audit)
+            if lookup.audit:
+                cache.record("s", lookup, np.array(fresh))
+    assert audits == [False, True, False, True]
+    metrics = cache.metrics()
+    assert metrics["audits"] == 2 and metrics["audit_mismatches"] == 1 and metrics["drift_rate"] == 0.5
+
+
+def test_disabled_cache_never_hits():
+    cache = FrameCacheRegistry(enabled=False)
+    lookup = cache.lookup("s", face())
+    cache.record("s", lookup, np.array([1.0]))
+    assert cache.lookup("s", face()).cached is None and cache.metrics()["sessions"] == 0
+
+
+if __name__ == "__main__":
+    test_average_hash_tolerates_noise_but_not_a_new_frame()
+    test_hits_are_per_session_and_expire()
+    test_every_nth_hit_is_audited_and_drift_is_counted()
+    test_disabled_cache_never_hits()
+    print("✅ Frame cache tests passed")
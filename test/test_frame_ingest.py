@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Frame ingestion: raw, multipart and JSON/base64 bodies give the same frame bytes and session id.
+"""
+import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from frame_ingest import decode_base64_frame, read_frame_request
+
+FRAME = b"\xff\xd8\xff\xe0 not really a jpeg \xff\xd9"
+
+app = FastAPI()
+
+
+@app.post("/frame")
+async def frame_echo(request: Request):
+    frame, session_id = await read_frame_request(request)
+    return {"frame": base64.b64encode(frame).decode(), "session_id": session_id}
+
+
+client = TestClient(app)
+
+
+def received(response):
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return base64.b64decode(body["frame"]), body["session_id"]
+
+
+def test_raw_bodies():
+    for content_type in ("image/jpeg", "image/png", "application/octet-stream", "image/jpeg; charset=binary"):
+        response = client.post("/frame?session_id=7", content=FRAME, headers={"Content-Type": content_type})
+        assert received(response) == (FRAME, 7)
+    response = client.post("/frame", content=FRAME, headers={"Content-Type": "image/png"})
+    assert received(response) == (FRAME, None)
+
+
+def test_multipart_uploads():
+    response = client.post("/frame", files={"frame": ("f.jpg", FRAME, "image/jpeg")}, data={"session_id": "3"})
+    assert received(response) == (FRAME, 3)
+    # A "file" part works too, and the query string supplies a missing session_id
+    response = client.post("/frame?session_id=9", files={"file": ("f.jpg", FRAME, "image/jpeg")})
+    assert received(response) == (FRAME, 9)
+
+
+def test_json_base64_bodies():
+    encoded = base64.b64encode(FRAME).decode()
+    assert received(client.post("/frame", json={"frame_data": encoded, "session_id": 4})) == (FRAME, 4)
+    data_url = "data:image/jpeg;base64," + encoded
+    assert received(client.post("/frame?session_id=5", json={"frame_data": data_url})) == (FRAME, 5)
+    assert decode_base64_frame(data_url) == FRAME
+
+
+def test_errors():
+    def error(response, status_code):
+        assert response.status_code == status_code, response.text
+        return response.json()["detail"]
+
+    raw = {"Content-Type": "image/jpeg"}
+    assert error(client.post("/frame", content=b"", headers=raw), 400) == "Empty frame"
+    assert error(client.post("/frame?session_id=abc", content=FRAME, headers=raw), 400) == \
+        "session_id must be an integer"
+    assert "Unsupported" in error(client.post("/frame", content=FRAME, headers={"Content-Type": "text/plain"}), 415)
+
+    assert error(client.post("/frame", data={"session_id": "1"}, files={"other": ("x", b"1")}), 400) == \
+        "Multipart upload must include a 'frame' file"
+    assert error(client.post("/frame", files={"frame": ("f.jpg", FRAME)}, data={"session_id": "x"}), 400) == \
+        "session_id must be an integer"
+
+    assert error(client.post("/frame", json={"frame_data": "abc"}), 400) == "frame_data is not valid base64"
+    assert error(client.post("/frame", json={"frame_data": ""}), 400) == "Empty frame"
+    assert isinstance(error(client.post("/frame", json={"session_id": 1}), 422), list)
+    assert isinstance(error(client.post("/frame", content=b"{not json", headers={"Content-Type": "application/json"}),
+                            422), list)
+
+
+if __name__ == "__main__":
+    test_raw_bodies()
+    test_multipart_uploads()
+    test_json_base64_bodies()
+    test_errors()
+    print("✅ Frame ingestion tests passed")
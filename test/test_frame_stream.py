@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+WebSocket frame stream backpressure: the newest frames win, nothing blocks, close drains.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from frame_stream import LatestFrameQueue
+
+
+def test_fast_producer_drops_the_oldest_frames():
+    async def scenario():
+        queue = LatestFrameQueue(max_pending=2)
+        for i in range(5):
+            queue.put(b"frame%d" % i)
+        queue.close()
+        frames = []
+        while (frame := await queue.get()) is not None:
+            frames.append(frame)
+        return queue, frames
+
+    queue, frames = asyncio.run(scenario())
+    assert frames == [b"frame3", b"frame4"]
+    assert queue.received == 5 and queue.dropped == 3
+
+
+def test_consumer_waits_for_frames_and_stops_on_close():
+    async def scenario():
+        queue = LatestFrameQueue()
+        consumed = []
+
+        async def consumer():
+            while (frame := await queue.get()) is not None:
+                consumed.append(frame)
+                await asyncio.sleep(0.02)  # Slow inference
+
+        task = asyncio.create_task(consumer())
+        await asyncio.sleep(0.01)
+        assert not task.done()  # Waiting on an empty queue
+        for i in range(10):
+            queue.put(b"%d" % i)
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.05)
+        queue.close()
+        await asyncio.wait_for(task, 1)
+        return queue, consumed
+
+    queue, consumed = asyncio.run(scenario())
+    assert consumed[-1] == b"9" and consumed == sorted(consumed, key=int)
+    assert len(consumed) + queue.dropped == 10 and queue.dropped > 0
+
+
+if __name__ == "__main__":
+    test_fast_producer_drops_the_oldest_frames()
+    test_consumer_waits_for_frames_and_stops_on_close()
+    print("✅ Frame stream tests passed")
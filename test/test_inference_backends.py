@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+TFLite backend: int8 models get inputs quantized and outputs dequantized with the model's scale/zero-point.
+"""
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np
+
+from inference_backends import TFLiteBackend
+
+INPUT_QUANT = (1.0 / 255.0, -128)
+OUTPUT_QUANT = (1.0 / 256.0, -128)
+
+
+class FakeInterpreter:
+    """Int8 in, int8 out: class k scores the first pixel's quantized value plus k"""
+
+    instances = []
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.batch_size = 1
+        self.resizes = []
+        self.inputs = []
+        FakeInterpreter.instances.append(self)
+
+    def allocate_tensors(self):
+        pass
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": np.array([self.batch_size, 48, 48, 1]), "dtype": np.int8,
+                 "quantization": INPUT_QUANT}]
+
+    def get_output_details(self):
+        return [{"index": 1, "shape": np.array([self.batch_size, 7]), "dtype": np.int8,
+                 "quantization": OUTPUT_QUANT}]
+
+    def resize_tensor_input(self, index, shape):
+        self.resizes.append(shape)
+        self.batch_size = shape[0]
+
+    def set_tensor(self, index, value):
+        assert value.dtype == np.int8 and value.shape[0] == self.batch_size
+        self.inputs.append(value)
+
+    def invoke(self):
+        first = self.inputs[-1][:, 0, 0, 0].astype(np.int16)
+        self.output = np.clip(first[:, None] + np.arange(7), -128, 127).astype(np.int8)
+
+    def get_tensor(self, index):
+        return self.output
+
+
+def with_fake_tflite_runtime():
+    package = types.ModuleType("tflite_runtime")
+    package.interpreter = types.ModuleType("tflite_runtime.interpreter")
+    package.interpreter.Interpreter = FakeInterpreter
+    sys.modules["tflite_runtime"] = package
+    sys.modules["tflite_runtime.interpreter"] = package.interpreter
+
+
+def test_int8_model_quantizes_inputs_and_dequantizes_outputs():
+    saved = {name: sys.modules.get(name) for name in ("tflite_runtime", "tflite_runtime.interpreter")}
+    try:
+        with_fake_tflite_runtime()
+        backend = TFLiteBackend("emotion_model_int8.tflite")
+        interpreter = FakeInterpreter.instances[-1]
+
+        batch = np.zeros((3, 48, 48, 1), dtype=np.float32)
+        batch[:, 0, 0, 0] = [0.0, 0.2, 1.2]  # 1.2 is outside the calibrated range and clips
+        scores = backend.predict(batch)
+
+        # round(x / scale + zero_point), clipped to int8
+        assert interpreter.resizes == [[3, 48, 48, 1]]
+        assert interpreter.inputs[-1][:, 0, 0, 0].tolist() == [-128, -77, 127]
+        assert interpreter.inputs[-1][0, 1, 1, 0] == -128
+
+        # (q - zero_point) * scale, as float32
+        assert scores.dtype == np.float32 and scores.shape == (3, 7)
+        expected = (np.clip(np.array([-128, -77, 127])[:, None] + np.arange(7), -128, 127) + 128) / 256.0
+        assert np.allclose(scores, expected)
+
+        backend.predict(batch)
+        assert len(interpreter.resizes) == 1  # Same batch size: no reallocation
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+if __name__ == "__main__":
+    test_int8_model_quantizes_inputs_and_dequantizes_outputs()
+    print("✅ Inference backend tests passed")
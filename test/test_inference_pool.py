@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Inference pool: shared-memory slots, the pickled fallback, and rebuilding after a worker dies.
+
+Workers run in threads of this process (with the pool's real initializer and
+a stub backend), so the slot ring and generation bookkeeping are exercised
+without spawning model processes.
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import cv2
+import numpy as np
+
+import inference_backends
+import inference_pool
+from inference_pool import InferencePool
+
+SMALL_FRAME = cv2.imencode(".png", np.full((8, 8), 128, np.uint8))[1].tobytes()
+LARGE_FRAME = cv2.imencode(".png", np.random.default_rng(0).integers(0, 255, (64, 64), dtype=np.uint8))[1].tobytes()
+
+
+class StubBackend:
+    gate = threading.Event()
+    crash = False
+
+    def predict(self, batch):
+        StubBackend.gate.wait(5)
+        if StubBackend.crash:
+            raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+        return np.full((len(batch), 7), batch.mean(), dtype=np.float32)
+
+
+def in_process_pool(**kwargs):
+    inference_backends.create_backend = lambda name, path: StubBackend()
+    inference_pool.ProcessPoolExecutor = lambda max_workers, mp_context, initializer, initargs: ThreadPoolExecutor(
+        max_workers, initializer=initializer, initargs=initargs)
+    StubBackend.gate.set()
+    StubBackend.crash = False
+    pool = InferencePool(1, "emotion_model.h5", backend="stub", **kwargs)
+    pool.start()
+    wait_for(pool.is_ready)
+    return pool
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def restore(originals):
+    inference_backends.create_backend, inference_pool.ProcessPoolExecutor = originals
+
+
+def test_slots_are_reused_and_fall_back_to_pickling():
+    originals = inference_backends.create_backend, inference_pool.ProcessPoolExecutor
+    pool = in_process_pool(slot_size=len(SMALL_FRAME) + 16, slots_per_process=2)
+    try:
+        assert len(LARGE_FRAME) > pool.slot_size
+        StubBackend.gate.clear()  # Hold the worker so slots stay in use
+        futures = [pool.submit(SMALL_FRAME) for _ in range(3)] + [pool.submit(LARGE_FRAME)]
+        assert pool.stats()["free_slots"] == 0
+
+        StubBackend.gate.set()
+        scores = [future.result(timeout=5) for future in futures]
+        assert all(score.shape == (7,) for score in scores)
+        assert np.allclose(scores[0], scores[2])  # Same frame through a slot and pickled
+        wait_for(lambda: pool.stats()["requests"] == 4)
+
+        stats = pool.stats()
+        assert stats["free_slots"] == 2
+        assert stats["shared_memory_requests"] == 2 and stats["pickled_requests"] == 2
+
+        assert pool.submit(b"not an image").result(timeout=5) is None
+        assert pool.stats()["free_slots"] == 2
+    finally:
+        pool.shutdown()
+        restore(originals)
+
+
+def test_broken_worker_rebuilds_once_into_a_new_generation():
+    originals = inference_backends.create_backend, inference_pool.ProcessPoolExecutor
+    pool = in_process_pool(slot_size=1 << 12, slots_per_process=2)
+    try:
+        assert pool._generation == 1
+
+        # A frame of the first generation still holds its slot when the pool breaks
+        StubBackend.gate.clear()
+        StubBackend.crash = True
+        held = pool.submit(SMALL_FRAME)
+        wait_for(held.running)
+        # Real workers are separate processes; here the next generation's initializer replaces
+        # this handle while the held frame still has a view into it
+        first_worker_shm = inference_pool._worker_shm
+        pool._handle_broken(1)
+        pool._handle_broken(1)  # Several failures of one executor trigger a single rebuild
+        assert not pool.is_ready() and pool.stats()["rebuilding"]
+        try:
+            pool.submit(SMALL_FRAME)
+            assert False, "expected submits during a rebuild to be refused"
+        except inference_pool.PoolRestarting:
+            pass
+
+        StubBackend.crash = False
+        wait_for(lambda: pool._generation == 2)
+        StubBackend.gate.set()
+        held.exception(timeout=5)
+        first_worker_shm.close()
+        wait_for(pool.is_ready)
+        wait_for(lambda: not pool.stats()["rebuilding"])
+
+        # The old slot isn't returned to the new ring, and stale generations can't trigger rebuilds
+        stats = pool.stats()
+        assert stats["restarts"] == 1 and stats["free_slots"] == 2
+        pool._handle_broken(1)
+        assert not pool.stats()["rebuilding"]
+        assert pool.submit(SMALL_FRAME).result(timeout=5).shape == (7,)
+    finally:
+        pool.shutdown()
+        restore(originals)
+
+
+def test_crash_reported_by_a_frame_triggers_the_rebuild():
+    originals = inference_backends.create_backend, inference_pool.ProcessPoolExecutor
+    pool = in_process_pool(slot_size=1 << 12, slots_per_process=1)
+    try:
+        StubBackend.crash = True
+        try:
+            pool.submit(SMALL_FRAME).result(timeout=5)
+            assert False, "expected the stub crash to surface"
+        except BrokenProcessPool:
+            pass
+        StubBackend.crash = False
+        wait_for(lambda: pool.stats()["restarts"] == 1 and pool.is_ready())
+        assert pool._generation == 2
+    finally:
+        pool.shutdown()
+        restore(originals)
+
+
+if __name__ == "__main__":
+    test_slots_are_reused_and_fall_back_to_pickling()
+    test_broken_worker_rebuilds_once_into_a_new_generation()
+    test_crash_reported_by_a_frame_triggers_the_rebuild()
+    print("✅ Inference pool tests passed")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Async LLM path: completions overlap, parse like the sync path, and time out into the fallbacks.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import httpx
+import openai
+
+from llm_service import LLMService
+
+
+def fake_service(latency, content, timeout=5.0):
+    """LLMService whose async client talks to an in-process fake completions endpoint"""
+    async def handler(request):
+        # MockTransport does not enforce timeouts; honour the per-call read timeout like a real socket would
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+        if read_timeout is not None and latency > read_timeout:
+            await asyncio.sleep(read_timeout)
+            raise httpx.ReadTimeout("fake read timeout", request=request)
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": "fake",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        })
+
+    service = LLMService(api_key="sk-fake", timeout=timeout, max_retries=0)
+    service.async_client = openai.AsyncOpenAI(
+        api_key="sk-fake", base_url="http://fake/v1", timeout=timeout, max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return service
+
+
+def test_completions_run_concurrently():
+    service = fake_service(0.3, json.dumps(["Q1", "Q2"]))
+
+    async def scenario():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(service.agenerate_interview_questions("technical") for _ in range(10)))
+        await service.aclose()
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(scenario())
+    assert results == [["Q1", "Q2"]] * 10
+    assert elapsed < 1.5, f"10 x 0.3s completions took {elapsed:.2f}s"
+    metrics = service.metrics()
+    assert metrics["calls"] == 10 and metrics["in_flight"] == 0 and metrics["fallbacks"] == 0
+
+
+def test_json_object_is_extracted_from_surrounding_text():
+    service = fake_service(0.0, 'Here you go: {"score": 88, "overall_feedback": "Solid"} Thanks!')
+    feedback = asyncio.run(service.aanalyze_interview_response("Q", "A"))
+    assert feedback == {"score": 88, "overall_feedback": "Solid"}
+
+    service = fake_service(0.0, "not json")
+    assert asyncio.run(service.agenerate_follow_up_questions("Q", "A")) == LLMService.UNPARSED_FOLLOW_UPS
+
+
+def test_timeout_falls_back():
+    service = fake_service(1.0, "{}")
+    analysis = asyncio.run(service.aanalyze_comprehensive_response(
+        "Q", "A long answer about a team project", {"emotion": "Happy", "confidence": 0.8}, timeout=0.1))
+    assert analysis["confidence_score"] == 80  # From _create_comprehensive_fallback
+    metrics = service.metrics()
+    assert metrics["timeouts"] == 1 and metrics["fallbacks"] == 1
+
+
+def test_no_api_key_uses_fallbacks():
+    service = LLMService(api_key="your_openai_api_key_here")
+    questions = asyncio.run(service.agenerate_interview_questions("leadership", count=2))
+    assert questions == service._get_fallback_questions("leadership", 2)
+
+
+if __name__ == "__main__":
+    test_completions_run_concurrently()
+    test_json_object_is_extracted_from_surrounding_text()
+    test_timeout_falls_back()
+    test_no_api_key_uses_fallbacks()
+    print("✅ Async LLM service tests passed")
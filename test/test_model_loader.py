@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Lazy emotion model loading: nothing loads at import, one warmed-up load, failures are reported and retried.
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np
+
+import model_loader
+from model_loader import ModelRegistry
+
+
+class FakeBackend:
+    def __init__(self, loads, fail=False):
+        loads.append(self)
+        time.sleep(0.05)  # Loading takes a while, so concurrent callers overlap
+        if fail:
+            raise RuntimeError("model file is corrupt")
+        self.batches = []
+
+    def predict(self, batch):
+        self.batches.append(batch.shape)
+        return np.zeros((len(batch), 7), dtype=np.float32)
+
+
+def with_fake_backend(fail=False):
+    loads = []
+    model_loader.create_backend = lambda name, path: FakeBackend(loads, fail=fail)
+    return loads
+
+
+def test_loads_once_on_first_use_with_a_warmup_batch():
+    original = model_loader.create_backend
+    try:
+        loads = with_fake_backend()
+        registry = ModelRegistry("emotion_model.h5", backend="fake", warmup_batch_size=8)
+        assert registry.status()["state"] == ModelRegistry.NOT_LOADED and loads == []
+
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(registry.get())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1 and all(model is loads[0] for model in models)
+        assert loads[0].batches == [(8, 48, 48, 1)]
+        assert registry.is_ready() and registry.status()["load_seconds"] > 0
+    finally:
+        model_loader.create_backend = original
+
+
+def test_failed_load_is_reported_and_retried():
+    original = model_loader.create_backend
+    try:
+        with_fake_backend(fail=True)
+        registry = ModelRegistry("emotion_model.h5", backend="fake")
+        registry.start_background_load()
+        assert registry.state == ModelRegistry.LOADING
+        deadline = time.time() + 5
+        while registry.state == ModelRegistry.LOADING and time.time() < deadline:
+            time.sleep(0.01)
+        assert registry.status()["state"] == ModelRegistry.FAILED
+        assert "corrupt" in registry.status()["error"]
+
+        loads = with_fake_backend()
+        registry.get()
+        assert len(loads) == 1 and registry.is_ready() and registry.error is None
+    finally:
+        model_loader.create_backend = original
+
+
+if __name__ == "__main__":
+    test_loads_once_on_first_use_with_a_warmup_batch()
+    test_failed_load_is_reported_and_retried()
+    print("✅ Model loader tests passed")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Keyset pagination: page-size clamping, cursor round-trips and rejection, and walking every page.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import queries
+from models import Base, InterviewSession, User
+from pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, page_size, parse_fields
+)
+
+
+def expect_400(fn, *args):
+    try:
+        fn(*args)
+    except HTTPException as e:
+        assert e.status_code == 400
+        return e.detail
+    raise AssertionError(f"{fn.__name__}{args} was accepted")
+
+
+def test_page_size_is_clamped():
+    assert page_size(None) == DEFAULT_PAGE_SIZE
+    assert page_size(25) == 25
+    assert page_size(0) == 1 and page_size(-5) == 1
+    assert page_size(MAX_PAGE_SIZE + 1) == MAX_PAGE_SIZE and page_size(10 ** 9) == MAX_PAGE_SIZE
+
+
+def test_cursor_round_trip_and_rejection():
+    timestamp = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(timestamp, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, 42)
+    assert decode_cursor(None) is None and decode_cursor("") is None
+
+    for bad in ("not-a-cursor!", "e30", encode_cursor(timestamp, 1)[:-3], "WzEsMiwzXQ", "WyJ4IiwgMV0", "W251bGwsIDFd"):
+        # garbage, {}, truncated, [1,2,3], ["x", 1], [null, 1]
+        assert expect_400(decode_cursor, bad) == "Invalid pagination cursor"
+
+
+def test_parse_fields():
+    allowed, default = queries.SESSION_LIST_FIELDS, ("id", "start_time")
+    assert parse_fields(None, allowed, default) == ["id", "start_time"]
+    assert parse_fields(" id, average_confidence ,", allowed, default) == ["id", "average_confidence"]
+    assert "hashed_password" in expect_400(parse_fields, "id,hashed_password", allowed, default)
+
+
+def test_keyset_pages_cover_every_session_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'pages.db')}")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        start = datetime(2026, 1, 1)
+        with factory() as db:
+            user = User(name="Test", email="t@example.com", hashed_password="x")
+            db.add(user)
+            db.flush()
+            # Several sessions share a start_time, so the id tie-breaker matters
+            db.add_all([InterviewSession(user_id=user.id, start_time=start + timedelta(minutes=i // 3))
+                        for i in range(23)])
+            db.commit()
+
+            seen, cursor, size = [], None, page_size(5)
+            while True:
+                rows = db.execute(queries.user_sessions_page(user.id, ["id"], size, decode_cursor(cursor))).all()
+                page, more = rows[:size], len(rows) > size
+                seen += [(row.start_time, row.id) for row in page]
+                if not more:
+                    break
+                cursor = encode_cursor(page[-1].start_time, page[-1].id)
+
+            assert len(seen) == 23 and len(set(seen)) == 23
+            assert seen == sorted(seen, reverse=True)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_page_size_is_clamped()
+    test_cursor_round_trip_and_rejection()
+    test_parse_fields()
+    test_keyset_pages_cover_every_session_once()
+    print("✅ Pagination tests passed")
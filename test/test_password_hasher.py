@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Off-loop bcrypt: hashes verify, old-cost hashes are upgraded, queue time is measured.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+# Keep the test fast; only applies if routers.auth has not been imported yet
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from passlib.hash import bcrypt
+
+from password_hasher import PasswordHasher
+from routers.auth import BCRYPT_ROUNDS
+
+
+def test_hash_verify_and_rehash_on_cost_change():
+    hasher = PasswordHasher(max_concurrency=1)
+
+    async def scenario():
+        hashed = await hasher.hash("secret123")
+        assert await hasher.verify_and_update("secret123", hashed) == (True, None)
+        assert (await hasher.verify_and_update("wrong", hashed))[0] is False
+        assert await hasher.verify_and_update("secret123", None) == (False, None)
+
+        old = bcrypt.using(rounds=BCRYPT_ROUNDS + 1).hash("secret123")
+        valid, new_hash = await hasher.verify_and_update("secret123", old)
+        assert valid and new_hash is not None
+        assert bcrypt.from_string(new_hash).rounds == BCRYPT_ROUNDS
+
+        # More calls than threads: the extra ones wait in the queue
+        await asyncio.gather(*(hasher.hash(f"pw{i}") for i in range(4)))
+
+    asyncio.run(scenario())
+    metrics = hasher.metrics()
+    hasher.shutdown()
+    assert metrics["calls"] == 8 and metrics["in_flight"] == 0
+    assert metrics["rehashes"] == 1
+    assert metrics["max_queue_depth"] == 3
+    assert metrics["max_queue_ms"] > 0
+
+
+if __name__ == "__main__":
+    test_hash_verify_and_rehash_on_cost_change()
+    print("✅ Password hashing runs off the event loop and upgrades old costs")
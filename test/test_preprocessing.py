@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Single-decode preprocessing: reduced-scale decode, 48x48 uint8 frames and in-place batch normalization.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import cv2
+import numpy as np
+
+from preprocessing import FrameBatchBuffer, decode_gray, preprocess_image_bytes, resize_to_input
+
+
+def jpeg(width=640, height=480):
+    img = cv2.GaussianBlur(np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8), (21, 21), 0)
+    return cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def test_decode_is_grayscale_at_reduced_scale():
+    data = jpeg()
+    assert decode_gray(data, reduction=1).shape == (480, 640)
+    assert decode_gray(data, reduction=2).shape == (240, 320)
+    assert decode_gray(memoryview(data), reduction=4).shape == (120, 160)
+    assert decode_gray(b"not an image") is None
+
+
+def test_frames_match_a_full_decode_and_resize():
+    data = jpeg()
+    frame = preprocess_image_bytes(data)
+    assert frame.shape == (48, 48) and frame.dtype == np.uint8
+
+    reference = cv2.resize(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE), (48, 48))
+    assert np.abs(frame.astype(int) - reference.astype(int)).mean() < 3
+    assert preprocess_image_bytes(b"") is None
+
+    already = np.zeros((48, 48), np.uint8)
+    assert resize_to_input(already) is already
+
+
+def test_batch_buffer_normalizes_in_place():
+    buffer = FrameBatchBuffer(4)
+    frames = [np.full((48, 48), value, np.uint8) for value in (0, 51, 255)]
+    batch = buffer.fill(frames)
+    assert batch.shape == (3, 48, 48, 1) and batch.dtype == np.float32
+    assert np.shares_memory(batch, buffer.array)
+    assert np.allclose(batch[:, 0, 0, 0], [0.0, 0.2, 1.0])
+
+    try:
+        buffer.fill(frames * 2)
+        assert False, "expected an oversized batch to be rejected"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_decode_is_grayscale_at_reduced_scale()
+    test_frames_match_a_full_decode_and_resize()
+    test_batch_buffer_normalizes_in_place()
+    print("✅ Preprocessing tests passed")
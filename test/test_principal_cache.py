@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+TTL, LRU bound and invalidation behaviour of the authenticated-principal cache.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from principal_cache import Principal, PrincipalCache
+
+
+def principal(user_id, name="User"):
+    return Principal(user_id, name, f"user{user_id}@example.com", None, None)
+
+
+def test_entries_expire_and_stay_bounded():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=0.05)
+    for i in range(3):
+        cache.put("email", f"user{i}@example.com", principal(i), cache.generation)
+    assert cache.get("email", "user0@example.com") is None  # Evicted as least recently used
+    assert cache.get("email", "user2@example.com") == principal(2)
+    time.sleep(0.06)
+    assert cache.get("email", "user2@example.com") is None
+
+    metrics = cache.metrics()
+    assert metrics["evictions"] == 1 and metrics["expired"] == 1
+    assert metrics["hits"] == 1 and metrics["db_lookups"] == 2
+
+
+def test_invalidation_drops_every_key_of_the_user():
+    cache = PrincipalCache()
+    cache.put("email", "user1@example.com", principal(1), cache.generation)
+    cache.put("google", "g-1", principal(1), cache.generation)
+    cache.put("email", "user2@example.com", principal(2), cache.generation)
+    cache.invalidate_user(1)
+    assert cache.get("email", "user1@example.com") is None
+    assert cache.get("google", "g-1") is None
+    assert cache.get("email", "user2@example.com") == principal(2)
+
+
+def test_lookup_racing_an_invalidation_is_not_stored():
+    cache = PrincipalCache()
+    generation = cache.generation  # Request starts its user query...
+    cache.invalidate_user(1)  # ...while /google-login renames the user
+    cache.put("email", "user1@example.com", principal(1, "Old name"), generation)
+    assert cache.get("email", "user1@example.com") is None
+
+
+def test_zero_ttl_disables_caching():
+    cache = PrincipalCache(ttl_seconds=0)
+    cache.put("email", "user1@example.com", principal(1), cache.generation)
+    assert cache.get("email", "user1@example.com") is None
+
+
+if __name__ == "__main__":
+    test_entries_expire_and_stay_bounded()
+    test_invalidation_drops_every_key_of_the_user()
+    test_lookup_racing_an_invalidation_is_not_stored()
+    test_zero_ttl_disables_caching()
+    print("✅ Principal cache expires, evicts and invalidates")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression test for the hot request paths in backend/main.py.
+
+Builds the schema in an in-memory SQLite database and checks that
+EXPLAIN QUERY PLAN for every statement in backend/queries.py is an index
+search: no full table scans and no temporary B-tree for ORDER BY.
+"""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, text
+
+import queries
+from models import Base
+
+HOT_QUERIES = {
+    "user_by_email": queries.user_by_email("test@example.com"),
+    "user_by_google_id": queries.user_by_google_id("1234567890"),
+    "owned_session": queries.owned_session(1, 1),
+    "user_sessions": queries.user_sessions(1),
+    "dashboard_recent_sessions": queries.user_sessions(1, limit=10),
+    "sessions_first_page": queries.user_sessions_page(1, ["id", "start_time"], 50),
+    "sessions_next_page": queries.user_sessions_page(1, queries.SESSION_LIST_FIELDS, 50, (datetime(2026, 1, 1), 500)),
+    "session_timeline": queries.session_timeline(1),
+}
+
+
+def query_plan(conn, statement):
+    sql = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    return [row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def test_hot_queries_use_indexes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        for name, statement in HOT_QUERIES.items():
+            plan = query_plan(conn, statement)
+            print(f"{name}: {plan}")
+            for step in plan:
+                assert step.startswith("SEARCH"), f"{name} does not use an index: {plan}"
+                assert "TEMP B-TREE" not in step, f"{name} sorts without an index: {plan}"
+
+
+if __name__ == "__main__":
+    test_hot_queries_use_indexes()
+    print("✅ All hot queries use indexes")
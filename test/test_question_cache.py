@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Question cache: tiers, TTL and stale-while-revalidate, coalescing, eviction and warming.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from question_cache import CacheKey, Entry, QuestionCache, QuestionStore
+from rate_limit import AdmissionGate
+
+
+class FakeLLM:
+    def __init__(self, latency=0.0, available=True):
+        self.latency = latency
+        self.available = available
+        self.calls = []
+
+    async def __call__(self, topic, difficulty, count):
+        self.calls.append((topic, difficulty, count))
+        await asyncio.sleep(self.latency)
+        if not self.available:
+            return None
+        return [f"{topic} {difficulty} q{i} v{len(self.calls)}" for i in range(count)]
+
+
+def make_cache(path, **kwargs):
+    return QuestionCache(QuestionStore(path, max_entries=kwargs.pop("max_entries", 100)), **kwargs)
+
+
+def test_memory_and_disk_tiers_with_varied_subsets():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "questions.db")
+        llm = FakeLLM()
+        cache = make_cache(path)
+
+        async def scenario():
+            first = await cache.get("  System   Design ", "Medium", 5, llm)
+            subsets = {tuple(await cache.get("system design", "medium", 5, llm)) for _ in range(30)}
+            return first, subsets
+
+        first, subsets = asyncio.run(scenario())
+        assert llm.calls == [("system design", "medium", 15)]  # One pool of count * pool_factor
+        assert len(first) == 5 and len(subsets) > 1
+        assert cache.metrics()["misses"] == 1 and cache.metrics()["memory_hits"] == 30
+        cache.close()
+
+        # A restarted worker finds the pool on disk; memory hits were counted toward popularity
+        restarted = make_cache(path)
+        assert len(asyncio.run(restarted.get("system design", "medium", 5, llm))) == 5
+        assert len(llm.calls) == 1 and restarted.metrics()["disk_hits"] == 1
+        assert restarted.store.popular(1) == [CacheKey("system design", "medium", 5)]
+        restarted.close()
+
+
+def test_stale_entries_are_served_while_refreshing():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = FakeLLM(latency=0.05)
+        cache = make_cache(os.path.join(tmp, "questions.db"), ttl_seconds=60, stale_seconds=60)
+        key = CacheKey.normalize("python", "hard", 3)
+        cache.store.put(key, Entry(["old 1", "old 2", "old 3"], time.time() - 90))
+
+        async def scenario():
+            started = time.perf_counter()
+            stale = await cache.get("python", "hard", 3, llm)
+            served_in = time.perf_counter() - started
+            await asyncio.gather(*cache._refreshing.values())
+            return stale, served_in, await cache.get("python", "hard", 3, llm)
+
+        stale, served_in, fresh = asyncio.run(scenario())
+        assert sorted(stale) == ["old 1", "old 2", "old 3"] and served_in < 0.05
+        assert all(q.startswith("python hard") for q in fresh)
+        metrics = cache.metrics()
+        assert metrics["stale_hits"] == 1 and metrics["refreshes"] == 1 and metrics["memory_hits"] == 1
+
+        # Past the stale window the request waits for a new pool
+        cache._memory.clear()
+        cache.store.put(key, Entry(["ancient"], time.time() - 500))
+        assert asyncio.run(cache.get("python", "hard", 3, llm)) != ["ancient"]
+        assert cache.metrics()["misses"] == 1
+        cache.close()
+
+
+def test_concurrent_misses_share_one_completion_and_failures_are_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = FakeLLM(latency=0.1)
+        cache = make_cache(os.path.join(tmp, "questions.db"))
+
+        async def burst():
+            return await asyncio.gather(*(cache.get("devops", "medium", 5, llm) for _ in range(10)))
+
+        assert all(len(questions) == 5 for questions in asyncio.run(burst()))
+        assert len(llm.calls) == 1 and cache.metrics()["coalesced"] == 9
+
+        down = FakeLLM(available=False)
+        assert asyncio.run(cache.get("sales", "easy", 5, down)) is None
+        assert asyncio.run(cache.get("sales", "easy", 5, down)) is None
+        assert len(down.calls) == 2 and cache.metrics()["uncached"] == 2
+        cache.close()
+
+
+def test_a_cancelled_or_failing_leader_does_not_break_its_followers():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = FakeLLM(latency=0.1)
+        cache = make_cache(os.path.join(tmp, "questions.db"))
+
+        async def leader_goes_away():
+            leader = asyncio.ensure_future(cache.get("go", "hard", 3, llm))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.ensure_future(cache.get("go", "hard", 3, llm)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await asyncio.gather(*followers)
+
+        assert all(len(questions) == 3 for questions in asyncio.run(leader_goes_away()))
+        assert len(llm.calls) == 1 and cache.store.get(CacheKey.normalize("go", "hard", 3)) is not None
+
+        async def broken(topic, difficulty, count):
+            await asyncio.sleep(0.05)
+            raise RuntimeError("connection reset")
+
+        async def burst():
+            return await asyncio.gather(*(cache.get("rust", "easy", 3, broken) for _ in range(4)))
+
+        assert asyncio.run(burst()) == [None] * 4 and not cache._inflight
+        cache.close()
+
+
+def test_structured_items_are_reduced_to_question_text():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = make_cache(os.path.join(tmp, "questions.db"))
+
+        async def structured(topic, difficulty, count):
+            return [{"question": "Why Python?", "difficulty": "easy"}, {"text": "What is a GIL?"},
+                    "Why Python?", "  ", {"unrelated": 1}, 42]
+
+        questions = asyncio.run(cache.get("python", "easy", 5, structured))
+        assert sorted(questions) == ["What is a GIL?", "Why Python?"]
+        cache.close()
+
+
+def test_background_refreshes_go_through_the_llm_gate():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = FakeLLM()
+        gate = AdmissionGate("llm", max_concurrent=1, max_waiting=0)
+        cache = make_cache(os.path.join(tmp, "questions.db"), ttl_seconds=60, stale_seconds=60, gate=gate)
+        key = CacheKey.normalize("python", "hard", 3)
+
+        async def scenario():
+            cache.store.put(key, Entry(["old"], time.time() - 90))
+            entered = await gate.acquire()  # Saturated by a request
+            await cache.get("python", "hard", 3, llm)
+            await asyncio.gather(*cache._refreshing.values())
+            gate.release(entered)
+
+            cache._memory.clear()
+            await cache.get("python", "hard", 3, llm)
+            await asyncio.gather(*cache._refreshing.values())
+
+        asyncio.run(scenario())
+        assert gate.rejected == 1 and gate.admitted == 2 and gate.active == 0
+        assert len(llm.calls) == 1
+        assert cache.metrics()["refresh_failures"] == 1 and cache.metrics()["refreshes"] == 1
+        cache.close()
+
+
+def test_disk_tier_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = FakeLLM()
+        cache = make_cache(os.path.join(tmp, "questions.db"), max_entries=3, memory_entries=1)
+
+        async def scenario():
+            for topic in ("a", "b", "c"):
+                await cache.get(topic, "medium", 2, llm)
+                await asyncio.sleep(0.01)
+            await cache.get("a", "medium", 2, llm)  # Disk hit: "a" becomes most recently used
+            await cache.get("d", "medium", 2, llm)
+
+        asyncio.run(scenario())
+        assert cache.store.count() == 3 and cache.metrics()["evictions"] == 1
+        assert cache.store.get(CacheKey.normalize("b", "medium", 2)) is None
+        assert cache.store.get(CacheKey.normalize("a", "medium", 2)) is not None
+        cache.close()
+
+
+def test_warm_skips_fresh_entries_unless_forced():
+    with tempfile.TemporaryDirectory() as tmp:
+        llm = FakeLLM()
+        cache = make_cache(os.path.join(tmp, "questions.db"))
+        keys = [CacheKey.normalize(topic, "medium", 5) for topic in ("technical", "behavioral")]
+
+        assert set(asyncio.run(cache.warm(keys, llm)).values()) == {"warmed"}
+        assert set(asyncio.run(cache.warm(keys, llm)).values()) == {"fresh"}
+        assert set(asyncio.run(cache.warm(keys, llm, force=True)).values()) == {"warmed"}
+        assert len(llm.calls) == 4
+        assert set(asyncio.run(cache.warm([CacheKey("x", "medium", 5)], FakeLLM(available=False))).values()) == {"failed"}
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_memory_and_disk_tiers_with_varied_subsets()
+    test_stale_entries_are_served_while_refreshing()
+    test_concurrent_misses_share_one_completion_and_failures_are_not_cached()
+    test_a_cancelled_or_failing_leader_does_not_break_its_followers()
+    test_structured_items_are_reduced_to_question_text()
+    test_background_refreshes_go_through_the_llm_gate()
+    test_disk_tier_evicts_least_recently_used()
+    test_warm_skips_fresh_entries_unless_forced()
+    print("✅ Question cache tests passed")
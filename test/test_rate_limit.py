@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Token buckets refill at their rate, and admission gates reject once their wait queue is full.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi import HTTPException
+
+from rate_limit import AdmissionGate, Limit, RateLimiter, parse_limit
+
+
+def test_parse_limit():
+    assert parse_limit("10/s:20") == Limit(10.0, 20)
+    assert parse_limit("6/min") == Limit(0.1, 6)
+    assert parse_limit("off") is None
+
+
+def test_bucket_allows_burst_then_refills():
+    limiter = RateLimiter({"analyze": (Limit(rate=20.0, burst=3), None)})
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.check("analyze", user_key="1")
+        try:
+            await limiter.check("analyze", user_key="1")
+        except HTTPException as e:
+            assert e.status_code == 429 and int(e.headers["Retry-After"]) >= 1
+        else:
+            raise AssertionError("bucket allowed more than its burst")
+        await limiter.check("analyze", user_key="2")  # Other users have their own bucket
+        time.sleep(0.06)  # Slightly more than one token at 20/s
+        await limiter.check("analyze", user_key="1")
+
+    asyncio.run(scenario())
+    metrics = limiter.metrics()
+    assert metrics["rejected"] == {"analyze:user": 1}
+    assert metrics["allowed"] == {"analyze:user": 5}
+
+
+def test_gate_rejects_when_queue_is_full():
+    async def scenario():
+        gate = AdmissionGate("llm", max_concurrent=1, max_waiting=1)
+        release = asyncio.Event()
+
+        async def request():
+            entered = await gate.acquire()
+            try:
+                await release.wait()
+            finally:
+                gate.release(entered)
+
+        running = asyncio.create_task(request())
+        queued = asyncio.create_task(request())
+        await asyncio.sleep(0)
+        assert gate.active == 1 and gate.waiting == 1
+        try:
+            await gate.acquire()
+        except HTTPException as e:
+            assert e.status_code == 429 and "Retry-After" in e.headers
+        else:
+            raise AssertionError("gate admitted past its wait queue")
+        release.set()
+        await asyncio.gather(running, queued)
+        return gate.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["admitted"] == 2 and metrics["rejected"] == 1 and metrics["active"] == 0
+
+
+if __name__ == "__main__":
+    test_parse_limit()
+    test_bucket_allows_burst_then_refills()
+    test_gate_rejects_when_queue_is_full()
+    print("✅ Rate limits and admission gates behave")
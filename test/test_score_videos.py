@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Offline re-scoring into the database: eye contact is kept, packed timelines stay packed, stats follow.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, EmotionData, InterviewSession, SessionTimeline, User, UserStats
+from preprocessing import FrameBatchBuffer
+from score_videos import DatabaseWriter, ScoringState, nearest_eye_contact, plan_segments, write_segment
+from timeline_store import compact_session, session_samples
+
+START = datetime(2026, 1, 5, 9, 0, 0)
+
+
+def make_database(path, completed=True):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        user = User(name="Test", email="t@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        session = InterviewSession(user_id=user.id, start_time=START)
+        if completed:
+            session.end_time = START + timedelta(seconds=60)
+            session.average_confidence = 0.5
+            session.dominant_emotion = "Neutral"
+        db.add(session)
+        db.flush()
+        # Live samples every second with distinct eye-contact scores
+        db.add_all([
+            EmotionData(user_id=user.id, session_id=session.id, emotion="Neutral", confidence=0.5,
+                        eye_contact_score=round(0.01 * i, 2), timestamp=START + timedelta(seconds=i))
+            for i in range(60)
+        ])
+        db.add(UserStats(user_id=user.id, session_count=1, completed_sessions=int(completed),
+                         average_confidence=0.5 if completed else 0.0,
+                         emotion_counts={"Neutral": 1} if completed else {}))
+        db.commit()
+        return engine, factory, user.id, session.id
+
+
+def rescore(factory, session_id, start_s, end_s, offsets_ms):
+    writer = DatabaseWriter(r"session(\d+)", session_id=session_id, session_factory=factory)
+    writer.write("rec.mp4", 0, start_s, end_s, offsets_ms,
+                 ["Happy"] * len(offsets_ms), [0.9] * len(offsets_ms))
+
+
+def test_nearest_eye_contact():
+    existing = [(START, 0.1), (START + timedelta(seconds=2), 0.3)]
+    wanted = [START - timedelta(seconds=1), START + timedelta(milliseconds=900),
+              START + timedelta(milliseconds=1100), START + timedelta(seconds=5)]
+    assert nearest_eye_contact(existing, wanted) == [0.1, 0.1, 0.3, 0.3]
+    assert nearest_eye_contact([], wanted[:2]) == [0.0, 0.0]
+
+
+def test_rescoring_rows_keeps_eye_contact_and_refreshes_stats():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory, user_id, session_id = make_database(os.path.join(tmp, "score.db"))
+        # Twice the live sample rate over the first 30 seconds
+        rescore(factory, session_id, 0, 30, [500 * i for i in range(60)])
+
+        with factory() as db:
+            samples = session_samples(db, session_id)
+            rescored = [s for s in samples if s[3] < START + timedelta(seconds=30)]
+            assert len(rescored) == 60 and len(samples) == 90
+            assert {s[0] for s in rescored} == {"Happy"}
+            assert [s[2] for s in rescored[:4]] == [0.0, 0.0, 0.01, 0.01]
+            assert rescored[-1][2] == 0.29
+
+            session = db.get(InterviewSession, session_id)
+            assert session.dominant_emotion == "Happy" and session.average_confidence == 0.77
+            stats = db.get(UserStats, user_id)
+            assert stats.average_confidence == 0.77 and stats.emotion_counts == {"Happy": 1}
+        engine.dispose()
+
+
+def test_rescoring_a_compacted_session_rewrites_the_packed_timeline():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory, user_id, session_id = make_database(os.path.join(tmp, "score.db"))
+        with factory() as db:
+            compact_session(db, session_id)
+
+        rescore(factory, session_id, 30, 60, [30000 + 1000 * i for i in range(30)])
+        rescore(factory, session_id, 30, 60, [30000 + 1000 * i for i in range(30)])  # Resumed run
+
+        with factory() as db:
+            assert db.scalar(select(func.count()).select_from(EmotionData)) == 0
+            assert db.get(SessionTimeline, session_id).sample_count == 60
+            samples = session_samples(db, session_id)
+            assert [s[0] for s in samples] == ["Neutral"] * 30 + ["Happy"] * 30
+            assert [s[2] for s in samples] == [round(0.01 * i, 2) for i in range(60)]
+        engine.dispose()
+
+
+def test_live_sessions_keep_their_scores():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory, user_id, session_id = make_database(os.path.join(tmp, "score.db"), completed=False)
+        rescore(factory, session_id, 0, 60, [1000 * i for i in range(60)])
+
+        with factory() as db:
+            session = db.get(InterviewSession, session_id)
+            assert session.average_confidence is None and session.dominant_emotion is None
+            assert db.get(UserStats, user_id).completed_sessions == 0
+            assert [s[2] for s in session_samples(db, session_id)] == [round(0.01 * i, 2) for i in range(60)]
+        engine.dispose()
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, video, segment, start_s, end_s, offsets_ms, labels, confidences):
+        self.writes.append((video, segment, list(labels)))
+
+
+class FakeModel:
+    def predict(self, batch):
+        scores = np.zeros((len(batch), 7), dtype=np.float32)
+        scores[:, 3] = 0.9
+        return scores
+
+
+def test_empty_segments_are_not_written_or_marked_done():
+    with tempfile.TemporaryDirectory() as tmp:
+        state = ScoringState(os.path.join(tmp, "state.db"))
+        writer = RecordingWriter()
+        classes = ["Angry", "Disgust", "Fear", "Happy", "Sad", "Surprise", "Neutral"]
+        write = lambda segment, frames: write_segment(
+            writer, state, ("rec.webm", 1.0, segment, 120.0 * segment, 120.0 * (segment + 1), True),
+            np.arange(len(frames)) * 500, frames, FakeModel(), FrameBatchBuffer(4), 4, classes)
+
+        assert write(0, np.zeros((6, 48, 48), np.uint8)) is True
+        assert write(1, np.empty((0, 48, 48), np.uint8)) is False
+        assert writer.writes == [("rec.webm", 0, ["Happy"] * 6)]
+        assert state.done_segments("rec.webm", 1.0) == {0}
+
+
+def test_failed_segments_are_recorded_until_they_succeed():
+    with tempfile.TemporaryDirectory() as tmp:
+        state = ScoringState(os.path.join(tmp, "state.db"))
+        state.mark_failed("rec.mp4", 2, 1.0, "error: moov atom not found")
+        assert state.failed_segments() == [("rec.mp4", 2, "error: moov atom not found")]
+        assert state.done_segments("rec.mp4", 1.0) == set()
+
+        state.mark_done("rec.mp4", 2, 1.0, 240)
+        assert state.failed_segments() == [] and state.done_segments("rec.mp4", 1.0) == {2}
+
+
+def test_segment_planning():
+    assert plan_segments(300.0, 120.0, set()) == [(0, False), (1, False), (2, False)]
+    assert plan_segments(300.0, 120.0, {0, 2}) == [(1, False)]
+    # No duration (webm without frame count): scored until a segment comes back empty
+    assert plan_segments(0.0, 120.0, set()) == [(0, True)]
+    assert plan_segments(0.0, 120.0, {0, 1, 3}) == [(2, False), (4, True)]
+
+
+if __name__ == "__main__":
+    test_nearest_eye_contact()
+    test_rescoring_rows_keeps_eye_contact_and_refreshes_stats()
+    test_rescoring_a_compacted_session_rewrites_the_packed_timeline()
+    test_live_sessions_keep_their_scores()
+    test_empty_segments_are_not_written_or_marked_done()
+    test_failed_segments_are_recorded_until_they_succeed()
+    test_segment_planning()
+    print("✅ Video re-scoring tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Checkout/return behaviour of the raw-sqlite connection pool used by app.py.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlite_pool import PoolTimeout, SQLitePool
+
+
+def test_connections_are_reused_and_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SQLitePool(os.path.join(tmp, "pool.db"), size=2, timeout=5)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+            conn.commit()
+
+        def work():
+            for i in range(200):
+                with pool.connection() as conn:
+                    conn.execute("INSERT INTO t (v) VALUES (?)", (str(i),))
+                    conn.commit()
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = pool.stats()
+        assert stats["open"] <= 2
+        assert stats["checkouts"] == 1 + 6 * 200
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1200
+        pool.close()
+
+
+def test_failed_request_rolls_back_and_returns_connection():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SQLitePool(os.path.join(tmp, "pool.db"), size=1, timeout=0.2)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+            conn.commit()
+        try:
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO t (id) VALUES (1)")
+                raise ValueError("handler failed")
+        except ValueError:
+            pass
+
+        with pool.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+            # The only connection is checked out: a second checkout times out
+            try:
+                pool.acquire()
+            except PoolTimeout:
+                pass
+            else:
+                raise AssertionError("pool handed out more connections than its size")
+        pool.close()
+
+
+def test_async_handler_waits_for_a_connection_off_the_event_loop():
+    import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SQLitePool(os.path.join(tmp, "app.db"), size=1, timeout=5)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, password TEXT)")
+            conn.execute("INSERT INTO users (name, email, password) VALUES ('Ada', 'ada@example.com', 'x')")
+            conn.commit()
+        saved, app.db_pool = app.db_pool, pool
+
+        async def scenario():
+            # A sync handler holds the only connection; its get_conn teardown runs on the loop
+            held = pool.acquire()
+            lookup = asyncio.ensure_future(app.run_in_threadpool(app.find_user, "ada@example.com"))
+            ticks = 0
+            started = time.perf_counter()
+            while time.perf_counter() - started < 0.2:
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert not lookup.done()
+            pool.release(held)
+            return ticks, await asyncio.wait_for(lookup, 5)
+
+        try:
+            ticks, user = asyncio.run(scenario())
+            assert ticks >= 10, "event loop was blocked while waiting for a connection"
+            assert user["id"] == 1
+        finally:
+            app.db_pool = saved
+            pool.close()
+
+
+if __name__ == "__main__":
+    test_connections_are_reused_and_bounded()
+    test_failed_request_rolls_back_and_returns_connection()
+    test_async_handler_waits_for_a_connection_off_the_event_loop()
+    print("✅ SQLite pool checkouts are bounded and always returned")
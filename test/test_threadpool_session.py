@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Threadpool session fallback: reading attributes after commit issues no SQL on the event loop.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, event, select
+
+from database import ThreadpoolSession, ThreadpoolSessionLocal
+from models import Base, User
+
+
+def test_attributes_stay_loaded_after_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'tp.db')}")
+        Base.metadata.create_all(engine)
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+
+        async def scenario():
+            db = ThreadpoolSession(ThreadpoolSessionLocal(bind=engine))
+            try:
+                db.add(User(name="Ada", email="ada@example.com", hashed_password="old"))
+                await db.commit()
+                user = (await db.scalars(select(User).where(User.email == "ada@example.com"))).first()
+
+                # Login's rehash path: update, commit, then read the row for the token
+                user.hashed_password = "new"
+                await db.commit()
+                before = len(statements)
+                values = (user.id, user.email, user.hashed_password, user.google_id)
+                return values, statements[before:]
+            finally:
+                await db.close()
+
+        values, after_commit = asyncio.run(scenario())
+        assert values[1:] == ("ada@example.com", "new", None)
+        assert after_commit == [], f"reading attributes after commit ran {after_commit}"
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_attributes_stay_loaded_after_commit()
+    print("✅ Threadpool session tests passed")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Packed session timelines: pack/unpack round-trips, compaction and merging with late rows.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, EmotionData, InterviewSession, SessionTimeline, User
+from timeline_store import compact_session, pack_timeline, summary_timeline, unpack_timeline
+
+START = datetime(2026, 1, 5, 9, 0, 0, 250000)
+
+
+def packed(samples):
+    return SessionTimeline(session_id=1, user_id=1, **pack_timeline(samples))
+
+
+def test_pack_unpack_round_trip():
+    emotions = ["Happy", "Neutral", "Sad", "Happy", "Surprise"]
+    samples = [
+        (emotions[i % 5], 0.1 + 0.17 * (i % 5), None if i == 3 else 0.05 * (i % 20),
+         START + timedelta(milliseconds=500 * i + (i % 3)))
+        for i in range(200)
+    ]
+    timeline = packed(samples)
+    assert timeline.sample_count == 200 and sorted(timeline.labels) == sorted(set(emotions))
+
+    decoded = unpack_timeline(timeline)
+    assert [d["emotion"] for d in decoded] == [s[0] for s in samples]
+    assert [d["confidence"] for d in decoded] == [round(s[1], 2) for s in samples]
+    assert [d["eye_contact_score"] for d in decoded] == [round(s[2] or 0.0, 2) for s in samples]
+    # Millisecond precision
+    assert [datetime.fromisoformat(d["timestamp"]) for d in decoded] == [s[3] for s in samples]
+
+
+def test_pack_rejects_out_of_order_samples():
+    try:
+        pack_timeline([("Happy", 0.5, 0.5, START + timedelta(seconds=1)), ("Sad", 0.5, 0.5, START)])
+        assert False, "expected out-of-order samples to be rejected"
+    except ValueError:
+        pass
+
+
+def test_summary_merges_packed_samples_and_rows_by_timestamp():
+    timeline = packed([("Happy", 0.9, 0.5, START + timedelta(seconds=s)) for s in (0, 2, 4)])
+    rows = [("Sad", 0.4, 0.1, START + timedelta(seconds=s)) for s in (1, 5)]
+
+    merged = summary_timeline(timeline, rows)
+    assert [m["emotion"] for m in merged] == ["Happy", "Sad", "Happy", "Happy", "Sad"]
+    assert summary_timeline(None, rows)[1]["timestamp"] == (START + timedelta(seconds=5)).isoformat()
+    assert len(summary_timeline(timeline, [])) == 3
+
+
+def test_compaction_folds_late_rows_into_the_packed_timeline():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'timeline.db')}")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        with factory() as db:
+            user = User(name="Test", email="t@example.com", hashed_password="x")
+            db.add(user)
+            db.flush()
+            session = InterviewSession(user_id=user.id, start_time=START)
+            db.add(session)
+            db.flush()
+
+            def add_rows(seconds):
+                db.add_all([EmotionData(user_id=user.id, session_id=session.id, emotion="Happy", confidence=0.8,
+                                        eye_contact_score=0.6, timestamp=START + timedelta(seconds=s))
+                            for s in seconds])
+                db.commit()
+
+            add_rows(range(0, 20, 2))
+            assert compact_session(db, session.id) == 10
+            add_rows([3, 21])  # A late flush, partly inside the packed range
+            assert compact_session(db, session.id) == 2
+            assert compact_session(db, session.id) == 0
+
+            timeline = db.get(SessionTimeline, session.id)
+            assert timeline.sample_count == 12
+            assert db.scalar(select(func.count()).select_from(EmotionData)) == 0
+            seconds = [(datetime.fromisoformat(e["timestamp"]) - START).total_seconds()
+                       for e in unpack_timeline(timeline)]
+            assert seconds == [0, 2, 3, 4, 6, 8, 10, 12, 14, 16, 18, 21]
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_pack_unpack_round_trip()
+    test_pack_rejects_out_of_order_samples()
+    test_summary_merges_packed_samples_and_rows_by_timestamp()
+    test_compaction_folds_late_rows_into_the_packed_timeline()
+    print("✅ Timeline store tests passed")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Per-user dashboard aggregates: incremental running means match a full rebuild.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import user_stats
+from database import ThreadpoolSession
+from models import Base, InterviewSession, User, UserStats
+
+
+def make_database(path, users=2):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as db:
+        db.add_all([User(name=f"User {i}", email=f"u{i}@example.com", hashed_password="x")
+                    for i in range(users)])
+        db.commit()
+    return engine, factory
+
+
+async def start_session(db, user_id):
+    session = InterviewSession(user_id=user_id)
+    db.add(session)
+    await user_stats.record_session_started(db, user_id)
+    await db.commit()
+    return session
+
+
+async def complete_session(db, session, confidence, emotion):
+    # What PUT /sessions/{id} does
+    previous = session.average_confidence, session.dominant_emotion
+    session.average_confidence, session.dominant_emotion = confidence, emotion
+    await user_stats.record_session_completed(db, session.user_id, confidence, emotion,
+                                              previous_confidence=previous[0], previous_emotion=previous[1])
+    await db.commit()
+
+
+def snapshot(stats):
+    return (stats.session_count, stats.completed_sessions, round(stats.average_confidence, 9),
+            stats.emotion_counts)
+
+
+def test_running_means_match_a_rebuild():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory = make_database(os.path.join(tmp, "stats.db"))
+        scores = [(0.9, "Happy"), (0.6, "Calm"), (0.75, "Happy"), (0.81, "Focused")]
+
+        async def scenario():
+            db = ThreadpoolSession(factory())
+            try:
+                sessions = [await start_session(db, 1) for _ in range(len(scores) + 1)]
+                for session, (confidence, emotion) in zip(sessions, scores):
+                    await complete_session(db, session, confidence, emotion)
+                # Re-completing replaces the session's contribution instead of adding another
+                await complete_session(db, sessions[1], 0.7, "Happy")
+                await start_session(db, 2)
+                return snapshot(await db.get(UserStats, 1)), snapshot(await db.get(UserStats, 2))
+            finally:
+                await db.close()
+
+        incremental, other = asyncio.run(scenario())
+        assert incremental == (5, 4, round((0.9 + 0.7 + 0.75 + 0.81) / 4, 9), {"Happy": 3, "Focused": 1})
+        assert other == (1, 0, 0.0, {})
+
+        with factory() as db:
+            assert user_stats.rebuild_user_stats(db) == 2
+            assert snapshot(db.get(UserStats, 1)) == incremental
+            assert user_stats.best_emotion(db.get(UserStats, 1)) == "Happy"
+            assert user_stats.best_emotion(db.get(UserStats, 2)) == "Neutral"
+        engine.dispose()
+
+
+def test_refresh_recomputes_one_user():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory = make_database(os.path.join(tmp, "stats.db"))
+        with factory() as db:
+            db.add_all([
+                InterviewSession(user_id=1, average_confidence=0.5, dominant_emotion="Sad"),
+                InterviewSession(user_id=1, average_confidence=0.9, dominant_emotion="Happy"),
+                InterviewSession(user_id=1),
+                InterviewSession(user_id=2, average_confidence=0.8, dominant_emotion="Calm"),
+            ])
+            db.add(UserStats(user_id=2, session_count=99, completed_sessions=99, average_confidence=0.1,
+                             emotion_counts={}))
+            db.commit()
+
+            user_stats.refresh_user_stats(db, 1)
+            db.commit()
+            assert snapshot(db.get(UserStats, 1)) == (3, 2, 0.7, {"Sad": 1, "Happy": 1})
+            assert db.get(UserStats, 2).session_count == 99  # Untouched
+        engine.dispose()
+
+
+def test_concurrent_session_starts_are_all_counted():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory = make_database(os.path.join(tmp, "stats.db"))
+
+        async def start(user_id):
+            db = ThreadpoolSession(factory())
+            try:
+                await start_session(db, user_id)
+            finally:
+                await db.close()
+
+        async def scenario():
+            # No stats rows yet: the first start creates it, the others only increment
+            await asyncio.gather(*(start(1) for _ in range(12)), *(start(2) for _ in range(3)))
+
+        asyncio.run(scenario())
+        with factory() as db:
+            assert db.get(UserStats, 1).session_count == 12
+            assert db.get(UserStats, 2).session_count == 3
+            assert db.get(UserStats, 1).last_activity is not None
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_running_means_match_a_rebuild()
+    test_refresh_recomputes_one_user()
+    test_concurrent_session_starts_are_all_counted()
+    print("✅ User stats tests passed")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Write-behind buffer: batched flushes, bad rows isolated and dead-lettered, outages retried.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, EmotionData, InterviewSession, User
+from write_behind import EmotionWriteBuffer
+
+
+def make_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def enforce_foreign_keys(dbapi_connection, connection_record):
+        # Like Postgres: a sample for a missing session is rejected
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        user = User(name="Test", email="t@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        session = InterviewSession(user_id=user.id)
+        db.add(session)
+        db.commit()
+        return engine, factory, user.id, session.id
+
+
+def row(user_id, session_id, emotion="Happy"):
+    return {"user_id": user_id, "session_id": session_id, "timestamp": datetime.utcnow(),
+            "emotion": emotion, "confidence": 0.9, "eye_contact_score": 0.5}
+
+
+def stored_rows(factory):
+    with factory() as db:
+        return db.scalar(select(func.count()).select_from(EmotionData))
+
+
+def test_flush_writes_buffered_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory, user_id, session_id = make_database(os.path.join(tmp, "wb.db"))
+        buffer = EmotionWriteBuffer(factory, batch_size=10)
+        for _ in range(25):
+            buffer.add(row(user_id, session_id))
+        buffer.flush()
+        assert stored_rows(factory) == 25 and buffer.depth() == 0
+        assert buffer.metrics()["flushed_rows"] == 25
+        engine.dispose()
+
+
+def test_bad_rows_are_dead_lettered_without_blocking_the_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory, user_id, session_id = make_database(os.path.join(tmp, "wb.db"))
+        buffer = EmotionWriteBuffer(factory)
+        for i in range(100):
+            buffer.add(row(user_id, session_id))
+            if i in (10, 57):
+                buffer.add(row(user_id, 99999))  # Session that does not exist
+        buffer.add(row(user_id, session_id, emotion=None))  # NOT NULL violation
+
+        buffer.flush()
+        assert stored_rows(factory) == 100 and buffer.depth() == 0
+        metrics = buffer.metrics()
+        assert metrics["dead_lettered_rows"] == 3 and metrics["flushed_rows"] == 100
+        assert sorted(str(r["session_id"]) + str(r["emotion"]) for r, _ in buffer.dead_letters) == \
+            sorted(["99999Happy", "99999Happy", f"{session_id}None"])
+
+        # Later flushes are unaffected
+        buffer.add(row(user_id, session_id))
+        buffer.flush()
+        assert stored_rows(factory) == 101
+        engine.dispose()
+
+
+def test_outage_requeues_the_whole_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, factory, user_id, session_id = make_database(os.path.join(tmp, "wb.db"))
+        down = {"value": True}
+
+        class FlakySession:
+            def __init__(self):
+                self.db = factory()
+
+            def execute(self, *args):
+                if down["value"]:
+                    raise OperationalError("INSERT", {}, Exception("database is locked"))
+                return self.db.execute(*args)
+
+            def __getattr__(self, name):
+                return getattr(self.db, name)
+
+        buffer = EmotionWriteBuffer(FlakySession)
+        for _ in range(5):
+            buffer.add(row(user_id, session_id))
+        try:
+            buffer.flush()
+            assert False, "flush should raise while the database is down"
+        except OperationalError:
+            pass
+        assert buffer.depth() == 5 and buffer.metrics()["dead_lettered_rows"] == 0
+
+        down["value"] = False
+        buffer.flush()
+        assert stored_rows(factory) == 5 and buffer.depth() == 0
+        engine.dispose()
+
+
+def test_max_depth_sheds_oldest_rows():
+    buffer = EmotionWriteBuffer(lambda: None, batch_size=1000, max_depth=3)
+    for i in range(5):
+        buffer.add({"n": i})
+    assert buffer.depth() == 3 and buffer.metrics()["dropped_rows"] == 2
+    assert [r["n"] for r in buffer._rows] == [2, 3, 4]
+
+
+if __name__ == "__main__":
+    test_flush_writes_buffered_rows()
+    test_bad_rows_are_dead_lettered_without_blocking_the_batch()
+    test_outage_requeues_the_whole_batch()
+    test_max_depth_sheds_oldest_rows()
+    print("✅ Write-behind buffer tests passed")